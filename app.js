@@ -1,12 +1,14 @@
 // Global state
 let backendPort = 5001;
 let allProducts = [];
+let currentJobId = null;
 
 // DOM Elements
 const urlList = document.getElementById('urlList');
 const urlCount = document.getElementById('urlCount');
 const clearUrlsBtn = document.getElementById('clearUrlsBtn');
 const fetchAllBtn = document.getElementById('fetchAllBtn');
+const refreshPricesBtn = document.getElementById('refreshPricesBtn');
 const progressSection = document.getElementById('progressSection');
 const productsSection = document.getElementById('productsSection');
 const urlInput = document.getElementById('urlInput');
@@ -14,6 +16,7 @@ const addUrlBtn = document.getElementById('addUrlBtn');
 const productsTableHeader = document.getElementById('productsTableHeader');
 const productsTableBody = document.getElementById('productsTableBody');
 const exportBtn = document.getElementById('exportBtn');
+const exportCsvBtn = document.getElementById('exportCsvBtn');
 const apiStatus = document.getElementById('apiStatus');
 
 const toggleTableBtn = document.getElementById('toggleTableBtn');
@@ -40,7 +43,9 @@ document.addEventListener('DOMContentLoaded', () => {
   urlInput.addEventListener('keydown', handleUrlInputKeydown);
   clearUrlsBtn.addEventListener('click', clearUrls);
   fetchAllBtn.addEventListener('click', fetchAllProducts);
+  refreshPricesBtn.addEventListener('click', refreshPrices);
   exportBtn.addEventListener('click', exportToExcel);
+  exportCsvBtn.addEventListener('click', exportToCsv);
 
   toggleTableBtn.addEventListener('click', toggleTableFullscreen);
 
@@ -61,6 +66,7 @@ async function testApiConnection() {
       statusDot.className = 'status-dot success';
       statusText.textContent = '✅ Backend çalışıyor';
       apiStatus.className = 'api-status success';
+      reattachBatchJob();
     } else {
       statusDot.className = 'status-dot error';
       statusText.textContent = '❌ Backend hatası';
@@ -154,47 +160,183 @@ async function fetchAllProducts() {
   }
 
   allProducts = [];
+  currentJobId = null;
   productsTableBody.innerHTML = '';
 
-  fetchAllBtn.disabled = true;
-  urlList.disabled = true;
-  urlInput.disabled = true;
-  addUrlBtn.disabled = true;
-
+  setFetching(true);
   showProgress(true);
   updateProgress(0, urls.length, 'Başlatılıyor...');
 
-  for (let i = 0; i < urls.length; i++) {
-    const url = urls[i];
-    updateProgress(i, urls.length, `İşleniyor: ${i + 1}/${urls.length}`);
-
-    try {
-      const response = await fetch(`${backendUrl}/urun?url=${encodeURIComponent(url)}`);
-      const data = await response.json();
-
-      allProducts.push(data);
-      addProductRow(data);
-    } catch (error) {
-      console.error(`URL hatası [${i + 1}]:`, error);
-      const fail = { success: false, url, error: error.message };
-      allProducts.push(fail);
-      addProductRow(fail);
+  try {
+    // kategori/arama linkleri varsa önce sunucu tarar, bulunan ürünler aynı toplu işe girer
+    if (urls.some(u => !PRODUCT_URL.test(u))) {
+      await runCrawlJob(urls);
+    } else {
+      await runBatchJob(urls);
     }
+  } catch (error) {
+    console.error('Toplu iş hatası:', error);
+    showToast(`❌ ${error.message || 'Toplu iş başlatılamadı'}`, 'error');
+    showProgress(false);
   }
 
-  updateProgress(urls.length, urls.length, '✅ Tamamlandı!');
-  setTimeout(() => showProgress(false), 800);
+  finishFetch();
+}
 
-  fetchAllBtn.disabled = false;
-  urlList.disabled = false;
-  urlInput.disabled = false;
-  addUrlBtn.disabled = false;
+function setFetching(busy) {
+  fetchAllBtn.disabled = busy;
+  urlList.disabled = busy;
+  urlInput.disabled = busy;
+  addUrlBtn.disabled = busy;
+}
+
+function finishFetch() {
+  setFetching(false);
 
   showProductsSection();
   updateSummary();
 
   const successfulCount = allProducts.filter(p => p.success).length;
   exportBtn.disabled = successfulCount === 0;
+  exportCsvBtn.disabled = successfulCount === 0;
+}
+
+// Sunucu tarafı toplu iş: sonuçlar bittikçe SSE ile gelir
+async function runBatchJob(urls) {
+  const response = await fetch(`${backendUrl}/urun/batch`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ urls })
+  });
+  const job = await response.json();
+  if (!job.success) throw new Error(job.error || 'Toplu iş hatası');
+  notifyDuplicates(job.duplicates);
+  await followBatchJob(job.job_id, job.total);
+}
+
+const PRODUCT_URL = /-p\d{8,14}\.html/;
+
+async function runCrawlJob(urls) {
+  updateProgress(0, 0, 'Kategoriler taranıyor...');
+  const response = await fetch(`${backendUrl}/crawl`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ urls })
+  });
+  const job = await response.json();
+  if (!job.success) throw new Error(job.error || 'Tarama hatası');
+  // tarama sunucuda sürer; bulunan ürünler bittikçe aynı işe eklenir
+  const result = await followBatchJob(job.job_id, job.total);
+  if (result.total === 0) throw new Error('Listelerde ürün bulunamadı');
+  showToast(`🔎 ${result.total} ürün bulundu`, 'success');
+}
+
+// Aynı ürüne giden URL'ler (farklı parametreler, aynı EAN) sunucuda tek sefer çekilir
+function notifyDuplicates(count) {
+  if (count > 0) showToast(`🔁 ${count} tekrar eden URL atlandı`, 'info');
+}
+
+// İş olaylarını dinle. Bağlantı koparsa iş durumu bir kez sorgulanır: iş sürüyorsa kalınan olaydan
+// yeniden bağlanılır, bittiyse eksik sonuçlar durum yanıtından alınır, iş yoksa (silinmiş ya da
+// sunucu kapalı) hata döner. Returns: işin son durumu ({status, done, total, failed})
+function watchJob(jobId, onResult) {
+  return new Promise((resolve, reject) => {
+    const seen = new Set();
+    let lastSeq = 0;
+    let retries = 0;
+
+    const handle = (data) => {
+      if (seen.has(data.index)) return;
+      seen.add(data.index);
+      onResult(data);
+    };
+
+    const open = () => {
+      const events = new EventSource(`${backendUrl}/urun/batch/${jobId}/events?from=${lastSeq}`);
+
+      events.addEventListener('result', (e) => {
+        lastSeq = Number(e.lastEventId) || lastSeq + 1;
+        retries = 0;
+        handle(JSON.parse(e.data));
+      });
+
+      events.addEventListener('done', (e) => {
+        events.close();
+        resolve(JSON.parse(e.data));
+      });
+
+      events.onerror = async () => {
+        events.close();
+        try {
+          const response = await fetch(`${backendUrl}/urun/batch/${jobId}`);
+          const job = await response.json();
+          if (!response.ok || !job.success) throw new Error(job.error || 'İş bulunamadı');
+          if (job.status === 'running' && retries++ < 3) {
+            open();
+            return;
+          }
+          job.results.forEach((product, index) => {
+            if (product) handle({ index, product, done: job.done, total: job.total });
+          });
+          if (job.status === 'running') throw new Error('İş ilerlemesine bağlanılamadı');
+          resolve(job);
+        } catch (error) {
+          reject(error.message === 'Failed to fetch' ? new Error('Sunucuya ulaşılamadı') : error);
+        }
+      };
+    };
+
+    open();
+  });
+}
+
+async function followBatchJob(jobId, total) {
+  currentJobId = jobId;
+  allProducts = new Array(total);
+
+  try {
+    const job = await watchJob(jobId, (data) => {
+      allProducts[data.index] = data.product;
+      addProductRow(data.product);
+      const label = data.discovering ? 'Taranıyor, işleniyor' : 'İşleniyor';
+      updateProgress(data.done, data.total, `${label}: ${data.done}/${data.total}`);
+    });
+    updateProgress(job.total, job.total, '✅ Tamamlandı!');
+    setTimeout(() => showProgress(false), 800);
+    return job;
+  } finally {
+    allProducts = allProducts.filter(Boolean);
+  }
+}
+
+// Uygulama yeniden açıldıysa yarım kalan son işe bağlan (sunucu günlükten devam ettirir)
+async function reattachBatchJob() {
+  let attached = false;
+  try {
+    const response = await fetch(`${backendUrl}/urun/batch`);
+    const data = await response.json();
+    const job = (data.jobs || []).find(j => j.status === 'running' || j.status === 'interrupted');
+    if (!job) return;
+
+    if (job.status === 'interrupted') {
+      await fetch(`${backendUrl}/urun/batch/${job.job_id}/resume`, { method: 'POST' });
+    }
+
+    showToast(`↻ Yarım kalan iş devam ediyor (${job.done}/${job.total})`, 'success');
+    productsTableBody.innerHTML = '';
+    setFetching(true);
+    showProgress(true);
+    attached = true;
+    await followBatchJob(job.job_id, job.total);
+    finishFetch();
+  } catch (error) {
+    console.error('İşe yeniden bağlanma hatası:', error);
+    if (attached) {
+      showToast(`❌ ${error.message || 'Yarım kalan işe bağlanılamadı'}`, 'error');
+      showProgress(false);
+      finishFetch();
+    }
+  }
 }
 
 function showProgress(show) {
@@ -284,52 +426,130 @@ function toggleTableFullscreen() {
 }
 
 // Export -> downloads XLSX
-async function exportToExcel() {
+function exportToExcel() {
+  return exportFile({
+    endpoint: '/export-excel',
+    button: exportBtn,
+    defaultName: 'ebay_export.xlsx',
+    label: '<span class="btn-icon">📥</span><span class="btn-text">Excel İndir (eBay Vorlage)</span>'
+  });
+}
+
+// Export -> downloads CSV (eBay File Exchange)
+function exportToCsv() {
+  return exportFile({
+    endpoint: '/export-csv',
+    button: exportCsvBtn,
+    defaultName: 'ebay_export.csv',
+    label: '<span class="btn-icon">📄</span><span class="btn-text">CSV İndir (File Exchange)</span>'
+  });
+}
+
+async function exportFile({ endpoint, button, defaultName, label }) {
   const successfulProducts = allProducts.filter(p => p.success);
   if (successfulProducts.length === 0) {
     showToast('❌ Export edilecek başarılı ürün yok', 'error');
     return;
   }
 
-  exportBtn.disabled = true;
-  exportBtn.innerHTML = '<span class="spinner"></span> Export hazırlanıyor...';
+  button.disabled = true;
+  button.innerHTML = '<span class="spinner"></span> Export hazırlanıyor...';
+
+  try {
+    // sonuçlar sunucuda duruyorsa sadece iş kimliği gönderilir
+    let filename;
+    if (currentJobId) {
+      try {
+        filename = await downloadFile(endpoint, { job_id: currentJobId }, defaultName);
+      } catch (error) {
+        // iş sunucuda bulunamadı (budandı / yeniden başlatıldı): ekrandaki listeyle tekrar dene
+        console.warn('İş ile export başarısız, ürün listesiyle deneniyor:', error);
+      }
+    }
+    if (!filename) {
+      filename = await downloadFile(endpoint, { products: successfulProducts }, defaultName);
+    }
+    showToast(`✅ Export indirildi: ${filename}`, 'success');
+  } catch (error) {
+    console.error('Export hatası:', error);
+    showToast(error.message || '❌ Export sırasında hata oluştu', 'error');
+  } finally {
+    button.disabled = false;
+    button.innerHTML = label;
+  }
+}
+
+// POST yanıtını dosya olarak indir; indirilen dosya adını döndürür
+async function downloadFile(endpoint, body, defaultName) {
+  const response = await fetch(`${backendUrl}${endpoint}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body)
+  });
+
+  if (!response.ok) {
+    const errText = await response.text();
+    console.error(errText);
+    throw new Error('❌ Export hatası (server)');
+  }
+
+  const blob = await response.blob();
+  const cd = response.headers.get('content-disposition') || '';
+  let filename = defaultName;
+  const m = /filename="?([^"]+)"?/i.exec(cd);
+  if (m && m[1]) filename = m[1];
+
+  const url = window.URL.createObjectURL(blob);
+  const a = document.createElement('a');
+  a.href = url;
+  a.download = filename;
+  document.body.appendChild(a);
+  a.click();
+  a.remove();
+  window.URL.revokeObjectURL(url);
+  return filename;
+}
+
+// Fiyat/stok güncelleme: listedeki (liste boşsa önbellekteki tüm) ürünler yeniden kontrol edilir,
+// sadece değişenler Revise CSV'si olarak iner
+async function refreshPrices() {
+  const urls = getUrls();
+
+  setFetching(true);
+  refreshPricesBtn.disabled = true;
+  showProgress(true);
+  updateProgress(0, urls.length, 'Fiyatlar kontrol ediliyor...');
 
   try {
-    const response = await fetch(`${backendUrl}/export-excel`, {
+    const response = await fetch(`${backendUrl}/refresh`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ products: successfulProducts })
+      body: JSON.stringify(urls.length ? { urls } : {})
+    });
+    const job = await response.json();
+    if (!job.success) throw new Error(job.error || 'Güncelleme hatası');
+
+    let changed = 0;
+    await watchJob(job.job_id, (data) => {
+      if (data.product.changed) changed++;
+      updateProgress(data.done, data.total, `Kontrol: ${data.done}/${data.total} · ${changed} değişti`);
     });
 
-    if (!response.ok) {
-      const errText = await response.text();
-      console.error(errText);
-      showToast('❌ Export hatası (server)', 'error');
+    setTimeout(() => showProgress(false), 800);
+    if (changed === 0) {
+      showToast('✅ Fiyat/stok değişikliği yok', 'success');
       return;
     }
-
-    const blob = await response.blob();
-    const cd = response.headers.get('content-disposition') || '';
-    let filename = 'ebay_export.xlsx';
-    const m = /filename="?([^"]+)"?/i.exec(cd);
-    if (m && m[1]) filename = m[1];
-
-    const url = window.URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = filename;
-    document.body.appendChild(a);
-    a.click();
-    a.remove();
-    window.URL.revokeObjectURL(url);
-
-    showToast(`✅ Export indirildi: ${filename}`, 'success');
+    const filename = await downloadFile('/export-revise', { job_id: job.job_id }, 'ebay_revise.csv');
+    showToast(`✅ ${changed} değişiklik: ${filename}`, 'success');
   } catch (error) {
-    console.error('Export hatası:', error);
-    showToast('❌ Export sırasında hata oluştu', 'error');
+    console.error('Fiyat güncelleme hatası:', error);
+    showToast(`❌ ${error.message || 'Fiyat güncelleme hatası'}`, 'error');
+    showProgress(false);
   } finally {
-    exportBtn.disabled = false;
-    exportBtn.innerHTML = '<span class="btn-icon">📥</span><span class="btn-text">Excel İndir (eBay Vorlage)</span>';
+    setFetching(false);
+    refreshPricesBtn.disabled = false;
+    updateUrlCount();
   }
 }
 
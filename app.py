@@ -1,6 +1,7 @@
 import sys
 import os
 import logging
+import multiprocessing
 import threading
 import socket
 import time
@@ -65,6 +66,17 @@ def create_app():
     try:
         from urun_api import app as flask_app
         logger.info("Backend başarıyla import edildi")
+
+        # chromedriver yolunu çözümle ve ilk sürücüyü arka planda aç
+        from driver_pool import get_pool
+        threading.Thread(target=get_pool().warmup, daemon=True).start()
+
+        # önceki oturumda yarım kalan toplu işleri günlükten devam ettir
+        import config
+        if config.BATCH_AUTO_RESUME:
+            from urun_api import jobs
+            threading.Thread(target=jobs.resume_interrupted, daemon=True).start()
+
         return flask_app
     except Exception as e:
         logger.error(f"Backend import hatası: {e}")
@@ -79,6 +91,21 @@ def create_app():
         return app
 
 
+def wait_until_ready(port: int, timeout: float = 15.0) -> bool:
+    """/health yanıt verene kadar kısa aralıklarla yokla"""
+    deadline = time.perf_counter() + timeout
+    delay = 0.02
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
+    return False
+
+
 def get_static_path():
     """Static dosyaların yolunu bul"""
     if getattr(sys, 'frozen', False):
@@ -126,6 +153,8 @@ class Api:
 def main():
     """Ana uygulama"""
     try:
+        t0 = time.perf_counter()
+        timings = {}
         logger.info("=== DM Ürün Çekici Başlatılıyor ===")
 
         # .env kontrolü
@@ -137,7 +166,9 @@ def main():
         logger.info(f"Kullanılacak port: {port}")
 
         # Flask app oluştur
+        t = time.perf_counter()
         flask_app = create_app()
+        timings["backend_import"] = time.perf_counter() - t
 
         # Server thread başlat
         server_thread = ServerThread(flask_app, port)
@@ -145,13 +176,17 @@ def main():
 
         # Server hazır olana kadar bekle
         logger.info("Backend hazırlanıyor...")
-        time.sleep(3)
+        t = time.perf_counter()
+        if not wait_until_ready(port):
+            logger.error("❌ Backend 15 sn içinde hazır olmadı, pencere yine de açılıyor")
+        timings["server_ready"] = time.perf_counter() - t
 
-        # API test
-        api_test_result = test_api_connection(port)
+        # API test pencereyi bekletmesin
+        def run_api_test():
+            if not test_api_connection(port).get("success"):
+                logger.error("❌ API test başarısız! AI özellikleri çalışmayabilir.")
 
-        if not api_test_result.get("success"):
-            logger.error("❌ API test başarısız! Uygulama yine de açılıyor ama AI özellikleri çalışmayabilir.")
+        threading.Thread(target=run_api_test, daemon=True).start()
 
         # Static HTML yolu
         html_path = get_static_path()
@@ -172,6 +207,12 @@ def main():
             js_api=api
         )
 
+        timings["total"] = time.perf_counter() - t0
+        logger.info(
+            "⏱️ Açılış süreleri: "
+            + ", ".join(f"{name}={sec * 1000:.0f}ms" for name, sec in timings.items())
+        )
+
         logger.info("✅ Pencere oluşturuldu, başlatılıyor...")
         webview.start(debug=False)
 
@@ -200,4 +241,6 @@ def main():
 
 
 if __name__ == '__main__':
+    # SCRAPE_BACKEND="process": paketlenmiş exe'de çocuk süreçler buradan başlar
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,436 @@
+"""
+Toplu Ürün Çekme İşleri
+URL listesini sınırlı bir worker havuzunda işler, ilerlemeyi olay akışı olarak yayınlar.
+Her sonuç iş günlüğüne (JSONL) eklenir; yarıda kalan işler günlükten devam ettirilir.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+from product import Product, dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJob:
+    """
+    Tek bir toplu çekme işinin durumu ve olay günlüğü.
+    discovering=True: URL'ler iş sürerken eklenir (tarama); iş ancak close() sonrası biter.
+    """
+
+    def __init__(self, job_id: str, urls: List[str], options: Dict = None, discovering: bool = False):
+        self.id = job_id
+        self.urls = list(urls)
+        self.options = options or {}
+        self.results: List[Optional[Dict]] = [None] * len(urls)
+        self.done = 0
+        self.failed = 0
+        self.status = "running"
+        self.discovering = discovering
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        # olaylar sadece indeks tutar; veri results listesinden okunur
+        self._events: List[Dict] = []
+        self._cond = threading.Condition()
+
+        # boş iş hiç sonuç almayacağı için hemen biter (yoksa "done" olayı hiç gelmez)
+        if not urls and not discovering:
+            self.status = "done"
+            self.finished_at = self.created_at
+            self._events.append({"type": "done"})
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def _publish(self, event: Dict):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def set_result(self, index: int, result: Dict) -> bool:
+        """Returns: bu sonuçla iş bitti mi (sadece son sonuçta True)"""
+        with self._cond:
+            self.results[index] = result
+            self.done += 1
+            if not result.get("success"):
+                self.failed += 1
+            finished = self.done == len(self.urls) and not self.discovering
+            if finished:
+                self.status = "done"
+                self.finished_at = time.time()
+        self._publish({"type": "result", "index": index})
+        if finished:
+            self._publish({"type": "done"})
+        return finished
+
+    def add_urls(self, urls: List[str]) -> range:
+        """Tarama sürerken bulunan URL'ler; Returns: yeni URL'lerin indeksleri"""
+        with self._cond:
+            start = len(self.urls)
+            self.urls.extend(urls)
+            self.results.extend([None] * len(urls))
+            return range(start, len(self.urls))
+
+    def close(self) -> bool:
+        """Tarama bitti, yeni URL gelmeyecek. Returns: iş bununla bitti mi (tüm sonuçlar zaten geldiyse)"""
+        with self._cond:
+            self.discovering = False
+            finished = self.status == "running" and self.done == len(self.urls)
+            if finished:
+                self.status = "done"
+                self.finished_at = time.time()
+        if finished:
+            self._publish({"type": "done"})
+        return finished
+
+    def progress(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": len(self.urls),
+            "done": self.done,
+            "failed": self.failed,
+            "discovering": self.discovering,
+        }
+
+    def iter_results(self):
+        """Sonuçları bittikçe üret; iş zaten bitmişse giriş sırasıyla"""
+        if self.finished:
+            yield from (r for r in self.results if r is not None)
+            return
+        for _, event, data in self.iter_events():
+            if event == "result":
+                yield data["product"]
+
+    def iter_events(self, start: int = 0, heartbeat: float = 15.0):
+        """
+        start numaralı olaydan itibaren (seq, event, data) üretir.
+        Yeni olay gelmezse heartbeat saniyede bir (None, None, None) döner.
+        """
+        seq = start
+        while True:
+            with self._cond:
+                if seq >= len(self._events):
+                    self._cond.wait(timeout=heartbeat)
+                pending = self._events[seq:]
+
+            if not pending:
+                yield None, None, None
+                continue
+
+            for event in pending:
+                seq += 1
+                if event["type"] == "result":
+                    idx = event["index"]
+                    data = {"index": idx, "product": self.results[idx], **self.progress()}
+                    yield seq, "result", data
+                else:
+                    yield seq, event["type"], self.progress()
+                    return
+
+
+class JobJournal:
+    """
+    İş başına satır satır JSON günlüğü:
+      {"type": "job", "id", "urls", "options", "created_at"}   ilk satır
+      {"type": "urls", "urls"}                                  taramada sonradan eklenen URL'ler
+      {"type": "result", "index", "result"}                     her biten URL
+      {"type": "done", "total", "done", "failed"}               iş bittiğinde
+    Yarım yazılmış son satır (çökme) okumada atlanır. Sonuçlar Product olarak yüklenir.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    def _torn_tail(self) -> bool:
+        """Çökmeden kalan yarım son satır: devam eden iş yeni kaydı ona eklemesin"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if not f.tell():
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def _append(self, record: Dict):
+        line = dumps(record) + b"\n"
+        with self._lock:
+            if not self._tail_checked:
+                self._tail_checked = True
+                if self._torn_tail():
+                    line = b"\n" + line
+            with open(self.path, "ab") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, job: "BatchJob"):
+        self._append({"type": "job", "id": job.id, "urls": job.urls,
+                      "options": job.options, "created_at": job.created_at})
+
+    def add_urls(self, urls: List[str]):
+        self._append({"type": "urls", "urls": urls})
+
+    def record(self, index: int, result: Dict):
+        self._append({"type": "result", "index": index, "result": result})
+
+    def finish(self, job: "BatchJob"):
+        self._append({"type": "done", "total": len(job.urls), "done": job.done, "failed": job.failed})
+
+    def summary(self) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """
+        Sadece ilk ve son satır okunur (iş listesi için tüm sonuçları yüklemeye gerek yok).
+        Returns: (iş başlığı, son satır bitiş kaydıysa o kayıt, değilse None)
+        """
+        with open(self.path, "rb") as f:
+            try:
+                header = loads(f.readline())
+            except ValueError:
+                return None, None
+            # bitiş kaydı kısa: dosyanın son birkaç yüz baytında
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 512))
+            tail = f.read().rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        try:
+            end = loads(tail)
+        except ValueError:
+            end = None
+        if not isinstance(header, dict) or header.get("type") != "job":
+            return None, None
+        return header, end if isinstance(end, dict) and end.get("type") == "done" else None
+
+    def load(self) -> Tuple[Optional[Dict], Dict[int, Product]]:
+        """Returns: (iş başlığı (sonradan eklenen URL'ler dahil), {index: son sonuç})"""
+        header = None
+        results: Dict[int, Product] = {}
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "job":
+                    header = record
+                elif record.get("type") == "urls" and header is not None:
+                    header["urls"].extend(record["urls"])
+                elif record.get("type") == "result":
+                    results[record["index"]] = Product.from_dict(record["result"])
+        return header, results
+
+
+class JobManager:
+    """
+    Tüm işlerin paylaştığı sınırlı worker havuzu.
+    pipeline verilirse URL'ler worker yerine aşamalı hatta (pipeline.Pipeline) gönderilir.
+    """
+
+    def __init__(self, worker: Callable[..., Dict], max_workers: int = None, journal_dir: str = None,
+                 pipeline=None):
+        self.worker = worker
+        self.pipeline = pipeline
+        self.max_workers = max_workers or config.BATCH_WORKERS
+        self.journal_dir = config.BATCH_JOURNAL_DIR if journal_dir is None else journal_dir
+        if self.journal_dir:
+            os.makedirs(self.journal_dir, exist_ok=True)
+        self._journals: Dict[str, JobJournal] = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch")
+        self._jobs: Dict[str, BatchJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, urls: List[str], options: Dict = None) -> BatchJob:
+        """options her URL için worker'a anahtar kelime argümanı olarak geçer"""
+        job = BatchJob(uuid.uuid4().hex[:12], urls, options)
+        journal = self._journal(job.id)
+        if journal:
+            journal.start(job)
+            if job.finished:
+                journal.finish(job)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+
+        logger.info(f"Toplu iş başladı: {job.id} ({len(urls)} URL, {self.max_workers} worker)")
+        for i, url in enumerate(urls):
+            self._dispatch(job, i, url)
+        return job
+
+    def open_job(self, options: Dict = None) -> BatchJob:
+        """URL'leri sonradan add_urls ile eklenecek iş (tarama); close() çağrılana kadar bitmez"""
+        job = BatchJob(uuid.uuid4().hex[:12], [], options, discovering=True)
+        journal = self._journal(job.id)
+        if journal:
+            journal.start(job)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        logger.info(f"Toplu iş başladı (tarama): {job.id}")
+        return job
+
+    def add_urls(self, job: BatchJob, urls: List[str]):
+        if not urls:
+            return
+        indices = job.add_urls(urls)
+        journal = self._journal(job.id)
+        if journal:
+            journal.add_urls(urls)
+        for i in indices:
+            self._dispatch(job, i, job.urls[i])
+
+    def close(self, job: BatchJob):
+        if job.close():
+            self._finished(job)
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def running(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.finished)
+
+    def _journal(self, job_id: str) -> Optional[JobJournal]:
+        # job_id istekten de gelebilir: dosya yolu olarak sadece düz kimlik kabul edilir
+        if not self.journal_dir or not job_id.isalnum():
+            return None
+        with self._lock:
+            journal = self._journals.get(job_id)
+            if journal is None:
+                journal = self._journals[job_id] = JobJournal(os.path.join(self.journal_dir, f"{job_id}.jsonl"))
+            return journal
+
+    def journaled(self) -> List[Dict]:
+        """Diskteki iş günlükleri (yeniden başlatmadan sonra devam ettirilebilecekler dahil)"""
+        if not self.journal_dir:
+            return []
+        jobs = []
+        for name in sorted(os.listdir(self.journal_dir)):
+            if not name.endswith(".jsonl"):
+                continue
+            job_id = name[:-len(".jsonl")]
+            running = self.get(job_id)
+            if running:
+                jobs.append({**running.progress(), "created_at": running.created_at})
+                continue
+            journal = self._journal(job_id)
+            header, end = journal.summary()
+            if not header:
+                continue
+            if end:
+                total = end.get("total", len(header["urls"]))
+                done, failed = end["done"], end["failed"]
+            else:
+                # bitiş kaydı yok: iş yarıda kalmış (ya da eski günlük), sayılar için sonuçlar okunur
+                header, results = journal.load()
+                total = len(header["urls"])
+                done, failed = len(results), sum(1 for r in results.values() if not r.get("success"))
+            jobs.append({
+                "job_id": job_id,
+                # interrupted: uygulama/Chrome çöktüğü için bazı URL'ler hiç bitmedi
+                "status": "done" if done == total else "interrupted",
+                "total": total,
+                "done": done,
+                "failed": failed,
+                "created_at": header.get("created_at", 0),
+            })
+        return sorted(jobs, key=lambda j: j["created_at"], reverse=True)
+
+    def saved_results(self, job_id: str) -> Optional[List[Product]]:
+        """Bellekte olmayan (budanmış / yeniden başlatmadan önceki) işin günlükteki sonuçları, giriş sırasıyla"""
+        journal = self._journal(job_id)
+        if not journal or not os.path.exists(journal.path):
+            return None
+        header, results = journal.load()
+        if not header:
+            return None
+        return [results[i] for i in sorted(results)]
+
+    def resume(self, job_id: str) -> Optional[BatchJob]:
+        """
+        Günlükten işi yeniden kur: başarılı sonuçlar olduğu gibi alınır,
+        sadece başarısız ve hiç bitmemiş URL'ler tekrar çalıştırılır.
+        """
+        job = self.get(job_id)
+        if job and not job.finished:
+            return job
+
+        journal = self._journal(job_id)
+        path = journal.path if journal else ""
+        if not os.path.exists(path):
+            return None
+        header, results = journal.load()
+        if not header:
+            return None
+
+        job = BatchJob(job_id, header["urls"], header.get("options"))
+        job.created_at = header.get("created_at", job.created_at)
+        pending = {i for i in range(len(job.urls)) if not (results.get(i) or {}).get("success")}
+        with self._lock:
+            # açılıştaki otomatik devam ile arayüzün /resume isteği aynı anda gelebilir: işi tek kişi kurar
+            running = self._jobs.get(job_id)
+            if running and not running.finished:
+                return running
+            self._jobs[job.id] = job
+            self._prune()
+
+        logger.info(f"Toplu iş devam ediyor: {job.id} ({len(job.urls) - len(pending)} hazır, {len(pending)} tekrar)")
+        for i in range(len(job.urls)):
+            # tekrarlanacak URL kalmadıysa iş burada biter: bitiş kaydı yazılmazsa her açılışta yeniden devam ettirilir
+            if i not in pending and job.set_result(i, results[i]):
+                self._finished(job)
+        for i in sorted(pending):
+            self._dispatch(job, i, job.urls[i])
+        return job
+
+    def resume_interrupted(self) -> List[BatchJob]:
+        """Açılışta yarıda kesilmiş işleri devam ettir (bitmiş ama hatalı işler elle devam ettirilir)"""
+        return [self.resume(j["job_id"]) for j in self.journaled() if j["status"] == "interrupted"]
+
+    def _dispatch(self, job: BatchJob, index: int, url: str):
+        if self.pipeline is not None:
+            self.pipeline.submit(url, job.options, lambda result: self._finish(job, index, result))
+        else:
+            self._executor.submit(self._run, job, index, url)
+
+    def _run(self, job: BatchJob, index: int, url: str):
+        try:
+            result = self.worker(url, **job.options)
+        except Exception as e:
+            logger.error(f"Toplu iş hatası [{job.id}] {url}: {e}")
+            result = {"success": False, "url": url, "error": str(e), "message": "Worker hatası"}
+        self._finish(job, index, result)
+
+    def _finish(self, job: BatchJob, index: int, result: Dict):
+        journal = self._journal(job.id)
+        if journal:
+            try:
+                journal.record(index, result)
+            except OSError as e:
+                logger.error(f"İş günlüğüne yazılamadı [{job.id}]: {e}")
+        if job.set_result(index, result):
+            self._finished(job)
+
+    def _finished(self, job: BatchJob):
+        journal = self._journal(job.id)
+        if journal:
+            try:
+                journal.finish(job)
+            except OSError as e:
+                logger.error(f"İş günlüğüne yazılamadı [{job.id}]: {e}")
+        logger.info(f"Toplu iş bitti: {job.id} ({job.done - job.failed}/{job.done} başarılı)")
+
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.created_at)
+        for job in finished[:max(0, len(finished) - config.BATCH_KEEP_JOBS)]:
+            del self._jobs[job.id]
+            self._journals.pop(job.id, None)
@@ -0,0 +1,340 @@
+"""
+Uçtan uca performans ölçümü (ağsız)
+Ürün sayfaları (benchmarks/fixtures; sentetik, dm.de yapısında) yerel bir HTTP sunucusundan, AI yanıtları
+yerel OpenRouter taklidinden gelir; dışarıya açılan her bağlantı engellenir.
+
+Kullanım:
+  python benchmarks/bench_pipeline.py                          # 10, 1000, 50000 ürün
+  python benchmarks/bench_pipeline.py --sizes 10,1000 --llm-latency 0.2
+  python benchmarks/bench_pipeline.py --save-baseline          # sonuçları baseline olarak kaydet
+  python benchmarks/bench_pipeline.py --tolerance 0.25         # baseline'dan %25 kötüyse çıkış kodu 1
+
+Sayfa ayıklama, LLM ve uçtan uca aşamalar en fazla --sample ürünle ölçülür (ürün başı maliyet);
+benzerlik ve export tüm ürün sayısıyla çalışır (ölçeklenme maliyeti).
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import config
+from fake_openrouter import FakeOpenRouter
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# büyük olan iyi; diğer tüm ölçümlerde küçük olan iyi
+HIGHER_IS_BETTER = {"e2e_products_per_min"}
+
+
+def block_network():
+    """Benchmark sırasında sadece loopback bağlantılarına izin ver"""
+    original = socket.socket.connect
+
+    def connect(self, address):
+        host = address[0] if isinstance(address, tuple) else address
+        if self.family in (socket.AF_INET, socket.AF_INET6) and host not in ("127.0.0.1", "::1", "localhost"):
+            raise ConnectionRefusedError(f"benchmark ağsız çalışır: {host}")
+        return original(self, address)
+
+    socket.socket.connect = connect
+
+
+class FixtureServer:
+    """/<herhangi>-p<ean>.html isteklerine fixture sayfalarını sırayla döner"""
+
+    def __init__(self, pages):
+        self.pages = [p.encode("utf-8") for p in pages]
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body = server.pages[zlib.crc32(self.path.encode()) % len(server.pages)]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def url(self, i):
+        # URL'deki EAN her ürün için farklı: önbellek EAN eşleşmesiyle isabet vermesin
+        return f"http://127.0.0.1:{self._server.server_address[1]}/bench-{i}-p{20000000000 + i:013d}.html"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def best_of(fn, min_time=0.5, max_runs=20):
+    """
+    Küçük boyutlarda gürültüyü azaltmak için fn'i en az min_time boyunca tekrarla, en iyi süreyi al.
+    Tek çalıştırma zaten uzunsa (büyük boyutlar) tekrar edilmez.
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    if first >= min_time:
+        return first
+
+    # ilk çalıştırma ısınma sayılır
+    best = None
+    total = 0.0
+    for _ in range(max_runs):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        total += elapsed
+        if total >= min_time:
+            break
+    return best
+
+
+def bench_parse(pages, n):
+    import extractor
+
+    def parse_all():
+        for i in range(n):
+            extractor.extract(pages[i % len(pages)], fallback_fields=config.REQUIRED_FIELDS)
+
+    return {"parse_ms": best_of(parse_all) / n * 1000}
+
+
+def bench_llm(products, n):
+    from openrouter_client import OpenRouterClient
+    client = OpenRouterClient()
+    latencies = []
+
+    def one(p):
+        start = time.perf_counter()
+        client.generate_listing(p["dm_baslik"], p["dm_aciklama"], p["specifications"], fresh=True)
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=config.OPENROUTER_CONCURRENCY) as pool:
+        list(pool.map(one, (products[i % len(products)] for i in range(n))))
+    return {
+        "llm_p50_ms": percentile(latencies, 50) * 1000,
+        "llm_p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def bench_e2e(fixtures, n, offset):
+    """Toplu iş yöneticisi (aşamalı hat ya da veri_cek): HTTP çekim, ayıklama, AI, önbellek, günlük"""
+    import scraper
+
+    manager = scraper.toplu_is_yoneticisi()
+    urls = [fixtures.url(offset + i) for i in range(n)]
+    start = time.perf_counter()
+    job = manager.submit(urls)
+    for _ in job.iter_events(heartbeat=1):
+        pass
+    elapsed = time.perf_counter() - start
+    results = [r for r in job.results if r and r.get("success")]
+    if len(results) != n:
+        raise RuntimeError(f"uçtan uca: {n - len(results)} ürün başarısız")
+    return {"e2e_products_per_min": n / elapsed * 60}, results
+
+
+def bench_similarity(products, n):
+    from similarity_checker import SimilarityChecker
+    checker = SimilarityChecker()
+
+    def check(p):
+        checker.check_fields(p["dm_aciklama"], {
+            "ebay_title": p["ebay_title"],
+            "bullet_points": p["bullet_points"],
+            "html_description": p["html_description"],
+        })
+
+    def check_all():
+        for i in range(n):
+            check(products[i % len(products)])
+
+    return {"similarity_ms": best_of(check_all) / n * 1000}
+
+
+def bench_export(products, n):
+    from ebay_excel_exporter import iter_csv, write_xlsx
+
+    def rows():
+        for i in range(n):
+            p = dict(products[i % len(products)])
+            p["ean"] = f"{30000000000 + i:013d}"
+            yield p
+
+    def csv_all():
+        for _ in iter_csv(rows(), config.EXPORT_HEADERS):
+            pass
+
+    return {
+        "export_xlsx_s": best_of(lambda: write_xlsx(rows(), config.EXPORT_HEADERS, io.BytesIO())),
+        "export_csv_s": best_of(csv_all),
+    }
+
+
+def run(sizes, sample, llm_latency):
+    pages = [open(f, encoding="utf-8").read() for f in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))]
+    if not pages:
+        raise SystemExit(f"Fixture bulunamadı: {FIXTURE_DIR}")
+
+    results = {}
+    with FakeOpenRouter(latency=llm_latency, jitter=llm_latency / 5) as fake:
+        config.OPENROUTER_API_KEY = "bench"
+        config.OPENROUTER_URL = fake.url
+        config.OPENROUTER_RATE_PER_SEC = 1000.0
+        config.OPENROUTER_BURST = 1000
+        config.AI_ENABLED = True
+        config.LLM_CACHE_ENABLED = False
+        config.IMAGE_CHECK_ENABLED = False
+        config.SCRAPE_MODE = "http"
+        fixtures = FixtureServer(pages)
+
+        offset = 0
+        try:
+            for n in sizes:
+                m = min(n, sample)
+                row = {}
+                row.update(bench_parse(pages, m))
+                e2e, products = bench_e2e(fixtures, m, offset)
+                offset += m
+                row.update(e2e)
+                row.update(bench_llm(products, min(m, 200)))
+                row.update(bench_similarity(products, n))
+                row.update(bench_export(products, n))
+                results[str(n)] = row
+                print_row(n, m, row)
+        finally:
+            fixtures.stop()
+    return results
+
+
+COLUMNS = [
+    ("parse_ms", "ayıklama ms/ürün", "{:.2f}"),
+    ("e2e_products_per_min", "uçtan uca ürün/dk", "{:.0f}"),
+    ("llm_p50_ms", "LLM p50 ms", "{:.0f}"),
+    ("llm_p95_ms", "LLM p95 ms", "{:.0f}"),
+    ("similarity_ms", "benzerlik ms/ürün", "{:.3f}"),
+    ("export_xlsx_s", "xlsx sn", "{:.2f}"),
+    ("export_csv_s", "csv sn", "{:.2f}"),
+]
+
+
+def print_row(n, m, row):
+    print(f"\n{n} ürün (ürün başı aşamalar {m} örnekle)")
+    for key, label, fmt in COLUMNS:
+        print(f"  {label:<22} {fmt.format(row[key]):>10}")
+
+
+def compare(results, baseline, tolerance):
+    """Returns: gerileme satırları"""
+    regressions = []
+    for size, row in results.items():
+        base_row = baseline.get("sizes", {}).get(size)
+        if not base_row:
+            continue
+        for key, label, fmt in COLUMNS:
+            if key not in row or key not in base_row or not base_row[key]:
+                continue
+            cur, base = row[key], base_row[key]
+            # küçük boyutlarda ölçüm gürültüsü: mutlak fark önemsizse atla
+            floor = 0.05 if key.endswith("_s") else 0.5 if key.endswith("_ms") else 0
+            if abs(cur - base) < floor:
+                continue
+            change = (cur - base) / base
+            worse = change < -tolerance if key in HIGHER_IS_BETTER else change > tolerance
+            if worse:
+                regressions.append(f"{size} ürün / {label}: {fmt.format(base)} -> {fmt.format(cur)} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ağsız uçtan uca benchmark")
+    parser.add_argument("--sizes", default="10,1000,50000")
+    parser.add_argument("--sample", type=int, default=500, help="ürün başı aşamalar için en fazla ürün")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="OpenRouter taklidinin gecikmesi (sn)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--no-pipeline", action="store_true", help="aşamalı hat yerine ürün başı veri_cek")
+    parser.add_argument("--backend", choices=("thread", "process"), default=config.SCRAPE_BACKEND,
+                        help="sayfa çekme + ayıklama bu süreçte mi, süreç havuzunda mı")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    config.PIPELINE_ENABLED = not args.no_pipeline
+    config.SCRAPE_BACKEND = args.backend
+    block_network()
+
+    # önbellek, iş günlüğü ve loglar geçici klasöre yazılır
+    workdir = tempfile.mkdtemp(prefix="dm_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    os.makedirs("logs", exist_ok=True)
+    try:
+        results = run(sizes, args.sample, args.llm_latency)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "llm_latency": args.llm_latency, "sample": args.sample, "pipeline": config.PIPELINE_ENABLED,
+                 "backend": config.SCRAPE_BACKEND},
+        "sizes": results,
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline kaydedildi: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nBaseline yok ({args.baseline}); karşılaştırma için --save-baseline ile oluşturun")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("llm_latency") != args.llm_latency:
+        print("\nUyarı: baseline farklı LLM gecikmesiyle ölçülmüş")
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ Gerileme (tolerans %{args.tolerance * 100:.0f}):")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\n✅ Baseline'a göre gerileme yok (tolerans %{args.tolerance * 100:.0f})")
+
+
+if __name__ == "__main__":
+    main()
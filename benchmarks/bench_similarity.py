@@ -0,0 +1,68 @@
+"""
+Benzerlik backend'leri karşılaştırması (difflib / shingle / token_set)
+Kullanım: python benchmarks/bench_similarity.py [çift_sayısı]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity_checker import SimilarityChecker
+
+def make_vocab(rng, size=3000):
+    letters = "abcdefghijklmnopqrstuvwxyzäöüß"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 11))) for _ in range(size)]
+
+
+def make_pairs(rng, vocab, count, words):
+    """
+    Her DM açıklaması 3 AI metniyle eşleşir (başlık, bullet, HTML gibi):
+    kelimelerin ~%60'ı korunmuş, gerisi yeniden yazılmış.
+    """
+    pairs = []
+    for _ in range(count // 3 or 1):
+        dm = " ".join(rng.choice(vocab) for _ in range(words))
+        for _ in range(3):
+            kept = [w if rng.random() < 0.6 else rng.choice(vocab) for w in dm.split()]
+            ai = "<ul>" + "".join(f"<li>{' '.join(kept[i:i + 12])}</li>" for i in range(0, len(kept), 12)) + "</ul>"
+            pairs.append((dm, ai))
+    return pairs
+
+
+def run(pairs):
+    rows = []
+    for backend in ("difflib", "shingle", "token_set"):
+        checker = SimilarityChecker(backend=backend)
+        t = time.perf_counter()
+        single = [checker.similarity(dm, ai) for dm, ai in pairs]
+        t_single = time.perf_counter() - t
+
+        t = time.perf_counter()
+        checker.check_many(pairs)
+        t_batch = time.perf_counter() - t
+
+        rows.append((backend, t_single, t_batch, sum(single) / len(single)))
+    return rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(42)
+    vocab = make_vocab(rng)
+
+    for words in (50, 300, 1200):
+        pairs = make_pairs(rng, vocab, count, words)
+        count = len(pairs)
+        print(f"\n{count} çift, ~{words} kelime/açıklama")
+        print(f"{'backend':<10} {'tekil (ms/çift)':>16} {'check_many (ms/çift)':>22} {'ort. skor':>10}")
+        base = None
+        for backend, t_single, t_batch, avg in run(pairs):
+            base = base or t_single
+            print(f"{backend:<10} {t_single / count * 1000:>16.3f} {t_batch / count * 1000:>22.3f} "
+                  f"{avg:>10.3f}   x{base / t_single:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Yerel OpenRouter taklidi (benchmark'lar için, ağ gerektirmez)
+/api/v1/chat/completions isteklerine ayarlanabilir gecikmeyle geçerli yanıt döner.
+Kullanım: python benchmarks/fake_openrouter.py [--port 8765] [--latency 0.2] [--error-rate 0.05]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_NAME = re.compile(r"Produktname:\s*(.+)")
+
+
+def _content(prompt):
+    """Birleşik listing isteğine JSON, tekil isteklere düz metin"""
+    m = _NAME.search(prompt)
+    name = m.group(1).strip() if m else "Produkt"
+    words = name.split()
+
+    if "JSON-Objekt" in prompt:
+        return json.dumps({
+            "title": f"{name} Pflege Qualität"[:80],
+            "bullets": [f"Vorteil {i}: {' '.join(words[:3])} für den täglichen Gebrauch" for i in range(1, 6)],
+            "html": "<ul>" + "".join(f"<li>Merkmal {i} von {name}</li>" for i in range(1, 5)) + "</ul>"
+                    f"<p>{name} überzeugt im Alltag durch einfache Anwendung.</p>",
+            "specifications": {"marke": words[0] if words else "", "produktart": "Pflege"},
+        }, ensure_ascii=False)
+    if "Bullet" in prompt or "bullet" in prompt:
+        return "\n".join(f"- Vorteil {i} für {name}" for i in range(1, 6))
+    if "HTML" in prompt:
+        return f"<ul><li>{name}</li></ul><p>{name} im Alltag.</p>"
+    return f"{name} Qualität"[:80]
+
+
+class FakeOpenRouter:
+    """
+    with FakeOpenRouter(latency=0.1) as server:
+        config.OPENROUTER_URL = server.url
+    error_rate oranında 429 (Retry-After: 0) döner; yeniden deneme yolunu da ölçmek için.
+    """
+
+    def __init__(self, port=0, latency=0.1, jitter=0.0, error_rate=0.0, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    fail = fake._rng.random() < fake.error_rate
+                    delay = max(0.0, fake.latency + fake._rng.uniform(-fake.jitter, fake.jitter))
+                time.sleep(delay)
+
+                if fail:
+                    payload = {"error": {"message": "rate limited"}}
+                    status = 429
+                else:
+                    prompt = body.get("messages", [{}])[-1].get("content", "")
+                    payload = {"choices": [{"message": {"role": "assistant", "content": _content(prompt)}}]}
+                    status = 200
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/v1/chat/completions"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel OpenRouter taklidi")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeOpenRouter(args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Dinleniyor: {server.url}  (OPENROUTER_URL olarak ayarlayın)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
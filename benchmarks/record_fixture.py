@@ -0,0 +1,45 @@
+"""
+Gerçek bir dm.de ürün sayfasını benchmark fixture'ı olarak kaydet (ağ gerekir)
+Kullanım: python benchmarks/record_fixture.py URL [dosya_adı.html]
+"""
+import os
+import re
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import extractor
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    url = sys.argv[1]
+    name = sys.argv[2] if len(sys.argv) > 2 else re.sub(r"[^a-z0-9]+", "_", url.lower().split("/")[-1])[:60] + ".html"
+
+    resp = requests.get(url, timeout=config.HTTP_TIMEOUT, headers={
+        "User-Agent": config.HTTP_USER_AGENT,
+        "Accept-Language": "de-DE,de;q=0.9",
+    })
+    resp.raise_for_status()
+
+    fields = extractor.extract(resp.text, fallback_fields=config.REQUIRED_FIELDS)
+    missing = [k for k in config.REQUIRED_FIELDS if not fields.get(k)]
+    if missing:
+        print(f"Uyarı: sayfada eksik alanlar {missing} (Selenium gerektiren sayfa olabilir)")
+
+    path = os.path.join(FIXTURE_DIR, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(resp.text)
+    print(f"Kaydedildi: {path} ({len(resp.text) // 1024} KB) - {fields['dm_baslik']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,13 +25,15 @@ pyinstaller --onedir ^
   --hidden-import=selenium.webdriver.chrome.options ^
   --hidden-import=webdriver_manager ^
   --hidden-import=webdriver_manager.chrome ^
-  --hidden-import=bs4 ^
+  --hidden-import=lxml ^
   --hidden-import=flask ^
   --hidden-import=flask_cors ^
   --hidden-import=dotenv ^
   --hidden-import=webview ^
   --hidden-import=openpyxl ^
   --hidden-import=requests ^
+  --hidden-import=psutil ^
+  --hidden-import=orjson ^
   --collect-all selenium ^
   --collect-all webdriver_manager ^
   --collect-all openpyxl ^
@@ -44,6 +46,21 @@ copy /Y config.py dist\DM_eBay_Exporter\
 copy /Y openrouter_client.py dist\DM_eBay_Exporter\
 copy /Y similarity_checker.py dist\DM_eBay_Exporter\
 copy /Y ebay_excel_exporter.py dist\DM_eBay_Exporter\
+copy /Y driver_pool.py dist\DM_eBay_Exporter\
+copy /Y batch_jobs.py dist\DM_eBay_Exporter\
+copy /Y scrape_cache.py dist\DM_eBay_Exporter\
+copy /Y extractor.py dist\DM_eBay_Exporter\
+copy /Y llm_cache.py dist\DM_eBay_Exporter\
+copy /Y image_store.py dist\DM_eBay_Exporter\
+copy /Y price_refresh.py dist\DM_eBay_Exporter\
+copy /Y metrics.py dist\DM_eBay_Exporter\
+copy /Y scraper.py dist\DM_eBay_Exporter\
+copy /Y cli.py dist\DM_eBay_Exporter\
+copy /Y crawler.py dist\DM_eBay_Exporter\
+copy /Y url_index.py dist\DM_eBay_Exporter\
+copy /Y pipeline.py dist\DM_eBay_Exporter\
+copy /Y process_backend.py dist\DM_eBay_Exporter\
+copy /Y product.py dist\DM_eBay_Exporter\
 
 echo.
 echo [4/5] .env dosyasi kopyalaniyor...
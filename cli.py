@@ -0,0 +1,229 @@
+"""
+Komut Satırı Toplu Çalıştırma
+Arayüz (pywebview) ve Flask olmadan: URL listesi -> çekme (+ AI) -> XLSX/CSV, aynı süreç içinde.
+Ekransız Linux sunucularda zamanlanmış çalıştırmalar için.
+
+Kullanım:
+  python cli.py urls.txt -o exports/gece.xlsx
+  cat urls.txt | python cli.py - -o gece.csv --workers 6 --mode http
+  python cli.py urls.txt -o gece.xlsx --ai --template ebay_template_clean.xlsx --sheet Cat-Tagespflege
+  python cli.py --resume <job_id> -o gece.xlsx      # yarıda kalan işi günlükten devam ettir
+  echo https://www.dm.de/pflege-und-parfum/gesicht | python cli.py - -o yuz.xlsx --max-pages 20
+  python cli.py urls.txt -o gece.csv --backend process --processes 8   # süreç başına bir Chrome
+
+Girdideki kategori/arama URL'leri önce taranır, bulunan ürünler listeye eklenir.
+
+Çıkış kodu: 0 tüm ürünler başarılı, 1 bazı ürünler başarısız, 2 başarılı ürün yok ya da girdi hatası
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import config
+
+
+def read_urls(source):
+    """Dosya ya da stdin ('-'); boş satırlar ve # yorumları atlanır, sıra korunarak tekilleştirilir"""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        urls = [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return list(dict.fromkeys(urls))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DM -> eBay toplu export (arayüzsüz)")
+    parser.add_argument("input", nargs="?", default="-", help="URL dosyası (satır başına bir URL) ya da '-' (stdin)")
+    parser.add_argument("-o", "--output", help="çıktı dosyası (.xlsx ya da .csv); varsayılan exports/ebay_export_<zaman>.xlsx")
+    parser.add_argument("--format", choices=("xlsx", "csv"), help="çıktı uzantısından çıkarılmazsa")
+    parser.add_argument("--workers", type=int,
+                        help="paralel sayfa çeken worker (varsayılan: PIPELINE_FETCH_WORKERS ya da BATCH_WORKERS)")
+    parser.add_argument("--drivers", type=int, default=config.DRIVER_POOL_SIZE, help="aynı anda açık Chrome sayısı")
+    parser.add_argument("--backend", choices=("thread", "process"), default=config.SCRAPE_BACKEND,
+                        help="process: sayfalar ayrı süreçlerde çekilir (süreç başına bir Chrome)")
+    parser.add_argument("--processes", type=int, default=config.SCRAPE_PROCESSES,
+                        help="--backend process ile en fazla süreç sayısı (bellek/gecikmeye göre uyarlanır)")
+    parser.add_argument("--mode", choices=("auto", "http", "selenium"), default=config.SCRAPE_MODE)
+    parser.add_argument("--refresh", action="store_true", help="önbelleği atla, sayfaları yeniden çek")
+    parser.add_argument("--max-pages", type=int, default=config.CRAWL_MAX_PAGES,
+                        help="kategori/arama URL'si başına taranacak en fazla sayfa")
+    parser.add_argument("--ai", action=argparse.BooleanOptionalAction, default=None,
+                        help="AI zenginleştirme (varsayılan: config/AI_ENABLED)")
+    parser.add_argument("--no-images", action="store_true", help="görsel doğrulamayı atla")
+    parser.add_argument("--template", help="başlıkların okunacağı eBay şablonu (.xlsx)")
+    parser.add_argument("--sheet", help="şablon sayfası (varsayılan: en çok kolonu olan)")
+    parser.add_argument("--chunk-rows", type=int, default=config.CSV_CHUNK_ROWS, help="CSV'yi parçalara böl")
+    parser.add_argument("--delimiter", default=config.CSV_DELIMITER)
+    parser.add_argument("--resume", metavar="JOB_ID", help="günlüğü olan işi devam ettir (girdi okunmaz)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="ürün başı ilerleme satırlarını yazma")
+    parser.add_argument("-v", "--verbose", action="store_true", help="ayrıntılı log")
+    return parser.parse_args(argv)
+
+
+def output_path(args):
+    fmt = args.format
+    if args.output:
+        ext = os.path.splitext(args.output)[1].lower().lstrip(".")
+        fmt = fmt or (ext if ext in ("xlsx", "csv") else "xlsx")
+        return args.output, fmt
+    fmt = fmt or "xlsx"
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join("exports", f"ebay_export_{ts}.{fmt}"), fmt
+
+
+def export(products, headers, path, fmt, args):
+    """Returns: yazılan dosya yolları"""
+    from ebay_excel_exporter import export_products_csv, iter_csv, write_xlsx
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    if fmt == "xlsx":
+        write_xlsx(products, headers, path)
+        return [path]
+
+    if args.chunk_rows > 0:
+        files = export_products_csv(products, headers, out_dir=folder or ".",
+                                    chunk_rows=args.chunk_rows, delimiter=args.delimiter)
+        return [p for p, _ in files]
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in iter_csv(products, headers, delimiter=args.delimiter):
+            f.write(chunk)
+    return [path]
+
+
+def kesfet(urls, args):
+    """Kategori/arama URL'lerini ürün URL'lerine aç; ürün URL'leri olduğu gibi kalır"""
+    from crawler import ayir, urunleri_kesfet
+
+    products, listings = ayir(urls)
+    if not listings:
+        return products
+
+    def on_page(page_url, count, total):
+        if not args.quiet:
+            print(f"  tarandı: {page_url} ({count} ürün, toplam {total})", file=sys.stderr)
+
+    print(f"{len(listings)} kategori/arama listesi taranıyor...", file=sys.stderr)
+    start = time.perf_counter()
+    found = urunleri_kesfet(listings, mode=args.mode, refresh=args.refresh,
+                            max_pages=args.max_pages, on_page=on_page)
+    print(f"{len(found)} ürün bulundu ({time.perf_counter() - start:.1f} sn)", file=sys.stderr)
+    return products + found
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+
+    # config modülü diğer modüller import edilmeden önce ayarlanır (havuz/istemci boyutları buradan okunur)
+    config.DRIVER_POOL_SIZE = max(1, args.drivers)
+    config.SCRAPE_BACKEND = args.backend
+    config.SCRAPE_PROCESSES = max(1, args.processes)
+    if args.ai is not None:
+        config.AI_ENABLED = args.ai
+    if args.no_images:
+        config.IMAGE_CHECK_ENABLED = False
+
+    from scraper import toplu_is_yoneticisi
+    from url_index import tekillestir
+
+    headers = config.EXPORT_HEADERS
+    if args.template:
+        from ebay_excel_exporter import load_template_headers
+        try:
+            headers = load_template_headers(args.template, args.sheet)
+        except (OSError, ValueError) as e:
+            print(f"Şablon okunamadı: {e}", file=sys.stderr)
+            return 2
+
+    manager = toplu_is_yoneticisi(max_workers=max(1, args.workers) if args.workers else None)
+    if args.resume:
+        job = manager.resume(args.resume)
+        if not job:
+            print(f"İş günlüğü bulunamadı: {args.resume}", file=sys.stderr)
+            return 2
+    else:
+        try:
+            urls = read_urls(args.input)
+        except OSError as e:
+            print(f"Girdi okunamadı: {e}", file=sys.stderr)
+            return 2
+        if not urls:
+            print("URL listesi boş", file=sys.stderr)
+            return 2
+        urls = kesfet(urls, args)
+        if not urls:
+            print("Listelerde ürün bulunamadı", file=sys.stderr)
+            return 2
+        urls, duplicates = tekillestir(urls)
+        if duplicates:
+            print(f"{len(duplicates)} tekrar eden URL atlandı (aynı EAN / kanonik URL)", file=sys.stderr)
+        job = manager.submit(urls, {"mode": args.mode, "refresh": args.refresh})
+
+    total = len(job.urls)
+    if manager.pipeline:
+        workers = " -> ".join(f"{s['stage']}×{s['workers']}" for s in manager.pipeline.stats())
+    else:
+        workers = f"{manager.max_workers} worker"
+    print(f"İş {job.id}: {total} URL, {workers}, mod={job.options.get('mode', args.mode)}", file=sys.stderr)
+
+    start = time.perf_counter()
+    for _, event, data in job.iter_events(heartbeat=30):
+        if event is None:
+            print(f"  ... {job.done}/{total}", file=sys.stderr)
+        elif event == "result" and not args.quiet:
+            p = data["product"]
+            mark = "✓" if p.get("success") else "✗"
+            detail = p.get("kaynak", "") if p.get("success") else str(p.get("error", ""))[:120]
+            took = (p.get("sureler") or {}).get("total")
+            took = f" {took:.1f}s" if took is not None else ""
+            print(f"[{data['done']}/{total}] {mark} {p.get('url')} ({detail}){took}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    results = [r for r in job.results if r is not None]
+    ok = [r for r in results if r.get("success")]
+    failed = [r for r in results if not r.get("success")]
+
+    files = []
+    if ok:
+        path, fmt = output_path(args)
+        files = export(ok, headers, path, fmt, args)
+
+    sources = Counter(r.get("kaynak", "?") for r in ok)
+    print("\n=== Özet ===")
+    print(f"İş:         {job.id}")
+    print(f"Toplam:     {total}")
+    print(f"Başarılı:   {len(ok)}  ({', '.join(f'{k}: {v}' for k, v in sources.most_common()) or '-'})")
+    print(f"Başarısız:  {len(failed)}")
+    for r in failed[:10]:
+        print(f"  ✗ {r.get('url')}: {str(r.get('error') or r.get('message'))[:200]}")
+    if len(failed) > 10:
+        print(f"  ... ve {len(failed) - 10} tane daha")
+    print(f"Süre:       {elapsed:.1f} sn ({len(results) / elapsed * 60:.0f} ürün/dk)" if elapsed > 0 else "")
+    for f in files:
+        print(f"Çıktı:      {f}")
+    if failed and config.BATCH_JOURNAL_DIR:
+        print(f"Başarısızları tekrar denemek için: python cli.py --resume {job.id} -o ...")
+
+    if not ok:
+        return 2
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
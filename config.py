@@ -4,6 +4,166 @@ import os
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "").strip()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
 
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
+OPENROUTER_TIMEOUT = 60
+AI_TEMPERATURE = 0.7
+AI_MAX_TOKENS = 800
+
+# AI zenginleştirme: "combined" tek JSON isteği, "separate" başlık/bullet/HTML ayrı ayrı
+AI_ENABLED = os.getenv("AI_ENABLED", "0") == "1"
+AI_MODE = "combined"
+
+# LLM yanıt önbelleği (model + sıcaklık + max_tokens + prompt hash'i ile)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join("cache", "llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Benzerlik (kopya) kontrolü: backend "shingle" | "token_set" | "difflib"
+SIMILARITY_BACKEND = "shingle"
+SIMILARITY_NGRAM = 3            # shingle backend'i için kelime n-gram uzunluğu
+# Skorlar backend'e göre farklı ölçeklerde: eşik backend başına
+SIMILARITY_THRESHOLD = {
+    "shingle": 0.10,    # AI 3-gram'larının %10'undan fazlası DM'de geçiyorsa (~100 kelimede tek 12+ kelimelik kopya cümle)
+    "token_set": 0.60,  # ortak kelimeler (die, Haut, Mango...) baştan yazılmış metinde de ~0.3-0.4 tutar
+    "difflib": 0.50,    # baştan yazılmış metin ~0.1-0.3, kopya ~0.8+
+}
+SIMILARITY_GATE_ENABLED = True  # AI açıksa her ürünün AI metni DM metniyle karşılaştırılır
+SIMILARITY_RETRY = True         # TOO_SIMILAR ise bir kez önbelleksiz yeniden ürettir
+
+# eBay özel alanları (specifications anahtarları)
+SPEC_FIELDS = [
+    "marke",
+    "produktart",
+    "formulierung",
+    "wirksame_inhaltsstoffe",
+    "herstellernummer",
+    "anzahl_tabletten",
+    "hauptverwendungszweck",
+    "inhaltsstoffe",
+    "versorgung",
+]
+
+# OpenRouter taşıma katmanı: yeniden deneme, hız sınırı, eşzamanlılık
+OPENROUTER_MAX_RETRIES = 4
+OPENROUTER_BACKOFF_BASE = 1.0     # sn, her denemede 2 katına çıkar
+OPENROUTER_BACKOFF_MAX = 30.0
+OPENROUTER_RATE_PER_SEC = 2.0     # tüm thread'ler için ortak istek/sn
+OPENROUTER_BURST = 4
+OPENROUTER_CONCURRENCY = 4        # aynı anda açık istek sayısı
+
+# Selenium sürücü havuzu
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "3"))   # aynı anda açık Chrome sayısı
+DRIVER_MAX_PAGES = 50          # bu kadar sayfadan sonra sürücü yenilenir
+DRIVER_ACQUIRE_TIMEOUT = 120   # boş sürücü beklerken en fazla (sn)
+DRIVER_PRESTART = 1            # açılışta önceden başlatılacak sürücü sayısı
+
+# Sayfa çekme yolu: "auto" (önce HTTP, eksikse Selenium) | "http" | "selenium"
+SCRAPE_MODE = os.getenv("SCRAPE_MODE", "auto")
+REQUIRED_FIELDS = ["dm_baslik", "fiyat", "ean", "resimler"]   # eksikse Selenium'a düşülür
+HTTP_TIMEOUT = 10
+HTTP_POOL_SIZE = 10
+HTTP_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+# Ürün önbelleği (SQLite)
+CACHE_ENABLED = True
+CACHE_DB_PATH = os.path.join("cache", "urun_cache.sqlite3")
+CACHE_TTL_SECONDS = 3 * 24 * 3600   # 0 = süresiz
+# kanonik URL -> EAN dizini: aynı ürünün farklı URL'leri çekimden önce tekilleştirilir
+URL_INDEX_PATH = os.path.join("cache", "url_index.sqlite3")
+
+# Görsel kontrolü: resimler paralel HEAD ile doğrulanır, kırık olanlar export'a girmez
+IMAGE_CHECK_ENABLED = True
+IMAGE_MIRROR_ENABLED = False      # True: görseller ayrıca yerel klasöre indirilir (hash ile tekilleştirilir)
+IMAGE_DB_PATH = os.path.join("cache", "image_cache.sqlite3")
+IMAGE_DIR = os.path.join("cache", "images")
+IMAGE_CHECK_TTL_SECONDS = 24 * 3600
+IMAGE_WORKERS = 8
+IMAGE_TIMEOUT = 10
+
+# Selenium tarama profili: "fast" gereksiz kaynakları engeller ve eager yükleme kullanır
+SCRAPE_PROFILE = os.getenv("SCRAPE_PROFILE", "fast")
+SCRAPE_PROFILES = {
+    "full": {
+        "page_load_strategy": "normal",
+        "block_urls": [],
+        "wait_selectors": [],
+        "wait_timeout": 0,
+    },
+    "fast": {
+        "page_load_strategy": "eager",
+        "block_urls": [
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+            "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+            "*.mp4", "*.webm",
+            "*media.dm-static.com/images*",
+            "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+            "*facebook.net*", "*hotjar.com*", "*criteo.*", "*usercentrics.eu*",
+        ],
+        # ayıklayıcının okuduğu alanlar (extractor.FIELD_XPATHS)
+        "wait_selectors": [".text-xxl span.text-color2", ".pdd_1qsttl15 div:nth-of-type(2)"],
+        "wait_timeout": 5,
+    },
+}
+
+# Toplu çekme (/urun/batch)
+BATCH_WORKERS = DRIVER_POOL_SIZE   # paralel işlenen ürün sayısı
+BATCH_KEEP_JOBS = 20               # bellekte tutulan bitmiş iş sayısı
+BATCH_JOURNAL_DIR = "jobs"         # iş başına JSONL günlüğü ("" = kapalı)
+BATCH_AUTO_RESUME = True           # açılışta yarım kalan işleri günlükten devam ettir
+REFRESH_WORKERS = HTTP_POOL_SIZE   # fiyat/stok güncelleme çoğunlukla tarayıcısız HTTP ile
+
+# Aşamalı toplu iş hattı: getir -> görsel -> AI -> benzerlik -> kaydet (pipeline.py)
+# Her aşamanın kendi worker sayısı var, aralarında sınırlı kuyruklar; dolunca önceki aşama bekler.
+# Kapalıysa her ürün BATCH_WORKERS thread'inde baştan sona sırayla işlenir.
+PIPELINE_ENABLED = True
+PIPELINE_QUEUE_SIZE = 16
+PIPELINE_FETCH_WORKERS = HTTP_POOL_SIZE          # Selenium'a düşenler yine havuz boyutuyla sınırlı
+PIPELINE_IMAGE_WORKERS = 4
+PIPELINE_AI_WORKERS = OPENROUTER_CONCURRENCY
+PIPELINE_SIMILARITY_WORKERS = 1                  # CPU işi (GIL)
+
+# Sayfa çekme backend'i: "thread" (ana süreçteki sürücü havuzu) | "process" (process_backend.py)
+# process: her süreç kendi Chrome'u ve ayrıştırıcısıyla çalışır; süreç sayısı bellek, gecikme ve
+# hata oranına göre SCRAPE_PROCESSES_START ile SCRAPE_PROCESSES arasında uyarlanır.
+SCRAPE_BACKEND = os.getenv("SCRAPE_BACKEND", "thread")
+SCRAPE_PROCESSES = int(os.getenv("SCRAPE_PROCESSES", str(min(os.cpu_count() or 2, 8))))
+SCRAPE_PROCESSES_START = 2
+SCRAPE_PROCESS_IDLE_SECONDS = 60   # sınırın üstünde bu kadar boş kalan süreç kapatılır
+ADAPTIVE_WINDOW = 20               # sınır bu kadar sonuçta bir yeniden değerlendirilir
+ADAPTIVE_ERROR_RATE = 0.2          # pencerede bu oranın üstünde hata: sınır azalır
+ADAPTIVE_LATENCY_FACTOR = 2.0      # medyan gecikme en iyi pencerenin bu katını aşarsa: sınır azalır
+MEMORY_RESERVE_MB = 1024           # sistemde en az bu kadar boş bellek kalmalı
+BROWSER_MEMORY_MB = 400            # yeni süreç (Chrome dahil) için gereken tahmini bellek
+
+# Kategori/arama taraması: liste sayfalarından ürün URL'leri bulunur (crawler.py)
+CRAWL_WORKERS = 4                  # aynı anda çekilen liste sayfası
+CRAWL_MAX_PAGES = 100              # liste başına en fazla sayfa
+CRAWL_PAGE_PARAM = "currentPage"   # sayfada "sonraki" linki yoksa kullanılan sayfa parametresi
+CRAWL_DB_PATH = os.path.join("cache", "crawl_cache.sqlite3")
+CRAWL_CACHE_TTL_SECONDS = 12 * 3600   # 0 = süresiz
+CRAWL_WAIT_TIMEOUT = 10            # Selenium'da ürün linklerinin gelmesi için beklenen süre (sn)
+
+# CSV (eBay File Exchange) export
+CSV_DELIMITER = ","
+CSV_CHUNK_ROWS = 0     # >0 ise dosyalar en fazla bu kadar satırlık parçalara bölünür
+
+# Export kolonları eBay şablonundan okunabilir (uygulama klasöründeki .xlsx dosyası).
+# Boşsa aşağıdaki EXPORT_HEADERS kullanılır; sayfa boşsa en çok kolonu olan kategori sayfası seçilir.
+EXPORT_TEMPLATE = os.environ.get("EXPORT_TEMPLATE", "")
+EXPORT_TEMPLATE_SHEET = os.environ.get("EXPORT_TEMPLATE_SHEET", "")
+
+# Fiyat/stok güncelleme exportu: sadece değişen ürünler, Revise aksiyonu, SKU ile eşleşir
+REVISE_HEADERS = [
+    "*Action(SiteID=Germany|Country=DE|Currency=EUR|Version=1193)",
+    "Custom label (SKU)",
+    "Start price",
+    "Quantity",
+]
+
 EXPORT_HEADERS = [
     "*Action(SiteID=Germany|Country=DE|Currency=EUR|Version=1193)",
     "Custom label (SKU)",
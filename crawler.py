@@ -0,0 +1,351 @@
+"""
+Kategori / Arama Taraması
+dm.de kategori ya da arama listelerinden ürün URL'lerini bulur. Sayfalama sınırlı sayıda
+worker ile paralel izlenir; her liste sayfasının sonucu önbelleğe alınır.
+Bulunan URL'ler doğrudan veri_cek / toplu işe verilir.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import config
+import metrics
+from url_index import ean_from_url, get_url_index
+
+logger = logging.getLogger(__name__)
+
+# href'lerde ve sayfaya gömülü JSON'da geçen ürün yolları: /...-p4066447241658.html
+_PRODUCT_PATH = re.compile(r"""(?:https?://[^\s"'<>\\]+)?/[^\s"'<>\\?#]*-p\d{8,14}\.html""")
+_NEXT_LINK = re.compile(
+    r"""<(?:link|a)\b[^>]*\brel=["']next["'][^>]*>""", re.IGNORECASE)
+_HREF = re.compile(r"""\bhref=["']([^"']+)["']""", re.IGNORECASE)
+
+
+def urun_urlsi_mi(url: str) -> bool:
+    """Ürün sayfası mı (URL EAN içerir), yoksa kategori/arama listesi mi"""
+    return bool(ean_from_url(url))
+
+
+def liste_ayikla(html: str, page_url: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Liste sayfasından ürün URL'leri (sayfadaki sırayla, tekil) ve varsa "sonraki sayfa" linki.
+    Returns: (urls, next_url)
+    """
+    parts = urlsplit(page_url)
+    urls: Dict[str, str] = {}
+    for m in _PRODUCT_PATH.finditer(html):
+        full = urljoin(page_url, m.group(0).replace("&amp;", "&"))
+        p = urlsplit(full)
+        if p.netloc.lower() != parts.netloc.lower():
+            continue
+        key = ean_from_url(full)
+        urls.setdefault(key, urlunsplit((p.scheme, p.netloc.lower(), p.path, "", "")))
+
+    next_url = None
+    m = _NEXT_LINK.search(html)
+    if m:
+        href = _HREF.search(m.group(0))
+        if href:
+            next_url = urljoin(page_url, href.group(1).replace("&amp;", "&"))
+    return list(urls.values()), next_url
+
+
+def _page_param(page_url: str, next_url: Optional[str]) -> Tuple[str, int]:
+    """
+    İlk sayfanın "sonraki" linkinden sayfa parametresini ve 2. sayfanın değerini çıkar
+    (0 ya da 1 tabanlı numaralandırma fark etmez). Link yoksa config'deki parametre, 1'den.
+    """
+    if next_url:
+        base = dict(parse_qsl(urlsplit(page_url).query))
+        for key, value in parse_qsl(urlsplit(next_url).query):
+            if value.isdigit() and base.get(key) != value:
+                return key, int(value)
+    return config.CRAWL_PAGE_PARAM, 1
+
+
+def sayfa_urlsi(listing_url: str, index: int, param: str, second: int) -> str:
+    """index 0 = liste URL'sinin kendisi; index n = param=second+n-1"""
+    if index == 0:
+        return listing_url
+    parts = urlsplit(listing_url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != param]
+    query.append((param, str(second + index - 1)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class ListingCache:
+    """Liste sayfası URL'si -> bulunan ürün URL'leri, sonraki sayfa linki, kaynak (SQLite, thread başına bağlantı)"""
+
+    def __init__(self, path: str = None, ttl: float = None):
+        self.path = path or config.CRAWL_DB_PATH
+        self.ttl = config.CRAWL_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " urls TEXT NOT NULL,"
+            " next_url TEXT,"
+            " kaynak TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[Tuple[List[str], Optional[str], str]]:
+        row = self._conn().execute(
+            "SELECT urls, next_url, kaynak, fetched_at FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        hit = bool(row) and (self.ttl <= 0 or time.time() - row[3] < self.ttl)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return (json.loads(row[0]), row[1], row[2]) if hit else None
+
+    def put(self, url: str, urls: List[str], next_url: Optional[str], kaynak: str):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO pages (url, urls, next_url, kaynak, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, json.dumps(urls), next_url, kaynak, time.time()),
+        )
+        conn.commit()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM pages")
+        conn.commit()
+
+    def stats(self) -> Dict:
+        entries = self._conn().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "ttl_seconds": self.ttl,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_listing_cache() -> ListingCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ListingCache()
+        return _cache
+
+
+def _selenium_liste(url: str) -> str:
+    """Liste JS ile dolduruluyorsa: ürün linkleri DOM'a gelene kadar bekle"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+    from driver_pool import get_pool
+
+    with get_pool().acquire() as driver:
+        with metrics.timer("page_load", kind="listing"):
+            driver.get(url)
+            try:
+                WebDriverWait(driver, config.CRAWL_WAIT_TIMEOUT).until(
+                    lambda d: d.find_elements(By.CSS_SELECTOR, "a[href*='-p'][href$='.html']")
+                )
+                # tembel yüklenen kartlar için sayfa sonuna in
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
+            except TimeoutException:
+                logger.info(f"Liste sayfasında ürün linki gelmedi: {url}")
+        return driver.page_source
+
+
+def liste_sayfasi(url: str, mode: str = None, refresh: bool = False) -> Tuple[List[str], Optional[str], str]:
+    """
+    Tek liste sayfası: önbellek, sonra HTTP; auto modda link yoksa Selenium.
+    Returns: (urls, next_url, kaynak)
+    """
+    from scraper import http_html
+
+    cache = get_listing_cache()
+    if not refresh:
+        cached = cache.get(url)
+        if cached is not None:
+            return cached
+
+    mode = mode or config.SCRAPE_MODE
+    urls, next_url, kaynak = [], None, "http"
+    with metrics.timer("crawl_page"):
+        if mode in ("auto", "http"):
+            try:
+                urls, next_url = liste_ayikla(http_html(url), url)
+            except Exception as e:
+                if mode == "http":
+                    raise
+                logger.warning(f"Liste HTTP yolu başarısız ({e}), Selenium'a geçiliyor")
+        if not urls and mode != "http":
+            urls, next_url = liste_ayikla(_selenium_liste(url), url)
+            kaynak = "selenium"
+
+    metrics.inc("crawl_pages_total", kaynak=kaynak, sonuc="ok" if urls else "empty")
+    # boş sayfa önbelleğe alınmaz: geçici bir engel/hata kategoriyi TTL boyunca gizlemesin
+    # (listenin gerçek son sayfası her taramada bir kez daha çekilir)
+    if urls:
+        cache.put(url, urls, next_url, kaynak)
+    return urls, next_url, kaynak
+
+
+def urunleri_kesfet(
+    listing_urls: List[str],
+    mode: str = None,
+    refresh: bool = False,
+    max_pages: int = None,
+    workers: int = None,
+    on_page: Callable[[str, int, int], None] = None,
+    on_urls: Callable[[List[str]], None] = None,
+) -> List[str]:
+    """
+    Liste URL'lerinin tüm sayfalarını tarar, ürün URL'lerini döner (liste ve sayfa sırasıyla, EAN'a göre tekil).
+    İlk sayfadan sonra sayfalar worker sayısı kadar ileriye paralel çekilir; ürün getirmeyen ya da
+    yeni ürün getirmeyen ilk sayfada o liste biter (fazladan çekilen en fazla workers-1 sayfa).
+    on_page(page_url, sayfadaki ürün, toplam bulunan) her sayfa sırası geldiğinde çağrılır.
+    on_urls(yeni_urls) aynı anda o sayfanın listeye yeni kattığı ürün URL'leriyle çağrılır
+    (tarama bitmeden çekime başlamak için; listeler arası tekrarlar ayıklanmamıştır).
+    """
+    max_pages = max_pages or config.CRAWL_MAX_PAGES
+    workers = workers or config.CRAWL_WORKERS
+    listings = list(dict.fromkeys(u.strip() for u in listing_urls if u.strip()))
+    if not listings:
+        return []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl") as executor:
+        state = list(executor.map(lambda u: _ilk_sayfa(u, mode, refresh, max_pages), listings))
+        total = 0
+        for s in state:
+            total += len(s["found"])
+            if on_page:
+                on_page(s["url"], len(s["found"]), total)
+            if on_urls and s["found"]:
+                on_urls(list(s["found"]))
+
+        pending = {}
+
+        def fill():
+            while len(pending) < workers:
+                candidates = [s for s in state if s["next"] < s["stop"]]
+                if not candidates:
+                    return
+                # en az ilerlemiş listeye öncelik: listeler eşit hızda ilerler
+                s = min(candidates, key=lambda x: x["next"] - x["cursor"])
+                index = s["next"]
+                s["next"] += 1
+                page_url = sayfa_urlsi(s["url"], index, s["param"], s["second"])
+                pending[executor.submit(_try_page, page_url, s["mode"], refresh)] = (s, index, page_url)
+
+        def advance(s):
+            nonlocal total
+            # sayfalar sırayla değerlendirilir: bitiş kararı önceki sayfalara göre verilir
+            while s["cursor"] < s["stop"] and s["cursor"] in s["done"]:
+                page_url, urls = s["done"].pop(s["cursor"])
+                new = [u for u in urls if ean_from_url(u) not in s["seen"]]
+                if not new:
+                    s["stop"] = s["cursor"]
+                    return
+                s["seen"].update(ean_from_url(u) for u in new)
+                s["found"] += new
+                total += len(new)
+                if on_page:
+                    on_page(page_url, len(urls), total)
+                if on_urls:
+                    on_urls(new)
+                s["cursor"] += 1
+
+        for s in state:
+            advance(s)
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                s, index, page_url = pending.pop(future)
+                s["done"][index] = (page_url, future.result()[0])
+                advance(s)
+            fill()
+
+    # aynı ürün birden fazla listede olabilir: ilk geçtiği yer kalır
+    index = get_url_index()
+    found: Dict[str, str] = {}
+    for s in state:
+        for u in s["found"]:
+            found.setdefault(index.key(u), u)
+    logger.info(f"🔎 {len(listings)} listeden {len(found)} ürün bulundu")
+    return list(found.values())
+
+
+def _ilk_sayfa(url: str, mode: str, refresh: bool, max_pages: int) -> Dict:
+    """
+    İlk sayfa ve sayfalama düzeni. "Sonraki" linki yoksa parametrenin 0 mı 1 mi tabanlı olduğu
+    param=1 sayfasının ilk sayfayla aynı olup olmadığına bakılarak anlaşılır.
+    """
+    urls, next_url, kaynak = _try_page(url, mode, refresh)
+    param, second = _page_param(url, next_url)
+    state = {
+        "url": url, "found": list(urls), "param": param, "second": second,
+        # auto modda sonraki sayfalar ilk sayfanın geldiği yoldan çekilir; son (boş) sayfa
+        # tarayıcısız yolda boş geldi diye her seferinde Selenium açılmasın
+        "mode": kaynak if urls and (mode or config.SCRAPE_MODE) == "auto" else mode,
+        "seen": set(ean_from_url(u) for u in urls),
+        "stop": max_pages if urls else 1, "next": 1, "cursor": 1, "done": {},
+    }
+    if urls and not next_url and max_pages > 1:
+        probe = sayfa_urlsi(url, 1, param, 1)
+        probe_urls = _try_page(probe, state["mode"], refresh)[0]
+        if any(ean_from_url(u) not in state["seen"] for u in probe_urls):
+            state["done"][1] = (probe, probe_urls)
+            state["next"] = 2
+        elif probe_urls:
+            state["second"] = 2
+        else:
+            state["stop"] = 1
+    return state
+
+
+def _try_page(url: str, mode: str, refresh: bool) -> Tuple[List[str], Optional[str], str]:
+    try:
+        return liste_sayfasi(url, mode, refresh)
+    except Exception as e:
+        logger.error(f"❌ Liste sayfası çekilemedi {url}: {e}")
+        metrics.inc("errors_total", stage="crawl")
+        return [], None, ""
+
+
+def ayir(urls: List[str]) -> Tuple[List[str], List[str]]:
+    """Girilen URL'leri ürün ve liste URL'leri olarak ayır. Returns: (urun_urls, liste_urls)"""
+    products, listings = [], []
+    for u in urls:
+        (products if urun_urlsi_mi(u) else listings).append(u)
+    return products, listings
@@ -0,0 +1,203 @@
+"""
+Chrome WebDriver Havuzu
+Headless Chrome sürücülerini istekler arasında sıcak tutup yeniden kullanır
+"""
+import atexit
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+
+import config
+import metrics
+
+# selenium ve webdriver_manager ilk kullanımda import edilir (açılışı yavaşlatmasın)
+
+logger = logging.getLogger(__name__)
+
+
+def scrape_profile() -> dict:
+    return config.SCRAPE_PROFILES.get(config.SCRAPE_PROFILE, config.SCRAPE_PROFILES["full"])
+
+
+def _chrome_options(profile: dict):
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.page_load_strategy = profile["page_load_strategy"]
+    if profile["block_urls"]:
+        # görsel URL'leri DOM'dan okunur, indirilmelerine gerek yok
+        options.add_argument("--blink-settings=imagesEnabled=false")
+    return options
+
+
+def _block_resources(driver, patterns):
+    """Chrome DevTools Protocol ile gereksiz istekleri ağ katmanında engelle"""
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.warning(f"Kaynak engelleme etkinleştirilemedi: {e}")
+
+
+class DriverPool:
+    """Sınırlı, thread-safe headless Chrome havuzu"""
+
+    def __init__(self, size: int = None, max_pages: int = None, acquire_timeout: float = None):
+        self.size = config.DRIVER_POOL_SIZE if size is None else size
+        self.max_pages = max_pages or config.DRIVER_MAX_PAGES
+        self.acquire_timeout = acquire_timeout or config.DRIVER_ACQUIRE_TIMEOUT
+
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self._pages = {}
+        self._closed = False
+
+    def driver_path(self) -> str:
+        """chromedriver yolunu bir kez çözümle (ChromeDriverManager her çağrıda ağa çıkar)"""
+        with self._lock:
+            if self._driver_path is None:
+                from webdriver_manager.chrome import ChromeDriverManager
+                self._driver_path = ChromeDriverManager().install()
+                logger.info(f"chromedriver hazır: {self._driver_path}")
+            return self._driver_path
+
+    def warmup(self, count: int = None):
+        """
+        Sürücü yolunu çözümle ve havuzu önceden doldur.
+        Her sürücü acquire() ile aynı slot sayacından açılır: ısıtma sırasında gelen isteklerle
+        birlikte havuzdaki Chrome sayısı size'ı aşmaz. Boş slot yoksa (havuz zaten kullanımda) durur.
+        """
+        count = config.DRIVER_PRESTART if count is None else count
+        started = 0
+        try:
+            self.driver_path()
+            for _ in range(min(count, self.size)):
+                if not self._slots.acquire(blocking=False):
+                    break
+                try:
+                    with self._lock:
+                        full = len(self._pages) >= self.size
+                    if full:
+                        break
+                    self._idle.put(self._new_driver())
+                    started += 1
+                finally:
+                    self._slots.release()
+            logger.info(f"Sürücü havuzu ısıtıldı ({started}/{self.size})")
+        except Exception as e:
+            logger.error(f"Sürücü havuzu ısıtılamadı: {e}")
+
+    def _new_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        profile = scrape_profile()
+        with metrics.timer("driver_start"):
+            driver = webdriver.Chrome(service=Service(self.driver_path()), options=_chrome_options(profile))
+            _block_resources(driver, profile["block_urls"])
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _is_alive(self, driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _take(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_driver()
+            if self._is_alive(driver):
+                return driver
+            logger.warning("Ölü sürücü havuzdan atıldı")
+            metrics.inc("errors_total", stage="driver_dead")
+            self._discard(driver)
+
+    def _give_back(self, driver, failed: bool):
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+
+        if self._closed:
+            self._discard(driver)
+        elif pages >= self.max_pages:
+            logger.info(f"Sürücü {pages} sayfa sonra yenileniyor")
+            self._discard(driver)
+        elif failed and not self._is_alive(driver):
+            logger.warning("Çöken sürücü havuzdan atıldı")
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def acquire(self):
+        """Havuzdan bir sürücü ödünç al; blok bitince geri verilir"""
+        if self._closed:
+            raise RuntimeError("Sürücü havuzu kapatıldı")
+        with metrics.timer("driver_acquire"):
+            acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        if not acquired:
+            metrics.inc("errors_total", stage="driver_acquire")
+            raise TimeoutError(f"{self.acquire_timeout} sn içinde boş sürücü bulunamadı")
+
+        driver = None
+        failed = False
+        try:
+            driver = self._take()
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if driver is not None:
+                self._give_back(driver, failed)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            alive = len(self._pages)
+        return {"size": self.size, "alive": alive, "idle": self._idle.qsize()}
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> DriverPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
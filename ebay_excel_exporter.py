@@ -1,15 +1,33 @@
+import csv
+import functools
+import io
+import logging
 import os
 import re
+import time
+import zipfile
 from datetime import datetime
+from xml.etree import ElementTree
 from openpyxl import Workbook
 
+import config
+import metrics
+from product import Product
+
+logger = logging.getLogger(__name__)
+
+_SAFE_PRICE = re.compile(r"[^\d,\.]")
+_SLUG = re.compile(r"[^a-z0-9äöüß]+")
+
+ACTION_PREFIX = "*action("
+
 def _safe_price(price_str):
     if price_str is None:
         return ""
     s = str(price_str).strip()
     if not s:
         return ""
-    clean = re.sub(r"[^\d,\.]", "", s).replace(",", ".")
+    clean = _SAFE_PRICE.sub("", s).replace(",", ".")
     return clean
 
 def _join_images(images):
@@ -17,61 +35,323 @@ def _join_images(images):
         return ""
     return "|".join(images[:12])
 
-def _resolve(header, product):
-    # başarısızsa sadece Title alanına hata yaz
-    if not product.get("success"):
-        if header == "Title":
-            return f"HATA: {product.get('error') or product.get('message') or 'Bilinmeyen hata'}"
-        return ""
 
-    specs = (product.get("specifications") or {})
-    manufacturer = (product.get("manufacturer") or {})
-    images = product.get("resimler") or []
-
-    mapping = {
-        "*Action(SiteID=Germany|Country=DE|Currency=EUR|Version=1193)": "Add",
-        "Custom label (SKU)": product.get("ean", ""),
-        "Title": (product.get("ebay_title") or product.get("dm_baslik") or "")[:80],
-        "P:EAN": product.get("ean", ""),
-        "Start price": _safe_price(product.get("fiyat") or product.get("price")),
-        "Quantity": "1",
-        "Item photo URL": _join_images(images),
-        "Description": product.get("html_description", ""),
-
-        "C:Marke": specs.get("marke", ""),
-        "C:Formulierung": specs.get("formulierung", ""),
-        "C:Wirksame Inhaltsstoffe": specs.get("wirksame_inhaltsstoffe", ""),
-        "C:Produktart": specs.get("produktart", ""),
-        "C:Herstellernummer": specs.get("herstellernummer", ""),
-        "C:Anzahl der Tabletten": specs.get("anzahl_tabletten", ""),
-        "C:Hauptverwendungszweck": specs.get("hauptverwendungszweck", ""),
-        "C:Inhaltsstoffe": specs.get("inhaltsstoffe", ""),
-        "C:Versorgung": specs.get("versorgung", ""),
-
-        "Manufacturer Name": manufacturer.get("name", ""),
-        "Manufacturer AddressLine1": manufacturer.get("address_line1", ""),
-        "Manufacturer City": manufacturer.get("city", ""),
-        "Manufacturer Country": manufacturer.get("country", ""),
-        "Manufacturer PostalCode": manufacturer.get("postal_code", ""),
-    }
-
-    return mapping.get(header, "")
+def _const(value):
+    return lambda p: value
 
-def export_products_xlsx(products, headers, out_dir="exports"):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Export"
 
-    # header
-    ws.append(headers)
+def _field(key):
+    return lambda p: p.get(key, "")
+
+
+def _spec(key):
+    return lambda p: (p.get("specifications") or {}).get(key, "")
+
+
+def _manufacturer(key):
+    return lambda p: (p.get("manufacturer") or {}).get(key, "")
+
+
+# başlık (küçük harf) -> ürün sözlüğünden değer okuyan erişimci
+COLUMN_ACCESSORS = {
+    "custom label (sku)": _field("ean"),
+    "title": lambda p: (p.get("ebay_title") or p.get("dm_baslik") or "")[:80],
+    "p:ean": _field("ean"),
+    "start price": lambda p: _safe_price(p.get("fiyat") or p.get("price")),
+    # stokta yoksa 0 (Revise ile ilan durdurulur)
+    "quantity": lambda p: "0" if p.get("stok") == "OutOfStock" else "1",
+    "item photo url": lambda p: _join_images(p.get("resimler") or []),
+    "description": _field("html_description"),
+
+    "c:wirksame inhaltsstoffe": _spec("wirksame_inhaltsstoffe"),
+    "c:anzahl der tabletten": _spec("anzahl_tabletten"),
+
+    "manufacturer name": _manufacturer("name"),
+    "manufacturer addressline1": _manufacturer("address_line1"),
+    "manufacturer city": _manufacturer("city"),
+    "manufacturer country": _manufacturer("country"),
+    "manufacturer postalcode": _manufacturer("postal_code"),
+}
+
 
-    # rows
+def _compile_column(header, action):
+    key = header.strip().lower()
+    if key.startswith(ACTION_PREFIX):
+        return _const(action)
+    if key in COLUMN_ACCESSORS:
+        return COLUMN_ACCESSORS[key]
+    if key.startswith("c:"):
+        # diğer özel alanlar: "C:Geschmack" -> specifications["geschmack"]
+        return _spec(_SLUG.sub("_", key[2:]).strip("_"))
+    return _const("")
+
+
+class ColumnPlan:
+    """
+    Başlık listesi bir kez derlenir: her kolon için önceden seçilmiş erişimci.
+    Satır üretimi sadece bu erişimcileri sırayla çağırır.
+    """
+
+    def __init__(self, headers, action="Add"):
+        self.headers = list(headers)
+        self.action = action
+        self._accessors = [_compile_column(h, action) for h in self.headers]
+        self._title_index = next((i for i, h in enumerate(self.headers) if h.strip().lower() == "title"), None)
+
+    def row(self, product):
+        # başarısızsa sadece Title alanına hata yaz
+        if not product.get("success"):
+            row = [""] * len(self.headers)
+            if self._title_index is not None:
+                row[self._title_index] = f"HATA: {product.get('error') or product.get('message') or 'Bilinmeyen hata'}"
+            return row
+        return [f(product) for f in self._accessors]
+
+    def rows(self, products):
+        """Başlık satırı + her ürün için bir satır (aynı EAN tek satırda birleştirilir)"""
+        yield list(self.headers)
+        row = self.row
+        busy = 0.0
+        try:
+            for p in tekil_ean(products):
+                start = time.perf_counter()
+                values = row(p)
+                busy += time.perf_counter() - start
+                yield values
+        finally:
+            # ürün bekleme ve yazma hariç, sadece satır üretme süresi
+            metrics.observe("stage_seconds", busy, stage="export_rows")
+
+
+def _birlestir(first, later):
+    """Aynı EAN'lı iki satır: fiyat/stok daha yeni olandan, resimler ikisinden (tekrarsız), gerisi ilkinden"""
+    merged = Product(first)
+    # fiyat güncellemesinin zaman damgası varsa o karar verir, yoksa sonraki satır daha yenidir
+    if (later.get("fiyat_kontrol") or 0) >= (first.get("fiyat_kontrol") or 0):
+        for key in ("fiyat", "stok", "fiyat_kontrol"):
+            if later.get(key) not in (None, ""):
+                merged[key] = later[key]
+    images = list(dict.fromkeys([*(first.get("resimler") or []), *(later.get("resimler") or [])]))
+    if images:
+        merged["resimler"] = images
+    return merged
+
+
+def tekil_ean(products):
+    """
+    Custom label (SKU) EAN'dır; eBay aynı SKU'yu bir dosyada iki kez kabul etmez.
+    Aynı EAN'lı başarılı ürünler ilkinin yerinde tek satırda birleştirilir (_birlestir).
+    Aynı EAN listenin sonunda da çıkabileceği için ürünlerin hepsi okunduktan sonra üretilir.
+    Başarısız ve EAN'sız ürünler olduğu gibi geçer.
+    """
+    slots = []
+    index = {}
+    merged = 0
     for p in products:
-        row = [_resolve(h, p) for h in headers]
-        ws.append(row)
+        ean = p.get("ean") if p.get("success") else None
+        i = index.get(ean) if ean else None
+        if i is None:
+            if ean:
+                index[ean] = len(slots)
+            slots.append(p)
+        else:
+            slots[i] = _birlestir(slots[i], p)
+            merged += 1
+    if merged:
+        logger.info(f"🔁 Export: aynı EAN'lı {merged} ürün önceki satırla birleştirildi")
+        metrics.inc("export_duplicates_total", merged)
+    yield from slots
+
+
+def _resolve(header, product):
+    """Tek hücre (eski API); toplu kullanımda ColumnPlan tercih edilmeli"""
+    return ColumnPlan([header]).row(product)[0]
+
+
+def _plan(headers, action="Add"):
+    """headers başlık listesi ya da önceden derlenmiş bir ColumnPlan olabilir"""
+    return headers if isinstance(headers, ColumnPlan) else ColumnPlan(headers, action)
+
 
+def iter_rows(products, headers, action="Add"):
+    return _plan(headers, action).rows(products)
+
+
+# --- eBay kategori şablonları ---
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+def _col_index(ref):
+    n = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _iter_template_headers(path, max_rows=30):
+    """
+    Şablondaki her sayfanın '*Action(' ile başlayan başlık satırını bul.
+    eBay şablonlarının stil tablosunu openpyxl okuyamadığı için xlsx XML'i doğrudan okunur.
+    Yields: (sayfa_adı, [başlıklar])
+    """
+    with zipfile.ZipFile(path) as z:
+        strings = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            for _, el in ElementTree.iterparse(z.open("xl/sharedStrings.xml")):
+                if el.tag == _NS + "si":
+                    strings.append("".join(t.text or "" for t in el.iter(_NS + "t")))
+                    el.clear()
+
+        workbook = ElementTree.parse(z.open("xl/workbook.xml")).getroot()
+        rels = ElementTree.parse(z.open("xl/_rels/workbook.xml.rels")).getroot()
+        targets = {r.get("Id"): r.get("Target") for r in rels}
+
+        for sheet in workbook.iter(_NS + "sheet"):
+            target = targets[sheet.get(_REL_NS + "id")].lstrip("/")
+            if not target.startswith("xl/"):
+                target = "xl/" + target
+
+            for row_no, (_, el) in enumerate(
+                    (e for e in ElementTree.iterparse(z.open(target)) if e[1].tag == _NS + "row"), 1):
+                cells = {}
+                for c in el.iter(_NS + "c"):
+                    v = c.find(_NS + "v")
+                    if c.get("t") == "s" and v is not None:
+                        cells[_col_index(c.get("r"))] = strings[int(v.text)]
+                    elif c.get("t") == "inlineStr":
+                        cells[_col_index(c.get("r"))] = "".join(t.text or "" for t in c.iter(_NS + "t"))
+                    elif v is not None:
+                        cells[_col_index(c.get("r"))] = v.text
+                el.clear()
+
+                if str(cells.get(0, "")).lower().startswith(ACTION_PREFIX):
+                    yield sheet.get("name"), [cells.get(i, "") for i in range(max(cells) + 1)]
+                    break
+                if row_no >= max_rows:
+                    break
+
+
+@functools.lru_cache(maxsize=16)
+def _template_headers_cached(path, mtime):
+    return tuple(_iter_template_headers(path))
+
+
+def template_sheets(path):
+    """Returns: {sayfa_adı: [başlıklar]}"""
+    return {name: headers for name, headers in _template_headers_cached(path, os.path.getmtime(path))}
+
+
+def load_template_headers(path, sheet=None):
+    """
+    Şablon sayfasının başlık satırı. sheet verilmezse en çok kolonu olan sayfa seçilir
+    (genel 'Listings' sayfaları yerine kategori sayfası).
+    """
+    sheets = template_sheets(path)
+    if not sheets:
+        raise ValueError(f"Şablonda başlık satırı bulunamadı: {path}")
+    if sheet:
+        if sheet not in sheets:
+            raise ValueError(f"Şablonda sayfa yok: {sheet}")
+        return sheets[sheet]
+    return max(sheets.values(), key=len)
+
+
+def _export_filename(ext):
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"ebay_export_{ts}.xlsx"
+    return f"ebay_export_{ts}.{ext}"
+
+
+def write_xlsx(products, headers, target):
+    """
+    write-only workbook: satırlar bellekte hücre nesnesi olarak tutulmaz.
+    openpyxl satırları geçici dosyada biriktirir, target ancak save() sırasında yazılır;
+    yani dosya ilk satırdan önce değil, tüm ürünler bittikten sonra hazır olur.
+    target dosya yolu ya da yazılabilir dosya nesnesi olabilir (seek gerekmez).
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Export")
+    busy = 0.0
+    count = -1
+    for row in iter_rows(products, headers):
+        start = time.perf_counter()
+        ws.append(row)
+        busy += time.perf_counter() - start
+        count += 1
+    start = time.perf_counter()
+    wb.save(target)
+    metrics.observe("stage_seconds", busy + time.perf_counter() - start, stage="export_xlsx")
+    metrics.inc("exported_rows_total", count, format="xlsx")
+
+
+def export_products_xlsx(products, headers, out_dir="exports"):
+    filename = _export_filename("xlsx")
     filepath = os.path.join(out_dir, filename)
-    wb.save(filepath)
+    write_xlsx(products, headers, filepath)
     return filepath, filename
+
+
+def iter_csv(products, headers, delimiter=None):
+    """
+    eBay File Exchange CSV'sini satır satır üret (yanıt parça parça gönderilir; ürün satırları
+    aynı EAN birleştirmesi için tüm ürünler okunduktan sonra başlar).
+    İlk parça UTF-8 BOM içerir; Excel ve eBay umlautları doğru okur.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=delimiter or config.CSV_DELIMITER, lineterminator="\r\n")
+    buf.write("\ufeff")
+    busy = 0.0
+    count = -1
+    try:
+        for row in iter_rows(products, headers):
+            start = time.perf_counter()
+            writer.writerow(row)
+            chunk = buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            busy += time.perf_counter() - start
+            count += 1
+            yield chunk
+    finally:
+        metrics.observe("stage_seconds", busy, stage="export_csv")
+        metrics.inc("exported_rows_total", max(count, 0), format="csv")
+
+
+def export_products_csv(products, headers, out_dir="exports", chunk_rows=None, delimiter=None):
+    """
+    CSV'yi out_dir'e yaz; chunk_rows verilirse en fazla o kadar ürün satırı içeren
+    parçalara böl (her parçada başlık satırı tekrar edilir).
+    Returns: [(filepath, filename), ...]
+    """
+    plan = _plan(headers)
+    base = _export_filename("csv")[:-4]
+    files = []
+    f = writer = None
+    rows_in_file = rows = 0
+    start = time.perf_counter()
+
+    try:
+        for p in tekil_ean(products):
+            if writer is None or (chunk_rows and rows_in_file >= chunk_rows):
+                if f:
+                    f.close()
+                filename = f"{base}_part{len(files) + 1:03d}.csv" if chunk_rows else f"{base}.csv"
+                filepath = os.path.join(out_dir, filename)
+                f = open(filepath, "w", encoding="utf-8-sig", newline="")
+                writer = csv.writer(f, delimiter=delimiter or config.CSV_DELIMITER, lineterminator="\r\n")
+                writer.writerow(plan.headers)
+                files.append((filepath, filename))
+                rows_in_file = 0
+            writer.writerow(plan.row(p))
+            rows_in_file += 1
+            rows += 1
+    finally:
+        if f:
+            f.close()
+        metrics.observe("stage_seconds", time.perf_counter() - start, stage="export_csv_files")
+        metrics.inc("exported_rows_total", rows, format="csv")
+
+    return files
@@ -0,0 +1,212 @@
+"""
+Ürün Sayfası Ayıklayıcı
+Alan seçicileri bir kez XPath'e derlenir, sayfa lxml ile tek kez ayrıştırılır
+"""
+import json
+import re
+from typing import Dict, List
+
+from lxml import etree, html as lxml_html
+
+
+def _cls(name: str) -> str:
+    """CSS '.name' seçicisinin XPath karşılığı"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# alan -> XPath (CSS karşılıkları yorumda)
+FIELD_XPATHS = {
+    # h1
+    "baslik": "(//h1)[1]",
+    # h1 span.font-bold
+    "marke": f"((//h1)[1]//span[{_cls('font-bold')}])[1]",
+    # .text-xxl span.text-color2
+    "fiyat": f"(//*[{_cls('text-xxl')}]//span[{_cls('text-color2')}])[1]",
+    # .gap-m div:nth-of-type(2) .whitespace-pre-line div
+    "aciklama": f"//*[{_cls('gap-m')}]//div[2]//*[{_cls('whitespace-pre-line')}]//div",
+    # .pdd_1qsttl15 div:nth-of-type(2)
+    "ean": f"(//*[{_cls('pdd_1qsttl15')}]//div[2])[1]",
+    # [data-dmid='Anschrift des Unternehmens-content'] .whitespace-pre-line div
+    "adres": f"(//*[@data-dmid='Anschrift des Unternehmens-content']//*[{_cls('whitespace-pre-line')}]//div)[1]",
+    # li:nth-of-type(1..10)
+    "galeri": "//li[position() <= 10]",
+    # script[type='application/ld+json']
+    "json_ld": "//script[@type='application/ld+json']/text()",
+}
+
+_COMPILED = {name: etree.XPath(xp) for name, xp in FIELD_XPATHS.items()}
+# li içindeki ".p-xxxs img"
+_GALERI_IMG = etree.XPath(f"(.//*[{_cls('p-xxxs')}]//img)[1]")
+_TEXTS = etree.XPath(".//text()")
+
+_NON_DIGIT = re.compile(r"[^0-9]")
+_CDN_SIZE = re.compile(r"h_\d+,w_\d+")
+_POSTAL = re.compile(r"(\d{4,5})\s+(.+)")
+_TEMIZLE = [
+    re.compile(r"dm-Artikelnummer:.*?(\n|$)", re.IGNORECASE),
+    re.compile(r"Dosierungsempfehlung:.*?(\n|$)", re.IGNORECASE),
+    re.compile(r"Hinweis:.*?(Hergestellt|$)", re.IGNORECASE | re.DOTALL),
+    re.compile(r"Hergestellt.*?(\n|$)", re.IGNORECASE),
+]
+
+
+def parse_manufacturer_info(text):
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    result = {
+        "name": lines[0] if len(lines) > 0 else "",
+        "address_line1": lines[1] if len(lines) > 1 else "",
+        "city": "",
+        "postal_code": "",
+        "country": "Deutschland"
+    }
+    for line in lines:
+        m = _POSTAL.search(line)
+        if m:
+            result["postal_code"] = m.group(1)
+            result["city"] = m.group(2)
+        if "deutschland" in line.lower():
+            result["country"] = "Deutschland"
+    return result
+
+
+def temizle_aciklama(text):
+    for pattern in _TEMIZLE:
+        text = pattern.sub("", text)
+    return text.strip()
+
+
+def buyuk_resim(src: str) -> str:
+    if src.startswith("/"):
+        src = "https://www.dm.de" + src
+    return _CDN_SIZE.sub("h_1200,w_1200", src)
+
+
+def _text(el, sep: str = "") -> str:
+    """BeautifulSoup get_text(sep, strip=True) karşılığı"""
+    if el is None:
+        return ""
+    return sep.join(t.strip() for t in _TEXTS(el) if t.strip())
+
+
+def _inline_text(el) -> str:
+    """
+    Satır içi öğelere bölünmüş metin (başlık): düğümler sayfadaki boşluklarıyla birleşir, boşluklar tekleşir.
+    "<span>Balea</span> Duschgel" -> "Balea Duschgel", "Bio-<b>Avocado</b>" -> "Bio-Avocado"
+    """
+    if el is None:
+        return ""
+    return " ".join("".join(_TEXTS(el)).split())
+
+
+def _first(nodes):
+    return nodes[0] if nodes else None
+
+
+def _images(li_nodes) -> List[str]:
+    # her li sırası (nth-of-type) için belge sırasındaki ilk görsel
+    seen_pos = set()
+    urls = []
+    for li in li_nodes:
+        pos = sum(1 for _ in li.itersiblings("li", preceding=True)) + 1
+        if pos in seen_pos:
+            continue
+        img = _first(_GALERI_IMG(li))
+        if img is None:
+            continue
+        seen_pos.add(pos)
+
+        src = img.get("src") or img.get("data-src") or ""
+        if not src and img.get("srcset"):
+            src = img.get("srcset").split(",")[0].strip().split(" ")[0]
+        if not src:
+            continue
+        src = buyuk_resim(src)
+        if src not in urls:
+            urls.append(src)
+    return urls
+
+
+def _json_ld_product(blocks) -> Dict:
+    """Sunucu tarafında gömülü schema.org Product verisi"""
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data])
+        for item in items:
+            if isinstance(item, dict) and item.get("@type") == "Product":
+                return item
+    return {}
+
+
+def _offers(product: Dict) -> Dict:
+    offers = product.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    return offers if isinstance(offers, dict) else {}
+
+
+def stok_durumu(product: Dict) -> str:
+    """schema.org availability: "https://schema.org/InStock" -> "InStock" """
+    return str(_offers(product).get("availability") or "").rsplit("/", 1)[-1]
+
+
+def marka(product: Dict) -> str:
+    """schema.org brand: {"@type": "Brand", "name": ...} ya da düz metin"""
+    brand = product.get("brand") or ""
+    if isinstance(brand, dict):
+        brand = brand.get("name") or ""
+    return str(brand).strip()
+
+
+def _json_ld_fields(product: Dict) -> Dict:
+    offers = _offers(product)
+
+    try:
+        fiyat = f"{float(offers.get('price')):.2f} €".replace(".", ",")
+    except (TypeError, ValueError):
+        fiyat = ""
+
+    images = product.get("image") or []
+    if isinstance(images, str):
+        images = [images]
+
+    return {
+        "dm_baslik": (product.get("name") or "").strip(),
+        "dm_aciklama": temizle_aciklama(product.get("description") or ""),
+        "fiyat": fiyat,
+        "ean": _NON_DIGIT.sub("", str(product.get("gtin13") or product.get("gtin") or "")),
+        "resimler": [buyuk_resim(u) for u in images if isinstance(u, str)][:10],
+    }
+
+
+def extract(html, fallback_fields=()) -> Dict:
+    """
+    Ürün sayfasından ham alanları çıkar.
+    fallback_fields içindeki alanlar DOM'da boşsa gömülü JSON-LD'den tamamlanır.
+    """
+    root = lxml_html.document_fromstring(html)
+    nodes = {name: xp(root) for name, xp in _COMPILED.items()}
+
+    fields = {
+        # marka ayrı span'de; get_text(strip=True) gibi düğümleri boşluksuz birleştirmek "BaleaDuschgel" verir
+        "dm_baslik": _inline_text(_first(nodes["baslik"])),
+        "dm_aciklama": temizle_aciklama("\n".join(_text(n, " ") for n in nodes["aciklama"])),
+        "fiyat": _text(_first(nodes["fiyat"])),
+        "ean": _NON_DIGIT.sub("", _text(_first(nodes["ean"]))),
+        "resimler": _images(nodes["galeri"]),
+        "manufacturer": parse_manufacturer_info(_text(_first(nodes["adres"]), "\n")),
+    }
+
+    # stok bilgisi DOM'da yok, sadece gömülü JSON-LD'de
+    product = _json_ld_product(nodes["json_ld"])
+    fields["stok"] = stok_durumu(product)
+    fields["marke"] = marka(product) or _text(_first(nodes["marke"]))
+
+    if any(not fields.get(k) for k in fallback_fields):
+        for key, value in _json_ld_fields(product).items():
+            if value and not fields.get(key):
+                fields[key] = value
+
+    return fields
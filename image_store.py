@@ -0,0 +1,224 @@
+"""
+Ürün Görselleri
+Görsel URL'lerini paralel doğrular ve sonuçları önbelleğe alır;
+istenirse görselleri içerik hash'i ile adreslenen yerel bir klasöre indirir
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+}
+
+
+class ImageStore:
+    """
+    checks tablosu: url -> son kontrol sonucu (HTTP durumu, içerik tipi, varsa hash).
+    Yerel kopyalar root/<hash[:2]>/<hash>.<uzantı> altında; aynı içerik bir kez saklanır.
+    """
+
+    def __init__(self, path: str = None, root: str = None, ttl: float = None, workers: int = None):
+        self.path = path or config.IMAGE_DB_PATH
+        self.root = root or config.IMAGE_DIR
+        self.ttl = config.IMAGE_CHECK_TTL_SECONDS if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        workers = workers or config.IMAGE_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image")
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({"User-Agent": config.HTTP_USER_AGENT, "Accept": "image/*"})
+
+        for folder in (os.path.dirname(self.path), self.root):
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS checks ("
+            " url TEXT PRIMARY KEY,"
+            " ok INTEGER NOT NULL,"
+            " status INTEGER,"
+            " content_type TEXT,"
+            " digest TEXT,"
+            " size INTEGER,"
+            " checked_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _cached(self, url: str, mirror: bool) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT ok, status, content_type, digest, size, checked_at FROM checks WHERE url = ?", (url,)
+        ).fetchone()
+        if not row or (self.ttl > 0 and time.time() - row[5] >= self.ttl):
+            return None
+        ok, status, content_type, digest, size, _ = row
+        # kopya istenmiş ama yoksa (ya da silinmişse) yeniden indir
+        if mirror and ok and not (digest and self.path_for(digest)):
+            return None
+        return {"url": url, "ok": bool(ok), "status": status, "content_type": content_type,
+                "digest": digest, "size": size}
+
+    def _save(self, result: Dict):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO checks (url, ok, status, content_type, digest, size, checked_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (result["url"], int(result["ok"]), result["status"], result["content_type"],
+             result["digest"], result["size"], time.time()),
+        )
+        conn.commit()
+
+    def path_for(self, digest: str) -> Optional[str]:
+        folder = os.path.join(self.root, digest[:2])
+        if not os.path.isdir(folder):
+            return None
+        for name in os.listdir(folder):
+            if name.startswith(digest):
+                return os.path.join(folder, name)
+        return None
+
+    def _head(self, url: str) -> requests.Response:
+        resp = self._session.head(url, timeout=config.IMAGE_TIMEOUT, allow_redirects=True)
+        if resp.status_code in (403, 405, 501):
+            # HEAD desteklemeyen sunucular: gövdeyi okumadan GET
+            resp = self._session.get(url, timeout=config.IMAGE_TIMEOUT, stream=True)
+            resp.close()
+        return resp
+
+    def _download(self, url: str, result: Dict) -> requests.Response:
+        """Gövdeyi geçici dosyaya yazarken hash'ler; aynı içerik zaten varsa yenisini atar"""
+        resp = self._session.get(url, timeout=config.IMAGE_TIMEOUT, stream=True)
+        with resp:
+            content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if resp.status_code != 200 or not content_type.startswith("image/"):
+                return resp
+
+            tmp = os.path.join(self.root, f".{threading.get_ident()}.part")
+            sha = hashlib.sha256()
+            size = 0
+            with open(tmp, "wb") as f:
+                for chunk in resp.iter_content(64 * 1024):
+                    sha.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            digest = sha.hexdigest()
+            if self.path_for(digest):
+                os.remove(tmp)
+            else:
+                os.makedirs(os.path.join(self.root, digest[:2]), exist_ok=True)
+                ext = _EXTENSIONS.get(content_type, "")
+                os.replace(tmp, os.path.join(self.root, digest[:2], digest + ext))
+            result["digest"] = digest
+            result["size"] = size
+        return resp
+
+    def check_one(self, url: str, mirror: bool = False) -> Dict:
+        """
+        Returns: {"url", "ok", "status", "content_type", "digest", "size"}
+        ok=None: ağ hatası nedeniyle doğrulanamadı (önbelleğe yazılmaz)
+        """
+        cached = self._cached(url, mirror)
+        self._count(cached is not None)
+        if cached:
+            return cached
+
+        result = {"url": url, "ok": None, "status": None, "content_type": None, "digest": None, "size": None}
+        try:
+            resp = self._download(url, result) if mirror else self._head(url)
+        except requests.RequestException as e:
+            logger.warning(f"Görsel kontrol edilemedi {url}: {e}")
+            result["error"] = str(e)
+            return result
+
+        content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        result["status"] = resp.status_code
+        result["content_type"] = content_type
+        result["ok"] = resp.status_code == 200 and content_type.startswith("image/")
+        if result["size"] is None and resp.headers.get("Content-Length", "").isdigit():
+            result["size"] = int(resp.headers["Content-Length"])
+        self._save(result)
+        return result
+
+    def check(self, urls: List[str], mirror: bool = False) -> List[Dict]:
+        """Tüm URL'leri paralel kontrol et; sonuçlar giriş sırasıyla döner"""
+        if not urls:
+            return []
+        return list(self._executor.map(lambda u: self.check_one(u, mirror), urls))
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM checks")
+        conn.commit()
+
+    def stats(self) -> Dict:
+        conn = self._conn()
+        entries, bad = conn.execute("SELECT COUNT(*), COALESCE(SUM(ok = 0), 0) FROM checks").fetchone()
+        files = 0
+        total_bytes = 0
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".part"):
+                    files += 1
+                    total_bytes += os.path.getsize(os.path.join(folder, name))
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "broken": bad,
+                "mirrored_files": files,
+                "mirrored_bytes": total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore()
+        return _store
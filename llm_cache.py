@@ -0,0 +1,134 @@
+"""
+LLM Yanıt Önbelleği
+Aynı model/parametre/prompt için OpenRouter'a tekrar gitmemek üzere yanıtları diskte saklar
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+    """İçerik adresli anahtar: parametrelerden biri değişirse anahtar da değişir"""
+    raw = json.dumps([model, temperature, max_tokens, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Boyut sınırlı, LRU tahliyeli SQLite yanıt önbelleği"""
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        self.path = path or config.LLM_CACHE_PATH
+        self.max_bytes = max_bytes or config.LLM_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        conn.commit()
+        self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not row:
+            return None
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        return row[0]
+
+    def put(self, key: str, response: str):
+        size = len(response.encode("utf-8"))
+        conn = self._conn()
+        old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, response, size, time.time()),
+        )
+        conn.commit()
+        with self._lock:
+            self._bytes += size - (old[0] if old else 0)
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        """En uzun süredir kullanılmayanları sınırın %90'ına inene kadar sil"""
+        target = int(self.max_bytes * 0.9)
+        conn = self._conn()
+        removed = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            with self._lock:
+                if self._bytes <= target:
+                    break
+                self._bytes -= size
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            removed += 1
+        conn.commit()
+        logger.info(f"LLM önbelleğinden {removed} kayıt tahliye edildi")
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        entries = self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
@@ -0,0 +1,204 @@
+"""
+Ölçümler
+Aşama süreleri, sayaçlar ve anlık değerler; /metrics üzerinden Prometheus metin formatında yayınlanır.
+Aşama süreleri ayrıca o anki ürünün sonuç sözlüğüne (sureler) yazılabilir.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+PREFIX = "dm_exporter_"
+
+# saniye; sayfa yükleme ve LLM çağrıları için üst kovalar geniş tutuldu
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels, extra: Tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items) + "}"
+
+
+class Registry:
+    """Thread-safe sayaç/histogram deposu; anlık değerler toplama anında callback'lerden okunur"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, List]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict, float]]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # [kova sayıları..., toplam, adet]
+            data = series.get(key)
+            if data is None:
+                data = series[key] = [0] * len(BUCKETS) + [0.0, 0]
+            idx = bisect.bisect_left(BUCKETS, seconds)
+            if idx < len(BUCKETS):
+                data[idx] += 1
+            data[-2] += seconds
+            data[-1] += 1
+
+    def counter_values(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            return {(name, key): value for name, series in self._counters.items() for key, value in series.items()}
+
+    def register_collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Dict, float]]]):
+        """fn() -> [(ad, "gauge"|"counter", açıklama, etiketler, değer), ...]"""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def header(name, kind, default_help=""):
+            help_text = self._help.get(name, (kind, default_help))[1]
+            if help_text:
+                lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {n: {k: list(v) for k, v in s.items()} for n, s in self._histograms.items()}
+            collectors = list(self._collectors)
+
+        for name in sorted(counters):
+            header(name, "counter")
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{PREFIX}{name}{_fmt_labels(labels)} {value:g}")
+
+        for name in sorted(histograms):
+            header(name, "histogram")
+            for labels, data in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, data):
+                    cumulative += count
+                    lines.append(f"{PREFIX}{name}_bucket{_fmt_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{PREFIX}{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {data[-1]}")
+                lines.append(f"{PREFIX}{name}_sum{_fmt_labels(labels)} {data[-2]:.6f}")
+                lines.append(f"{PREFIX}{name}_count{_fmt_labels(labels)} {data[-1]}")
+
+        gauges: Dict[str, List] = {}
+        for fn in collectors:
+            try:
+                for name, kind, help_text, labels, value in fn():
+                    gauges.setdefault(name, [kind, help_text, []])[2].append((_labels(labels), value))
+            except Exception:
+                # ölçüm toplama uygulamayı asla bozmamalı
+                continue
+        for name in sorted(gauges):
+            kind, help_text, series = gauges[name]
+            header(name, kind, help_text)
+            for labels, value in sorted(series):
+                lines.append(f"{PREFIX}{name}{_fmt_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+registry.describe("stage_seconds", "histogram", "Aşama süresi (sn): fetch, selenium, parse, image_check, ai, llm_call, export...")
+registry.describe("errors_total", "counter", "Aşama bazında hata sayısı")
+registry.describe("retries_total", "counter", "Yeniden deneme sayısı")
+registry.describe("products_total", "counter", "İşlenen ürünler (kaynak/sonuç)")
+registry.describe("fallbacks_total", "counter", "HTTP yolundan Selenium'a düşüşler")
+registry.describe("exported_rows_total", "counter", "Export edilen ürün satırları")
+registry.describe("export_duplicates_total", "counter", "Export'ta önceki satırla birleştirilen aynı EAN'lı ürünler")
+registry.describe("similarity_flags_total", "counter", "AI metni DM metnine fazla benzeyen ürünler")
+
+inc = registry.inc
+observe = registry.observe
+register_collector = registry.register_collector
+render = registry.render
+
+_local = threading.local()
+
+
+@contextmanager
+def product_timings(timings: Optional[Dict[str, float]] = None):
+    """
+    Bu thread'de işlenen ürünün aşama sürelerini topla.
+    timings verilirse ona eklenir (ürün aşamadan aşamaya thread değiştirirken).
+    Yields: {aşama: sn} sözlüğü (iç içe çağrılarda dıştaki kullanılır)
+    """
+    outer = getattr(_local, "timings", None)
+    if outer is not None:
+        yield outer
+        return
+    timings = {} if timings is None else timings
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = None
+
+
+@contextmanager
+def timer(stage: str, **labels):
+    """Aşama süresini histograma, ürün işleniyorsa ürünün sureler sözlüğüne de yaz"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("stage_seconds", elapsed, stage=stage, **labels)
+        timings: Optional[Dict] = getattr(_local, "timings", None)
+        if timings is not None:
+            timings[stage] = round(timings.get(stage, 0) + elapsed, 4)
+
+
+def record_timings(timings: Dict[str, float]):
+    """Başka bir süreçte ölçülmüş aşama sürelerini histograma ve bu thread'in ürün sürelerine ekle"""
+    current: Optional[Dict] = getattr(_local, "timings", None)
+    for stage, elapsed in timings.items():
+        observe("stage_seconds", elapsed, stage=stage)
+        if current is not None:
+            current[stage] = round(current.get(stage, 0) + elapsed, 4)
+
+
+@contextmanager
+def counter_changes():
+    """
+    Blok içinde artan sayaçları topla (çocuk süreçte; ana sürecin kaydına record_counters ile aktarılır).
+    Yields: [(ad, etiketler, artış), ...] listesi, blok bitince dolar
+    """
+    before = registry.counter_values()
+    changes: List[Tuple[str, Dict[str, str], float]] = []
+    try:
+        yield changes
+    finally:
+        for (name, key), value in registry.counter_values().items():
+            delta = value - before.get((name, key), 0)
+            if delta:
+                changes.append((name, dict(key), delta))
+
+
+def record_counters(changes: Iterable[Tuple[str, Dict[str, str], float]]):
+    """Başka bir süreçte artmış sayaçları bu sürecin kaydına ekle"""
+    for name, labels, value in changes:
+        inc(name, value, **labels)
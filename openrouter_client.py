@@ -2,14 +2,97 @@
 OpenRouter API İstemcisi
 ALMANCA metin üretimi için
 """
+import asyncio
+import json
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, List
 
 import requests
+from requests.adapters import HTTPAdapter
 import config
+import metrics
+from llm_cache import cache_key, get_llm_cache
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Thread'ler arası paylaşılan token bucket hız sınırlayıcı"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _retry_after(resp) -> Optional[float]:
+    """Retry-After başlığı (saniye ya da HTTP tarihi)"""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return min(config.OPENROUTER_BACKOFF_MAX, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        return min(config.OPENROUTER_BACKOFF_MAX, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_lock = threading.Lock()
+_session = None
+_limiter = None
+_executor = None
+_in_flight = threading.BoundedSemaphore(config.OPENROUTER_CONCURRENCY)
+
+
+def get_session() -> requests.Session:
+    """Keep-alive bağlantı havuzlu ortak oturum"""
+    global _session
+    with _shared_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_maxsize=config.OPENROUTER_CONCURRENCY))
+        return _session
+
+
+def get_rate_limiter() -> TokenBucket:
+    global _limiter
+    with _shared_lock:
+        if _limiter is None:
+            _limiter = TokenBucket(config.OPENROUTER_RATE_PER_SEC, config.OPENROUTER_BURST)
+        return _limiter
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _shared_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.OPENROUTER_CONCURRENCY, thread_name_prefix="openrouter")
+        return _executor
+
 
 class OpenRouterClient:
     """OpenRouter API istemcisi"""
@@ -19,14 +102,24 @@ class OpenRouterClient:
         self.url = config.OPENROUTER_URL
         self.model = config.OPENROUTER_MODEL
         self.timeout = config.OPENROUTER_TIMEOUT
-        self.last_error: Optional[str] = None
+        # istemci thread'ler arasında paylaşılır: son hata, isteği atan thread'e özel
+        self._local = threading.local()
 
         if not self.api_key:
             logger.error("OPENROUTER_API_KEY bulunamadı!")
 
+    @property
+    def last_error(self) -> Optional[str]:
+        """Bu thread'deki son _call_api çağrısının hatası"""
+        return getattr(self._local, "error", None)
+
+    @last_error.setter
+    def last_error(self, value: Optional[str]):
+        self._local.error = value
+
     def test_connection(self) -> Dict:
         """API bağlantısını test et"""
-        response = self._call_api(prompt="Antworte nur mit 'OK'.", max_tokens=10)
+        response = self._call_api(prompt="Antworte nur mit 'OK'.", max_tokens=10, use_cache=False)
 
         if response is None:
             return {"success": False, "message": self.last_error or "API yanıtı alınamadı"}
@@ -37,7 +130,9 @@ class OpenRouterClient:
         preview = response.strip().replace("\n", " ")
         return {"success": True, "message": f"API yanıtı alındı (beklenen 'OK' değil): {preview[:80]}"}
 
-    def _call_api(self, prompt: str, max_tokens: int = None, temperature: float = None) -> Optional[str]:
+    def _call_api(self, prompt: str, max_tokens: int = None, temperature: float = None,
+                  use_cache: bool = True) -> Optional[str]:
+        """use_cache=False önbelleği okumaz (yeni varyant), başarılı yanıt yine de yazılır"""
         self.last_error = None
 
         if not self.api_key:
@@ -58,44 +153,98 @@ class OpenRouterClient:
             "max_tokens": max_tokens if max_tokens is not None else config.AI_MAX_TOKENS,
         }
 
-        try:
-            resp = requests.post(self.url, headers=headers, json=payload, timeout=self.timeout)
-
-            if resp.status_code != 200:
-                self.last_error = f"HTTP {resp.status_code}: {resp.text[:300]}"
+        key = None
+        if config.LLM_CACHE_ENABLED:
+            key = cache_key(self.model, payload["temperature"], payload["max_tokens"], prompt)
+            if use_cache:
+                cached = get_llm_cache().get(key)
+                if cached is not None:
+                    return cached
+
+        retries = config.OPENROUTER_MAX_RETRIES
+        for attempt in range(retries + 1):
+            delay = None
+            get_rate_limiter().acquire()
+            try:
+                with _in_flight, metrics.timer("llm_call"):
+                    resp = get_session().post(self.url, headers=headers, json=payload, timeout=self.timeout)
+            except requests.Timeout:
+                self.last_error = "API timeout"
+            except requests.ConnectionError as e:
+                self.last_error = f"API bağlantı hatası: {e}"
+            except Exception as e:
+                self.last_error = f"API exception: {e}"
                 logger.error(self.last_error)
+                metrics.inc("errors_total", stage="llm")
                 return None
-
+            else:
+                if resp.status_code in RETRY_STATUS:
+                    self.last_error = f"HTTP {resp.status_code}: {resp.text[:300]}"
+                    delay = _retry_after(resp)
+                elif resp.status_code != 200:
+                    self.last_error = f"HTTP {resp.status_code}: {resp.text[:300]}"
+                    logger.error(self.last_error)
+                    metrics.inc("errors_total", stage="llm")
+                    return None
+                else:
+                    self.last_error = None
+                    content = self._parse_response(resp)
+                    if content and key:
+                        get_llm_cache().put(key, content)
+                    return content
+
+            if attempt == retries:
+                break
+            if delay is None:
+                delay = min(config.OPENROUTER_BACKOFF_MAX, config.OPENROUTER_BACKOFF_BASE * 2 ** attempt)
+                delay *= random.uniform(0.8, 1.2)
+            logger.warning(f"{self.last_error} -> {delay:.1f} sn sonra tekrar ({attempt + 1}/{retries})")
+            metrics.inc("retries_total", component="openrouter")
+            time.sleep(delay)
+
+        logger.error(self.last_error)
+        metrics.inc("errors_total", stage="llm")
+        return None
+
+    def _parse_response(self, resp) -> Optional[str]:
+        try:
             data = resp.json()
+        except ValueError:
+            self.last_error = f"API format hatası: {resp.text[:300]}"
+            logger.error(self.last_error)
+            return None
 
-            if "error" in data:
-                self.last_error = f"API error: {data['error']}"
-                logger.error(self.last_error)
-                return None
-
-            if "choices" not in data or not data["choices"]:
-                self.last_error = f"API format hatası: {str(data)[:300]}"
-                logger.error(self.last_error)
-                return None
-
-            content = data["choices"][0]["message"]["content"].strip()
-            if not content:
-                self.last_error = "API boş içerik döndürdü"
-                logger.error(self.last_error)
-                return None
-
-            return content
+        if "error" in data:
+            self.last_error = f"API error: {data['error']}"
+            logger.error(self.last_error)
+            return None
 
-        except requests.Timeout:
-            self.last_error = "API timeout"
+        if "choices" not in data or not data["choices"]:
+            self.last_error = f"API format hatası: {str(data)[:300]}"
             logger.error(self.last_error)
             return None
-        except Exception as e:
-            self.last_error = f"API exception: {e}"
+
+        content = (data["choices"][0]["message"]["content"] or "").strip()
+        if not content:
+            self.last_error = "API boş içerik döndürdü"
             logger.error(self.last_error)
             return None
 
-    def generate_ebay_title(self, product_name: str, brand: str = "", specs: str = "") -> str:
+        return content
+
+    def call_many(self, prompts: List[str], max_tokens: int = None, temperature: float = None,
+                  use_cache: bool = True) -> List[Optional[str]]:
+        """Birden çok prompt'u paralel gönder (eşzamanlılık ve hız sınırı ortak)"""
+        futures = [get_executor().submit(self._call_api, p, max_tokens, temperature, use_cache) for p in prompts]
+        return [f.result() for f in futures]
+
+    async def acall_api(self, prompt: str, max_tokens: int = None, temperature: float = None,
+                        use_cache: bool = True) -> Optional[str]:
+        """asyncio içinden kullanım için _call_api"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), self._call_api, prompt, max_tokens, temperature, use_cache)
+
+    def generate_ebay_title(self, product_name: str, brand: str = "", specs: str = "", fresh: bool = False) -> str:
         """eBay başlık üret (ALMANCA, max 80 karakter)"""
         prompt = f"""
 Erstelle einen eBay-Titel auf Deutsch für dieses Produkt.
@@ -115,17 +264,17 @@ REGELN:
 Antworte NUR mit dem Titel, nichts anderes.
 """.strip()
 
-        result = self._call_api(prompt, max_tokens=80, temperature=0.6)
+        result = self._call_api(prompt, max_tokens=80, temperature=0.6, use_cache=not fresh)
         if result:
             result = result.strip().strip('"').strip("'")
             if len(result) > 80:
                 result = result[:80]
             return result
 
-        fallback = f"{brand} {product_name}".strip()
-        return fallback[:80]
+        return _fallback_title(product_name, brand)
 
-    def generate_bullet_points(self, product_name: str, description: str, specs: Dict) -> List[str]:
+    def generate_bullet_points(self, product_name: str, description: str, specs: Dict,
+                               fresh: bool = False) -> List[str]:
         """Bullet points üret (ALMANCA, 4-6 adet)"""
         specs_text = "\n".join([f"{k}: {v}" for k, v in specs.items() if v]) or "keine"
 
@@ -151,7 +300,7 @@ Format:
 - Punkt 4
 """.strip()
 
-        result = self._call_api(prompt, max_tokens=300, temperature=0.7)
+        result = self._call_api(prompt, max_tokens=300, temperature=0.7, use_cache=not fresh)
 
         bullets: List[str] = []
         if result:
@@ -162,12 +311,10 @@ Format:
                     if b:
                         bullets.append(b[:160])
 
-        while len(bullets) < 4:
-            bullets.append(f"Hochwertige Qualität für {product_name}"[:160])
+        return _fallback_bullets(product_name, bullets)
 
-        return bullets[:6]
-
-    def generate_html_description(self, product_name: str, description: str, bullets: List[str], specs: Dict) -> str:
+    def generate_html_description(self, product_name: str, description: str, bullets: List[str], specs: Dict,
+                                  fresh: bool = False) -> str:
         """HTML açıklama üret (ALMANCA, eBay uyumlu)"""
         specs_text = "\n".join([f"{k}: {v}" for k, v in specs.items() if v])
         bullets_text = "\n".join([f"- {b}" for b in bullets])
@@ -191,9 +338,146 @@ REGELN:
 Antworte NUR mit HTML.
 """.strip()
 
-        result = self._call_api(prompt, max_tokens=700, temperature=0.7)
+        result = self._call_api(prompt, max_tokens=700, temperature=0.7, use_cache=not fresh)
         if result and "<" in result:
             return result.strip()
 
-        lis = "".join([f"<li>{b}</li>" for b in bullets[:6]])
-        return f"<ul>{lis}</ul><p>{product_name}</p>"
+        return _fallback_html(product_name, bullets)
+
+    def fallback_listing(self, product_name: str, specs: Dict, brand: str = "") -> Dict:
+        """API'ye gitmeden şablon metin (tekil metotların yanıt alamadığında kullandığı metinler)"""
+        bullets = _fallback_bullets(product_name, [])
+        return {
+            "ebay_title": _fallback_title(product_name, brand),
+            "bullet_points": bullets,
+            "html_description": _fallback_html(product_name, bullets),
+            "specifications": dict(specs),
+        }
+
+    def generate_listing(self, product_name: str, description: str, specs: Dict, brand: str = "",
+                         fresh: bool = False) -> Dict:
+        """
+        Başlık, bullet, HTML ve spesifikasyonları TEK istekte JSON olarak üret.
+        Doğrulamadan geçmeyen alanlar mevcut tekil metotlarla yeniden istenir; istek hiç yanıt
+        alamadıysa (bağlantı, 429/5xx tükendi) tekil isteklere geçilmez, RuntimeError fırlar.
+        Returns: {"ebay_title", "bullet_points", "html_description", "specifications"}
+        """
+        specs_text = "\n".join([f"{k}: {v}" for k, v in specs.items() if v]) or "keine"
+        spec_keys = ", ".join(f'"{k}"' for k in config.SPEC_FIELDS)
+
+        prompt = f"""
+Erstelle ein eBay-Angebot auf Deutsch für dieses Produkt.
+
+Produktname: {product_name}
+Marke: {brand or "unbekannt"}
+Originalbeschreibung (Auszug): {description[:800]}
+Bekannte Spezifikationen:
+{specs_text}
+
+Antworte NUR mit einem JSON-Objekt in genau diesem Format:
+{{
+  "title": "eBay-Titel, maximal 80 Zeichen, keine Anführungszeichen, keine Werbewörter wie NEU/ORIGINAL",
+  "bullets": ["4 bis 6 kurze, nutzerorientierte Vorteile ohne Wiederholungen"],
+  "html": "eBay-kompatibles HTML: zuerst <ul><li>..</li></ul>, danach 1-2 <p>; kein <script>/<style>; keine Wörter wie Beschreibung, SEO, DM, dm.de",
+  "specifications": {{{spec_keys}: "Wert oder leerer String"}}
+}}
+
+Nur Spezifikationen angeben, die aus den Produktdaten eindeutig hervorgehen.
+""".strip()
+
+        content = self._call_api(prompt, max_tokens=1400, temperature=0.6, use_cache=not fresh)
+        if content is None:
+            # kesinti sırasında 3 tekil istek daha atmak sadece bekleme süresini ve 429 baskısını artırır
+            raise RuntimeError(f"AI isteği başarısız: {self.last_error}")
+        data = _parse_json_object(content)
+
+        title = _valid_title(data.get("title"))
+        bullets = _valid_bullets(data.get("bullets"))
+        html = _valid_html(data.get("html"))
+        ai_specs = _valid_specs(data.get("specifications"))
+
+        failed = [name for name, value in (("title", title), ("bullets", bullets), ("html", html)) if value is None]
+        if failed:
+            logger.warning(f"Toplu üretimde geçersiz alanlar, tekil istek atılıyor: {failed}")
+
+        if title is None:
+            title = self.generate_ebay_title(product_name, brand, specs_text, fresh=fresh)
+        if bullets is None:
+            bullets = self.generate_bullet_points(product_name, description, specs, fresh=fresh)
+        if html is None:
+            html = self.generate_html_description(product_name, description, bullets, specs, fresh=fresh)
+
+        # sayfadan okunan değerler AI tahmininden önceliklidir
+        merged_specs = dict(specs)
+        for key, value in (ai_specs or {}).items():
+            if not merged_specs.get(key):
+                merged_specs[key] = value
+
+        return {
+            "ebay_title": title,
+            "bullet_points": bullets,
+            "html_description": html,
+            "specifications": merged_specs,
+        }
+
+
+def _fallback_title(product_name: str, brand: str = "") -> str:
+    # dm başlığı genelde markayla başlar: "Balea Balea Duschgel" olmasın
+    if brand and product_name.lower().startswith(brand.lower()):
+        brand = ""
+    return f"{brand} {product_name}".strip()[:80]
+
+
+def _fallback_bullets(product_name: str, bullets: List[str]) -> List[str]:
+    bullets = list(bullets)
+    while len(bullets) < 4:
+        bullets.append(f"Hochwertige Qualität für {product_name}"[:160])
+    return bullets[:6]
+
+
+def _fallback_html(product_name: str, bullets: List[str]) -> str:
+    lis = "".join([f"<li>{b}</li>" for b in bullets[:6]])
+    return f"<ul>{lis}</ul><p>{product_name}</p>"
+
+
+def _parse_json_object(text: Optional[str]) -> Dict:
+    """Model yanıtındaki ilk JSON nesnesini çıkar (```json blokları dahil)"""
+    if not text:
+        return {}
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _valid_title(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = value.strip().strip('"').strip("'")
+    return value[:80] if value else None
+
+
+def _valid_bullets(value) -> Optional[List[str]]:
+    if not isinstance(value, list):
+        return None
+    bullets = [b.strip().lstrip("-•* ").strip()[:160] for b in value if isinstance(b, str) and b.strip()]
+    return bullets[:6] if len(bullets) >= 4 else None
+
+
+def _valid_html(value) -> Optional[str]:
+    if not isinstance(value, str) or "<" not in value:
+        return None
+    lowered = value.lower()
+    if "<script" in lowered or "<style" in lowered:
+        return None
+    return value.strip()
+
+
+def _valid_specs(value) -> Optional[Dict[str, str]]:
+    if not isinstance(value, dict):
+        return None
+    return {k: str(v).strip() for k, v in value.items() if k in config.SPEC_FIELDS and isinstance(v, (str, int, float))}
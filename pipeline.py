@@ -0,0 +1,122 @@
+"""
+Aşamalı Toplu İş Hattı
+Ürünler sırayla aşamalardan geçer (getir -> görsel -> AI -> benzerlik -> kaydet). Her aşamanın kendi
+thread'leri ve önünde sınırlı bir kuyruğu var: sonraki aşama yetişemezse kuyruğu dolar ve önceki aşama
+bekler (backpressure). Chrome LLM'i, LLM Chrome'u beklemez; toplam süre aşamaların toplamına değil
+en yavaş aşamaya yaklaşır.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Item:
+    """Hattaki bir ürün: aşamalar result sözlüğünü doldurur"""
+
+    __slots__ = ("url", "options", "result", "timings", "started", "done")
+
+    def __init__(self, url: str, options: Dict, done: Callable[[Dict], None]):
+        self.url = url
+        self.options = options
+        self.result: Optional[Dict] = None
+        self.timings: Dict[str, float] = {}
+        self.started: Optional[float] = None
+        self.done = done
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[[Item], None], workers: int, maxsize: int):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue[Item]" = queue.Queue(maxsize=maxsize)
+        self.busy = 0
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """
+    stages: [(ad, fn(item), worker sayısı), ...]
+    İlk aşamanın kuyruğu sınırsız (iş gönderen HTTP isteği bloklanmasın), diğerleri queue_size ile sınırlı.
+    skip(result) True ise ürün ara aşamaları atlayıp son aşamaya geçer (hata, önbellekten hazır ürün).
+    on_error(item, exc) -> result: aşama hata fırlatırsa ürünün sonucu; ürün yine son aşamaya gider.
+    finish(item) -> result: son aşamadan sonra, done callback'inden önce.
+    """
+
+    def __init__(
+        self,
+        stages: List[Tuple[str, Callable[[Item], None], int]],
+        queue_size: int,
+        skip: Callable[[Dict], bool],
+        on_error: Callable[[Item, Exception], Dict],
+        finish: Callable[[Item], Dict] = None,
+        name: str = "pipeline",
+    ):
+        self._stages = [
+            _Stage(stage_name, fn, workers, 0 if i == 0 else queue_size)
+            for i, (stage_name, fn, workers) in enumerate(stages)
+        ]
+        self._skip = skip
+        self._on_error = on_error
+        self._finish = finish
+        for index, stage in enumerate(self._stages):
+            for n in range(stage.workers):
+                threading.Thread(
+                    target=self._work, args=(index,), name=f"{name}-{stage.name}-{n}", daemon=True
+                ).start()
+        metrics.register_collector(self._gauges)
+        logger.info("Toplu iş hattı: " + " -> ".join(f"{s.name}×{s.workers}" for s in self._stages))
+
+    def submit(self, url: str, options: Dict, done: Callable[[Dict], None]):
+        self._stages[0].queue.put(Item(url, options or {}, done))
+
+    def stats(self) -> List[Dict]:
+        return [{"stage": s.name, "workers": s.workers, "busy": s.busy, "queued": s.queue.qsize()}
+                for s in self._stages]
+
+    def _gauges(self):
+        for s in self.stats():
+            yield "pipeline_queue_depth", "gauge", "Aşama önünde bekleyen ürünler", {"stage": s["stage"]}, s["queued"]
+            yield "pipeline_busy_workers", "gauge", "Aşamada çalışan worker'lar", {"stage": s["stage"]}, s["busy"]
+
+    def _work(self, index: int):
+        stage = self._stages[index]
+        last = len(self._stages) - 1
+        while True:
+            item = stage.queue.get()
+            if item.started is None:
+                item.started = time.perf_counter()
+            with stage.lock:
+                stage.busy += 1
+            try:
+                with metrics.product_timings(item.timings):
+                    stage.fn(item)
+            except Exception as e:
+                item.result = self._on_error(item, e)
+            finally:
+                with stage.lock:
+                    stage.busy -= 1
+
+            if index == last:
+                self._complete(item)
+            elif item.result is not None and self._skip(item.result):
+                self._stages[last].queue.put(item)
+            else:
+                # sonraki aşama doluysa burada beklenir
+                self._stages[index + 1].queue.put(item)
+
+    def _complete(self, item: Item):
+        elapsed = time.perf_counter() - item.started
+        metrics.observe("stage_seconds", elapsed, stage="total")
+        item.timings["total"] = round(elapsed, 4)
+        result = self._finish(item) if self._finish else item.result
+        try:
+            item.done(result)
+        except Exception as e:
+            logger.error(f"Hat sonucu işlenemedi {item.url}: {e}")
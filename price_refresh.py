@@ -0,0 +1,71 @@
+"""
+Fiyat/Stok Güncelleme
+Bilinen ürünlerin sadece değişken alanlarını (fiyat, stok) yeniden çeker,
+önbellekteki kaydın parmak iziyle karşılaştırır
+"""
+import hashlib
+import logging
+import re
+import time
+from typing import Callable, Dict
+
+from scrape_cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+VOLATILE_FIELDS = ("fiyat", "stok")
+
+_PRICE = re.compile(r"[^\d,\.]")
+
+
+def _price_key(fiyat) -> str:
+    """"3,95 €" ve "3.95" aynı fiyat sayılır"""
+    clean = _PRICE.sub("", str(fiyat or "")).replace(",", ".")
+    try:
+        return f"{float(clean):.2f}"
+    except ValueError:
+        return ""
+
+
+def fingerprint(product: Dict) -> str:
+    # stok bilgisi olmayan kayıt stokta sayılır (export'ta Quantity=1 ile aynı kural)
+    raw = f"{_price_key(product.get('fiyat'))}|{product.get('stok') or 'InStock'}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def refresh_product(url: str, fetch_fields: Callable[[str], Dict]) -> Dict:
+    """
+    fetch_fields(url) sayfadan ham alanları döndürür (en az fiyat ve stok).
+    Sadece önbellekte kaydı olan ürünler güncellenir; diğerleri için önce tam çekim gerekir.
+    Returns: güncel ürün + {"changed", "eski_fiyat", "eski_stok", "fiyat_kontrol"}
+    """
+    cache = get_cache()
+    stored = cache.get(url, any_age=True)
+    if not stored:
+        return {"success": False, "url": url, "changed": False,
+                "error": "Ürün önbellekte yok", "message": "Önce tam çekim gerekli"}
+
+    fields = fetch_fields(url)
+    if not _price_key(fields.get("fiyat")):
+        return {"success": False, "url": url, "changed": False, "ean": stored.get("ean", ""),
+                "error": "Fiyat bulunamadı", "message": "Fiyat güncelleme hatası"}
+
+    volatile = {k: fields.get(k, "") for k in VOLATILE_FIELDS}
+    # fiyat kontrolünün kendi zaman damgası; kaydın updated_at'i (tam çekim zamanı) korunur
+    volatile["fiyat_kontrol"] = time.time()
+    updated = {**stored, **volatile}
+    changed = fingerprint(updated) != fingerprint(stored)
+    cache.update(url, volatile)
+
+    if changed:
+        logger.info(f"💱 Değişti {stored.get('ean')}: {stored.get('fiyat')} -> {updated['fiyat']} "
+                    f"({stored.get('stok') or '?'} -> {updated['stok'] or '?'})")
+
+    return {
+        **updated,
+        "success": True,
+        "url": url,
+        "changed": changed,
+        "eski_fiyat": stored.get("fiyat", ""),
+        "eski_stok": stored.get("stok", ""),
+    }
@@ -0,0 +1,261 @@
+"""
+Çok Süreçli Sayfa Çekme
+Sayfa çekme + ayıklama (urun_getir) ayrı süreçlerde çalışır; her süreç kendi Chrome'unu taşır,
+lxml ayrıştırma GIL'e takılmadan çekirdeklere dağılır. AI/görsel/benzerlik ana süreçte kalır.
+
+Aynı anda çalışan süreç sayısı uyarlanır (AIMD):
+  - hata oranı ya da sayfa gecikmesi yükselirse, veya boş bellek rezervin altına inerse sınır azalır
+  - her pencere sorunsuz geçtikçe ve bir tarayıcı daha sığacak bellek varsa sınır 1 artar
+İşler her zaman en küçük numaralı boş sürece verilir; böylece sınırın üstündeki süreçler boşta kalır
+ve kapatılır (Chrome'ları bellekten çıkar). Kontrol her iş bitiminde ve iş yokken periyodik yapılır.
+"""
+import logging
+import multiprocessing
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def available_memory_mb() -> Optional[float]:
+    """Boş (kullanılabilir) bellek; ölçülemiyorsa None (bellek sınırı uygulanmaz)"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class AdaptiveLimit:
+    """
+    Eşzamanlılık sınırı: acquire() sınır doluysa bekler, record() her sonuçtan sonra sınırı günceller.
+    Gecikme tabanı, görülen en düşük pencere medyanıdır.
+    """
+
+    def __init__(self, minimum: int, maximum: int, initial: int, memory=available_memory_mb):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._memory = memory
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def record(self, latency: Optional[float], ok: bool):
+        """latency=None: ölçüme katılmaz (önbellekten gelen sonuç)"""
+        with self._cond:
+            if not ok:
+                self._errors += 1
+            elif latency is not None:
+                self._latencies.append(latency)
+            if len(self._latencies) + self._errors < config.ADAPTIVE_WINDOW:
+                return
+            self._adjust()
+            self._latencies = []
+            self._errors = 0
+            self._cond.notify_all()
+
+    def _adjust(self):
+        samples = len(self._latencies) + self._errors
+        error_rate = self._errors / samples
+        median = statistics.median(self._latencies) if self._latencies else None
+        if median is not None:
+            self.baseline = median if self.baseline is None else min(self.baseline, median)
+        free = self._memory()
+
+        reason = None
+        if free is not None and free < config.MEMORY_RESERVE_MB:
+            reason = f"boş bellek {free:.0f} MB"
+        elif error_rate > config.ADAPTIVE_ERROR_RATE:
+            reason = f"hata oranı {error_rate:.0%}"
+        elif median is not None and median > self.baseline * config.ADAPTIVE_LATENCY_FACTOR:
+            reason = f"gecikme {median:.1f} sn (taban {self.baseline:.1f})"
+
+        old = self.limit
+        if reason:
+            self.limit = max(self.minimum, int(self.limit * 0.7))
+        elif free is None or free - config.MEMORY_RESERVE_MB > config.BROWSER_MEMORY_MB:
+            self.limit = min(self.maximum, self.limit + 1)
+        if self.limit != old:
+            logger.info(f"Süreç sınırı {old} -> {self.limit}" + (f" ({reason})" if reason else ""))
+
+
+def _config_snapshot() -> Dict:
+    """Ana süreçte çalışırken değiştirilmiş ayarlar (CLI bayrakları vb.) çocuk süreçlere de geçsin"""
+    return {name: value for name, value in vars(config).items() if name.isupper()}
+
+
+def _init_child(settings: Dict):
+    """Çocuk süreç: tek sürücülü kendi havuzu; süreç kapanırken Chrome da kapanır"""
+    from multiprocessing.util import Finalize
+    from driver_pool import get_pool
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    for name, value in settings.items():
+        setattr(config, name, value)
+    config.DRIVER_POOL_SIZE = 1
+    config.DRIVER_PRESTART = 0
+    # ProcessPoolExecutor süreçlerinde atexit çalışmaz, multiprocessing finalizer'ları çalışır
+    Finalize(None, get_pool().close, exitpriority=10)
+
+
+def _child_getir(url: str, mode: Optional[str], refresh: bool) -> Dict:
+    """Çocuk süreçte çalışır; istisna yerine düz sözlük döner (selenium istisnaları her zaman pickle edilemez)"""
+    from scraper import urun_getir
+
+    # çocuğun metrik kaydı /metrics'e yansımaz: süreler ve sayaç artışları sonuçla birlikte döner
+    with metrics.product_timings() as timings, metrics.counter_changes() as counters:
+        try:
+            return {"result": urun_getir(url, mode, refresh), "timings": timings, "counters": counters}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}", "timings": timings, "counters": counters}
+
+
+class ProcessBackend:
+    """Süreç başına bir ProcessPoolExecutor(max_workers=1): işi hangi sürecin alacağı seçilebilir"""
+
+    def __init__(self, processes: int = None, initial: int = None):
+        self.processes = processes or config.SCRAPE_PROCESSES
+        self.limit = AdaptiveLimit(1, self.processes, initial or config.SCRAPE_PROCESSES_START)
+        self._slots: List[Optional[ProcessPoolExecutor]] = [None] * self.processes
+        self._busy = [False] * self.processes
+        self._last_used = [0.0] * self.processes
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = threading.Event()
+        metrics.register_collector(self._gauges)
+        # iş bittikten sonra da boşta kalan süreçler kapansın (_give_slot sadece iş varken çağrılır)
+        threading.Thread(target=self._reaper, name="process-reaper", daemon=True).start()
+
+    def _take_slot(self) -> Tuple[int, ProcessPoolExecutor]:
+        with self._lock:
+            index = self._busy.index(False)
+            self._busy[index] = True
+            if self._slots[index] is None:
+                self._slots[index] = ProcessPoolExecutor(
+                    max_workers=1, mp_context=self._context,
+                    initializer=_init_child, initargs=(_config_snapshot(),),
+                )
+            return index, self._slots[index]
+
+    def _give_slot(self, index: int, broken: bool):
+        with self._lock:
+            self._busy[index] = False
+            self._last_used[index] = time.monotonic()
+            if broken:
+                executor, self._slots[index] = self._slots[index], None
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._trim()
+
+    def _trim(self):
+        """Sınırın üstünde kalıp boşta bekleyen süreçleri kapat (Chrome'ları da kapanır)"""
+        now = time.monotonic()
+        for index in range(self.limit.limit, self.processes):
+            executor = self._slots[index]
+            if executor and not self._busy[index] and now - self._last_used[index] > config.SCRAPE_PROCESS_IDLE_SECONDS:
+                self._slots[index] = None
+                executor.shutdown(wait=False)
+                logger.info(f"Boştaki süreç #{index} kapatıldı")
+
+    def _reaper(self):
+        while not self._stop.wait(max(0.05, config.SCRAPE_PROCESS_IDLE_SECONDS / 2)):
+            with self._lock:
+                self._trim()
+
+    def getir(self, url: str, mode: str = None, refresh: bool = False) -> Dict:
+        """urun_getir'in süreçte çalışan hali; sayfa çekilemezse RuntimeError"""
+        self.limit.acquire()
+        index, executor = self._take_slot()
+        start = time.perf_counter()
+        broken = False
+        reply: Dict = {}
+        try:
+            reply = executor.submit(_child_getir, url, mode, refresh).result()
+        except BrokenProcessPool as e:
+            # çocuk süreç öldü (ör. bellek yetmedi); süreç yeniden açılır
+            broken = True
+            metrics.inc("errors_total", stage="process")
+            reply = {"error": f"Çekim süreci çöktü: {e}"}
+        except Exception as e:
+            # ör. argüman/sonuç pickle edilemedi, iş iptal edildi
+            metrics.inc("errors_total", stage="process")
+            reply = {"error": f"Çekim süreci hatası: {type(e).__name__}: {e}"}
+        finally:
+            result = reply.get("result")
+            cached = bool(result) and result.get("kaynak") == "cache"
+            # sadece çocuktan gelen sonuç başarı sayılır (KeyboardInterrupt vb. ile reply boş kalır)
+            self.limit.record(None if cached else time.perf_counter() - start, "result" in reply)
+            self._give_slot(index, broken)
+            self.limit.release()
+
+        metrics.record_timings(reply.get("timings") or {})
+        metrics.record_counters(reply.get("counters") or ())
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            alive = sum(1 for s in self._slots if s is not None)
+            busy = sum(self._busy)
+        return {"processes": self.processes, "alive": alive, "busy": busy,
+                "limit": self.limit.limit, "baseline_s": self.limit.baseline}
+
+    def _gauges(self):
+        s = self.stats()
+        yield "scrape_process_limit", "gauge", "Uyarlanan eşzamanlı süreç sınırı", {}, s["limit"]
+        yield "scrape_processes_alive", "gauge", "Açık çekim süreçleri", {}, s["alive"]
+        yield "scrape_processes_busy", "gauge", "Sayfa çeken süreçler", {}, s["busy"]
+        free = available_memory_mb()
+        if free is not None:
+            yield "memory_available_mb", "gauge", "Kullanılabilir bellek (MB)", {}, free
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            slots, self._slots = self._slots, [None] * self.processes
+        for executor in slots:
+            if executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_process_backend() -> ProcessBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            import atexit
+            _backend = ProcessBackend()
+            atexit.register(_backend.close)
+        return _backend
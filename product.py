@@ -0,0 +1,158 @@
+"""
+Ürün Kaydı
+veri_cek sonuçları için __slots__'lu, sözlük gibi davranan kayıt (result["dm_baslik"], .get, "x" in,
+{**result}, dict(result) aynen çalışır). Sözlüğe göre bellekte çok daha küçük: 50 bin ürünlük bir
+işte sonuçlar listesi, önbellekten okunanlar ve iş günlüğünden yüklenenler hep bu tiptedir.
+
+dumps/loads önbellek, iş günlüğü ve SSE için ortak JSON kodlayıcısıdır: orjson kuruluysa onu,
+değilse standart json modülünü kullanır; üretilen JSON iki durumda da aynı biçimdedir.
+"""
+import json
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# bilinen alanlar; bunların dışındaki anahtarlar (ör. fiyat güncelleme alanları) _extra'da tutulur
+FIELDS = (
+    "success", "url", "kaynak", "error", "message",
+    "dm_baslik", "dm_aciklama", "fiyat", "ean", "resimler", "manufacturer", "stok",
+    "ebay_title", "bullet_points", "html_description", "specifications",
+    "kirik_resimler", "resim_dosyalari", "benzerlik", "sureler",
+)
+_FIELD_SET = frozenset(FIELDS)
+_MISSING = object()
+
+
+class Product(MutableMapping):
+    """
+    Tek ürünün sonucu. Alanlara p["ean"] ya da p.ean ile erişilir;
+    atanmamış alan sözlükteki gibi yoktur (KeyError / AttributeError, get() -> default).
+    """
+
+    __slots__ = FIELDS + ("_extra",)
+
+    success: bool
+    url: str
+    kaynak: str
+    error: str
+    message: str
+    dm_baslik: str
+    dm_aciklama: str
+    fiyat: str
+    ean: str
+    resimler: List[str]
+    manufacturer: Dict[str, str]
+    stok: str
+    ebay_title: str
+    bullet_points: List[str]
+    html_description: str
+    specifications: Dict[str, str]
+    kirik_resimler: List[str]
+    resim_dosyalari: List[str]
+    benzerlik: Dict[str, Any]
+    sureler: Dict[str, float]
+
+    def __init__(self, data: Optional[Mapping] = None, **fields):
+        self._extra: Optional[Dict[str, Any]] = None
+        for source in (data, fields):
+            if source:
+                for key, value in source.items():
+                    self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Product":
+        """Sözlükten kayıt; zaten Product ise aynısı döner"""
+        return data if isinstance(data, cls) else cls(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for key in FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self) -> "Product":
+        return Product(self)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key) -> bool:
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return default if self._extra is None else self._extra.get(key, default)
+
+    def __reduce__(self):
+        # süreçler arası (process_backend) sözlük olarak taşınır
+        return Product, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        return f"Product({self.to_dict()!r})"
+
+
+def _default(value):
+    if isinstance(value, Product):
+        return value.to_dict()
+    raise TypeError(f"JSON'a çevrilemeyen tip: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """UTF-8 JSON (ensure_ascii=False ile aynı); Product'lar sözlük olarak yazılır"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def loads(data) -> Any:
+    """bytes ya da str (eski önbellek/günlük satırları) kabul eder; hatalı JSON'da ValueError"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
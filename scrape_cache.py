@@ -0,0 +1,167 @@
+"""
+Ürün Önbelleği
+veri_cek sonuçlarını SQLite'ta kanonik URL ve EAN ile saklar (product.dumps: orjson varsa onunla)
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+from product import Product, dumps, loads
+from url_index import canonical_url, get_url_index
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCache:
+    """Thread-safe SQLite ürün önbelleği (her thread kendi bağlantısını kullanır)"""
+
+    def __init__(self, path: str = None, ttl: float = None):
+        self.path = path or config.CACHE_DB_PATH
+        self.ttl = config.CACHE_TTL_SECONDS if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " url TEXT PRIMARY KEY,"
+            " ean TEXT,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_products_ean ON products(ean)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _fresh(self, updated_at: float) -> bool:
+        return self.ttl <= 0 or time.time() - updated_at < self.ttl
+
+    def get(self, url: str, any_age: bool = False) -> Optional[Product]:
+        """
+        Önce kanonik URL, bulunamazsa EAN ile ara (URL dizininden, yoksa URL'deki numara).
+        any_age=True: TTL'i geçmiş kayıtlar da döner (fiyat güncellemede karşılaştırma için)
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT data, updated_at FROM products WHERE url = ?", (canonical_url(url),)
+        ).fetchone()
+        ean = get_url_index().ean_for(url) if not row else ""
+        if ean:
+            row = conn.execute(
+                "SELECT data, updated_at FROM products WHERE ean = ? ORDER BY updated_at DESC LIMIT 1", (ean,)
+            ).fetchone()
+        if row and (any_age or self._fresh(row[1])):
+            self._count(True)
+            return Product.from_dict(loads(row[0]))
+        self._count(False)
+        return None
+
+    def urls(self, eans=None) -> List[str]:
+        """Önbellekteki ürün URL'leri (eans verilirse sadece onlar), en eski güncellenen önce"""
+        conn = self._conn()
+        if eans is None:
+            rows = conn.execute("SELECT url FROM products ORDER BY updated_at").fetchall()
+        else:
+            eans = list(eans)
+            rows = []
+            for i in range(0, len(eans), 500):
+                part = eans[i:i + 500]
+                rows += conn.execute(
+                    f"SELECT url FROM products WHERE ean IN ({','.join('?' * len(part))}) ORDER BY updated_at", part
+                ).fetchall()
+        return [r[0] for r in rows]
+
+    def get_by_ean(self, ean: str) -> Optional[Product]:
+        if not ean:
+            return None
+        row = self._conn().execute(
+            "SELECT data, updated_at FROM products WHERE ean = ? ORDER BY updated_at DESC LIMIT 1", (ean,)
+        ).fetchone()
+        if row and self._fresh(row[1]):
+            self._count(True)
+            return Product.from_dict(loads(row[0]))
+        self._count(False)
+        return None
+
+    def put(self, url: str, result: Dict):
+        if not result.get("success"):
+            return
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO products (url, ean, data, updated_at) VALUES (?, ?, ?, ?)",
+            (canonical_url(url), result.get("ean") or None, dumps(result), time.time()),
+        )
+        conn.commit()
+
+    def update(self, url: str, fields: Dict) -> bool:
+        """
+        Kayıttaki sadece verilen alanları değiştir (fiyat güncellemesi).
+        updated_at değişmez: tam kaydın (açıklama, AI metni) tazeliği fiyat kontrolüyle uzamaz.
+        """
+        conn = self._conn()
+        row = conn.execute("SELECT url, data FROM products WHERE url = ?", (canonical_url(url),)).fetchone()
+        ean = get_url_index().ean_for(url) if not row else ""
+        if ean:
+            row = conn.execute(
+                "SELECT url, data FROM products WHERE ean = ? ORDER BY updated_at DESC LIMIT 1", (ean,)
+            ).fetchone()
+        if not row:
+            return False
+        data = loads(row[1])
+        data.update(fields)
+        conn.execute("UPDATE products SET data = ? WHERE url = ?", (dumps(data), row[0]))
+        conn.commit()
+        return True
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM products")
+        conn.commit()
+
+    def stats(self) -> Dict:
+        entries = self._conn().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "ttl_seconds": self.ttl,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ScrapeCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScrapeCache()
+        return _cache
@@ -0,0 +1,426 @@
+"""
+Ürün Çekme Çekirdeği
+Sayfa çekme (HTTP/Selenium), ayıklama, görsel kontrolü, AI zenginleştirme ve önbellek.
+Flask'tan bağımsızdır; hem urun_api hem de komut satırı (cli.py) bunu kullanır.
+"""
+import logging
+import threading
+import traceback
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+import metrics
+from driver_pool import get_pool, scrape_profile
+from product import Product
+from scrape_cache import get_cache
+from url_index import get_url_index
+
+logger = logging.getLogger(__name__)
+
+
+def sayfa_ayikla(html):
+    """Ürün sayfası HTML'inden ham alanları çıkar (Selenium ve HTTP yolu ortak)"""
+    import extractor  # lxml sadece çekim yapılınca yüklenir
+    with metrics.timer("parse"):
+        return extractor.extract(html, fallback_fields=config.REQUIRED_FIELDS)
+
+
+def eksik_alanlar(fields):
+    return [k for k in config.REQUIRED_FIELDS if not fields.get(k)]
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Bağlantı havuzlu, thread'ler arası paylaşılan requests.Session"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=config.HTTP_POOL_SIZE,
+                max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": config.HTTP_USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "de-DE,de;q=0.9",
+            })
+            _http_session = session
+        return _http_session
+
+
+def http_html(url):
+    with metrics.timer("http_fetch"):
+        resp = get_http_session().get(url, timeout=config.HTTP_TIMEOUT)
+        resp.raise_for_status()
+        return resp.text
+
+
+def selenium_html(url):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    profile = scrape_profile()
+    with get_pool().acquire() as driver:
+        with metrics.timer("page_load"):
+            driver.get(url)
+            WebDriverWait(driver, 12).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+
+        # eager modda sayfa DOMContentLoaded'da döner; ayıklayıcının okuduğu alanları bekle
+        selectors = profile["wait_selectors"]
+        if selectors:
+            try:
+                with metrics.timer("wait_fields"):
+                    WebDriverWait(driver, profile["wait_timeout"]).until(
+                        lambda d: all(d.find_elements(By.CSS_SELECTOR, sel) for sel in selectors)
+                    )
+            except TimeoutException:
+                logger.info(f"Bazı alanlar {profile['wait_timeout']} sn içinde gelmedi: {url}")
+
+        with metrics.timer("page_source"):
+            return driver.page_source
+
+
+def _sayfa_getir(url, mode):
+    """
+    mode: "http" | "selenium" | "auto"
+    auto: önce tarayıcısız HTTP, zorunlu alan eksikse Selenium.
+    Returns: (fields, kaynak)
+    """
+    if mode in ("auto", "http"):
+        try:
+            fields = sayfa_ayikla(http_html(url))
+            missing = eksik_alanlar(fields)
+            if not missing or mode == "http":
+                return fields, "http"
+            logger.info(f"HTTP yolunda eksik alan {missing}, Selenium'a geçiliyor")
+            metrics.inc("fallbacks_total", reason="missing_fields")
+        except Exception as e:
+            if mode == "http":
+                raise
+            logger.warning(f"HTTP yolu başarısız ({e}), Selenium'a geçiliyor")
+            metrics.inc("fallbacks_total", reason="http_error")
+
+    return sayfa_ayikla(selenium_html(url)), "selenium"
+
+
+_ai_client = None
+_ai_client_lock = threading.Lock()
+
+
+def get_ai_client():
+    global _ai_client
+    with _ai_client_lock:
+        if _ai_client is None:
+            from openrouter_client import OpenRouterClient
+            _ai_client = OpenRouterClient()
+        return _ai_client
+
+
+def ai_zenginlestir(result, fresh=False):
+    """
+    ebay_title / bullet_points / html_description / specifications alanlarını AI ile doldur.
+    fresh=True LLM önbelleğini atlar (benzerlik kapısı yeniden ürettirirken).
+    """
+    client = get_ai_client()
+    name, desc, specs = result["dm_baslik"], result["dm_aciklama"], result["specifications"]
+
+    if config.AI_MODE == "combined":
+        result.update(client.generate_listing(name, desc, specs, brand=specs.get("marke", ""), fresh=fresh))
+        return result
+
+    specs_text = ", ".join(f"{k}: {v}" for k, v in specs.items() if v)
+    bullets = client.generate_bullet_points(name, desc, specs, fresh=fresh)
+    result["ebay_title"] = client.generate_ebay_title(name, specs.get("marke", ""), specs_text, fresh=fresh)
+    result["bullet_points"] = bullets
+    result["html_description"] = client.generate_html_description(name, desc, bullets, specs, fresh=fresh)
+    return result
+
+
+_similarity_checker = None
+_similarity_checker_lock = threading.Lock()
+
+
+def get_similarity_checker():
+    global _similarity_checker
+    with _similarity_checker_lock:
+        if _similarity_checker is None:
+            from similarity_checker import SimilarityChecker
+            _similarity_checker = SimilarityChecker()
+        return _similarity_checker
+
+
+def resimleri_dogrula(result):
+    """
+    Kırık görselleri resimler'den çıkarır (doğrulanamayanlar kalır).
+    Yerel kopya açıksa hash'ler resim_dosyalari alanına yazılır.
+    """
+    from image_store import get_image_store
+
+    checks = get_image_store().check(result["resimler"], mirror=config.IMAGE_MIRROR_ENABLED)
+    result["resimler"] = [c["url"] for c in checks if c["ok"] is not False]
+    result["kirik_resimler"] = [c["url"] for c in checks if c["ok"] is False]
+    if config.IMAGE_MIRROR_ENABLED:
+        result["resim_dosyalari"] = [c["digest"] for c in checks if c["digest"]]
+    if result["kirik_resimler"]:
+        logger.warning(f"{len(result['kirik_resimler'])} kırık görsel çıkarıldı: {result['url']}")
+    return result
+
+
+# --- Aşamalar ---
+# veri_cek bunları sırayla çağırır; toplu işlerde pipeline.py her aşamayı ayrı worker'larla çalıştırır.
+
+def urun_getir(url, mode=None, refresh=False):
+    """
+    Önbellek ya da sayfa (HTTP/Selenium) + ayıklama. Sayfa çekilemezse hata fırlatır.
+    Returns: Product (önbellekten geldiyse kaynak="cache" ve tamamlanmış)
+    """
+    if config.CACHE_ENABLED and not refresh:
+        with metrics.timer("cache_lookup"):
+            cached = get_cache().get(url)
+        if cached:
+            logger.info(f"⚡ Önbellekten: {url}")
+            cached.url = url
+            cached.kaynak = "cache"
+            return cached
+
+    logger.info(f"🔄 Veri çekiliyor: {url}")
+    fields, kaynak = _sayfa_getir(url, mode or config.SCRAPE_MODE)
+
+    baslik = fields["dm_baslik"] or "Başlık bulunamadı"
+    dm_aciklama = fields["dm_aciklama"]
+
+    # AI şu an opsiyonel: yoksa da doldur.
+    ebay_title = baslik[:80]
+    bullet_points = []
+    html_description = f"<p>{dm_aciklama}</p>" if dm_aciklama else f"<p>{baslik}</p>"
+
+    specs = {key: "" for key in config.SPEC_FIELDS}
+    # sayfadan okunabilen tek özellik marka; diğerlerini AI doldurur
+    specs["marke"] = fields.get("marke", "")
+
+    return Product(
+        success=True,
+        url=url,
+        dm_baslik=baslik,
+        dm_aciklama=dm_aciklama,
+        fiyat=fields["fiyat"],
+        ean=fields["ean"],
+        resimler=fields["resimler"],
+        manufacturer=fields["manufacturer"],
+        stok=fields.get("stok", ""),
+
+        ebay_title=ebay_title,
+        bullet_points=bullet_points,
+        html_description=html_description,
+        specifications=specs,
+        kaynak=kaynak,
+    )
+
+
+def urun_tamam(result):
+    """
+    Kalan aşamalar atlanabilir mi (hata ya da önbellekten gelen hazır ürün).
+    AI'ı başarısız olmuş önbellek kaydı tamam sayılmaz: sayfa yeniden çekilmeden AI tekrar denenir.
+    """
+    return not result.get("success") or (result.get("kaynak") == "cache" and not result.get("ai_error"))
+
+
+def resim_asamasi(result):
+    if config.IMAGE_CHECK_ENABLED:
+        with metrics.timer("image_check"):
+            resimleri_dogrula(result)
+    return result
+
+
+def ai_asamasi(result):
+    """
+    LLM kesintisi ürünü düşürmez: sayfa alanları kalır, AI alanları şablon metinle dolar
+    (AI_MODE="separate"deki gibi) ve ai_error yazılır; kayıt önbellekten geldiğinde AI yeniden denenir.
+    """
+    if config.AI_ENABLED:
+        with metrics.timer("ai"):
+            try:
+                ai_zenginlestir(result)
+            except RuntimeError as e:
+                logger.warning(f"AI üretimi başarısız, şablon metin kullanılıyor ({result.get('url')}): {e}")
+                metrics.inc("errors_total", stage="ai")
+                specs = result["specifications"]
+                result.update(get_ai_client().fallback_listing(
+                    result["dm_baslik"], specs, brand=specs.get("marke", "")))
+                result["ai_error"] = str(e)
+            else:
+                result.pop("ai_error", None)
+    return result
+
+
+def _benzerlik(result):
+    return get_similarity_checker().check_fields(result["dm_aciklama"], {
+        "ebay_title": result["ebay_title"],
+        "bullet_points": result["bullet_points"],
+        "html_description": result["html_description"],
+    }, ignore=result["dm_baslik"])
+
+
+def benzerlik_asamasi(result):
+    """
+    AI metni DM metnine fazla benziyorsa (kopya riski) bir kez önbelleksiz yeniden ürettir;
+    hâlâ benziyorsa ürün benzerlik.status=TOO_SIMILAR ile işaretli kalır.
+    """
+    if not (config.AI_ENABLED and config.SIMILARITY_GATE_ENABLED) or result.get("ai_error"):
+        # şablon metin kopya olamaz; yeniden üretim de aynı kesintiye takılırdı
+        return result
+    with metrics.timer("similarity"):
+        check = _benzerlik(result)
+    if check["status"] != "OK" and config.SIMILARITY_RETRY:
+        logger.info(f"AI metni DM metnine çok benziyor ({check['similarity']}), yeniden üretiliyor: {result['url']}")
+        metrics.inc("retries_total", stage="similarity")
+        try:
+            with metrics.timer("ai"):
+                ai_zenginlestir(result, fresh=True)
+        except RuntimeError as e:
+            # önceki metin yerinde kalır, ürün işaretli olarak devam eder
+            logger.warning(f"Yeniden üretim başarısız: {e}")
+        else:
+            with metrics.timer("similarity"):
+                check = _benzerlik(result)
+    if check["status"] != "OK":
+        logger.warning(f"⚠️ AI metni DM metnine çok benziyor ({check['similarity']}): {result['url']}")
+        metrics.inc("similarity_flags_total")
+    result["benzerlik"] = {"similarity": check["similarity"], "status": check["status"]}
+    return result
+
+
+def urun_kaydet(url, result):
+    """Son aşama: önbellek ve URL dizini"""
+    if config.CACHE_ENABLED:
+        get_cache().put(url, result)
+    get_url_index().learn(url, result["ean"])
+    logger.info(f"✅ Ürün başarıyla işlendi ({result['kaynak']}): {result['dm_baslik']}")
+    return result
+
+
+def hata_sonucu(url, e):
+    logger.error(f"❌ Hata: {e}")
+    logger.error(traceback.format_exc())
+    metrics.inc("errors_total", stage="veri_cek")
+    return Product(
+        success=False,
+        url=url,
+        error=str(e),
+        message=f"Veri çekme hatası: {str(e)}",
+    )
+
+
+def sonuc_olcumleri(result, timings):
+    """Ürün bittiğinde: sayaç ve aşama süreleri (önbelleğe yazıldıktan sonra eklenir)"""
+    metrics.inc("products_total", kaynak=result.get("kaynak", "-"), sonuc="ok" if result.get("success") else "error")
+    result["sureler"] = timings
+    return result
+
+
+def veri_cek(url, mode=None, refresh=False):
+    """
+    refresh=True önbelleği atlar ve sayfayı yeniden çeker.
+    Sonuçtaki "sureler" alanı aşama sürelerini (sn) içerir.
+    """
+    with metrics.product_timings() as timings:
+        with metrics.timer("total"):
+            result = _veri_cek(url, mode, refresh)
+    return sonuc_olcumleri(result, timings)
+
+
+def getir_fonksiyonu():
+    """SCRAPE_BACKEND="process" ise sayfa çekme + ayıklama süreç havuzunda, değilse bu thread'de"""
+    if config.SCRAPE_BACKEND == "process":
+        from process_backend import get_process_backend
+        return get_process_backend().getir
+    return urun_getir
+
+
+def _veri_cek(url, mode, refresh):
+    try:
+        result = getir_fonksiyonu()(url, mode, refresh)
+        if urun_tamam(result):
+            return result
+        resim_asamasi(result)
+        ai_asamasi(result)
+        benzerlik_asamasi(result)
+        return urun_kaydet(url, result)
+    except Exception as e:
+        return hata_sonucu(url, e)
+
+
+def urun_hatti(fetch_workers=None):
+    """veri_cek'in aşamalı hali: aşamalar aynı anda farklı ürünler üzerinde çalışır"""
+    from pipeline import Pipeline
+
+    fetch = getir_fonksiyonu()
+    fetch_workers = fetch_workers or config.PIPELINE_FETCH_WORKERS
+    if config.SCRAPE_BACKEND == "process":
+        # thread'ler sadece süreçleri bekler; gerçek eşzamanlılığı backend'in uyarlanan sınırı belirler
+        fetch_workers = max(fetch_workers, config.SCRAPE_PROCESSES)
+
+    def getir(item):
+        item.result = fetch(item.url, item.options.get("mode"), item.options.get("refresh", False))
+
+    def kaydet(item):
+        if not urun_tamam(item.result):
+            urun_kaydet(item.url, item.result)
+
+    return Pipeline(
+        [
+            ("getir", getir, fetch_workers),
+            ("gorsel", lambda item: resim_asamasi(item.result), config.PIPELINE_IMAGE_WORKERS),
+            ("ai", lambda item: ai_asamasi(item.result), config.PIPELINE_AI_WORKERS),
+            ("benzerlik", lambda item: benzerlik_asamasi(item.result), config.PIPELINE_SIMILARITY_WORKERS),
+            # tek yazıcı: önbellek/dizin yazımları sıralı, iş günlüğü de buradan yazılır
+            ("kaydet", kaydet, 1),
+        ],
+        queue_size=config.PIPELINE_QUEUE_SIZE,
+        skip=urun_tamam,
+        on_error=lambda item, e: hata_sonucu(item.url, e),
+        finish=lambda item: sonuc_olcumleri(item.result, item.timings),
+        name="urun",
+    )
+
+
+def toplu_is_yoneticisi(max_workers=None, journal_dir=None):
+    """Toplu çekme işleri: PIPELINE_ENABLED ise aşamalı hat, değilse her ürün tek thread'de veri_cek"""
+    from batch_jobs import JobManager
+
+    pipeline = urun_hatti(max_workers) if config.PIPELINE_ENABLED else None
+    return JobManager(worker=veri_cek, max_workers=max_workers, journal_dir=journal_dir, pipeline=pipeline)
+
+
+def degisken_alanlar(url):
+    """Fiyat güncellemede sadece fiyat/stok gerekir: önce HTTP, fiyat yoksa Selenium"""
+    try:
+        fields = sayfa_ayikla(http_html(url))
+        if fields.get("fiyat"):
+            return fields
+        logger.info(f"HTTP yolunda fiyat yok, Selenium'a geçiliyor: {url}")
+    except Exception as e:
+        logger.warning(f"HTTP yolu başarısız ({e}), Selenium'a geçiliyor")
+    return sayfa_ayikla(selenium_html(url))
+
+
+def fiyat_yenile(url):
+    from price_refresh import refresh_product
+    try:
+        return refresh_product(url, degisken_alanlar)
+    except Exception as e:
+        logger.error(f"❌ Fiyat güncelleme hatası {url}: {e}")
+        return {"success": False, "url": url, "changed": False, "error": str(e),
+                "message": f"Fiyat güncelleme hatası: {str(e)}"}
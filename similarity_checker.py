@@ -3,34 +3,145 @@ Telif/Kopya Kontrolü
 DM metni ile AI metni arasında benzerlik kontrolü
 """
 import difflib
+import html
 import logging
 import re
-from typing import Dict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Tuple, Union
 
 import config
 
 logger = logging.getLogger(__name__)
 
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+_INVALID = re.compile(r"[^a-z0-9äöüß ,.\-_/]")
+_WORD = re.compile(r"[a-z0-9äöüß]+")
+
+
+def _containment(ai: FrozenSet, dm: FrozenSet) -> float:
+    """AI özelliklerinin DM metninde de geçen oranı: |A∩B| / |A|"""
+    if not ai or not dm:
+        return 0.0
+    return len(ai & dm) / len(ai)
+
 
 class SimilarityChecker:
-    def __init__(self, threshold: float = None):
-        self.threshold = threshold if threshold is not None else config.SIMILARITY_THRESHOLD
+    """
+    backend:
+      "shingle"   - AI metnindeki kelime n-gram'larının (shingle) DM metninde geçen oranı (doğrusal, varsayılan)
+      "token_set" - AI metnindeki kelimelerin DM metninde geçen oranı
+      "difflib"   - eski SequenceMatcher.ratio() (simetrik, uzun metinlerde karesel)
+
+    threshold verilmezse config.SIMILARITY_THRESHOLD'dan backend'e ait eşik alınır.
+
+    Kısa AI alanı uzun DM metniyle karşılaştırıldığından skor simetrik değildir (Jaccard değil):
+    uzun açıklamaya gömülmüş tek bir kopya cümle de skoru yükseltir.
+    """
+
+    def __init__(self, threshold: float = None, backend: str = None, ngram: int = None):
+        self.backend = backend or config.SIMILARITY_BACKEND
+        self.ngram = ngram or config.SIMILARITY_NGRAM
+
+        backends: Dict[str, Callable[..., float]] = {
+            "shingle": self._shingle_similarity,
+            "token_set": self._token_set_similarity,
+            "difflib": self._difflib_similarity,
+        }
+        if self.backend not in backends:
+            raise ValueError(f"Bilinmeyen benzerlik backend'i: {self.backend}")
+        self._score = backends[self.backend]
+        self.threshold = threshold if threshold is not None else config.SIMILARITY_THRESHOLD[self.backend]
 
     def normalize(self, text: str) -> str:
         if not text:
             return ""
-        text = text.lower()
-        text = re.sub(r"\s+", " ", text)
-        text = re.sub(r"[^a-z0-9äöüß ,.\-_/]", "", text)
+        text = html.unescape(_TAG.sub(" ", text)).lower()
+        text = _SPACE.sub(" ", text)
+        text = _INVALID.sub("", text)
         return text.strip()
 
-    def similarity(self, a: str, b: str) -> float:
-        a_n = self.normalize(a)
-        b_n = self.normalize(b)
-        if not a_n or not b_n:
+    def shingles(self, normalized: str) -> FrozenSet[Tuple[str, ...]]:
+        words = _WORD.findall(normalized)
+        if len(words) < self.ngram:
+            # çok kısa metin (ör. başlık): tek shingle olarak karşılaştır
+            return frozenset([tuple(words)]) if words else frozenset()
+        return frozenset(zip(*(words[i:] for i in range(self.ngram))))
+
+    def tokens(self, normalized: str) -> FrozenSet[str]:
+        return frozenset(_WORD.findall(normalized))
+
+    def _features(self, normalized: str) -> FrozenSet:
+        return self.shingles(normalized) if self.backend == "shingle" else self.tokens(normalized)
+
+    def _shingle_similarity(self, dm_n: str, ai_n: str, ignore: FrozenSet = frozenset()) -> float:
+        return _containment(self.shingles(ai_n) - ignore, self.shingles(dm_n))
+
+    def _token_set_similarity(self, dm_n: str, ai_n: str, ignore: FrozenSet = frozenset()) -> float:
+        return _containment(self.tokens(ai_n) - ignore, self.tokens(dm_n))
+
+    def _difflib_similarity(self, dm_n: str, ai_n: str, ignore: FrozenSet = frozenset()) -> float:
+        return difflib.SequenceMatcher(None, dm_n, ai_n).ratio()
+
+    def similarity(self, dm: str, ai: str) -> float:
+        dm_n = self.normalize(dm)
+        ai_n = self.normalize(ai)
+        if not dm_n or not ai_n:
             return 0.0
-        return difflib.SequenceMatcher(None, a_n, b_n).ratio()
+        return self._score(dm_n, ai_n)
+
+    def _status(self, sim: float) -> str:
+        return "OK" if sim <= self.threshold else "TOO_SIMILAR"
+
+    def check_fields(self, dm_text: str, ai_text: Union[str, Dict[str, Union[str, List[str]]]],
+                     ignore: str = "") -> Dict:
+        """
+        ai_text tek metin ya da {alan: metin/liste} sözlüğü olabilir
+        (ör. ebay_title, bullet_points, html_description).
+        ignore (ör. ürün adı) içinde geçen shingle'lar kopya sayılmaz: başlığın ürün adını tekrarlaması normaldir.
+        Returns: {"similarity", "status", "threshold", "fields": {alan: {"similarity", "status"}}}
+        """
+        fields = ai_text if isinstance(ai_text, dict) else {"text": ai_text}
+        dm_n = self.normalize(dm_text)
+        ignored = self._features(self.normalize(ignore)) if ignore and self.backend != "difflib" else frozenset()
+
+        per_field = {}
+        for name, value in fields.items():
+            if isinstance(value, (list, tuple)):
+                value = "\n".join(str(v) for v in value)
+            ai_n = self.normalize(value or "")
+            sim = round(self._score(dm_n, ai_n, ignored), 4) if dm_n and ai_n else 0.0
+            per_field[name] = {"similarity": sim, "status": self._status(sim)}
+
+        overall = max((f["similarity"] for f in per_field.values()), default=0.0)
+        return {
+            "similarity": overall,
+            "status": self._status(overall),
+            "threshold": self.threshold,
+            "fields": per_field,
+        }
+
+    def check_many(self, pairs: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """
+        Çok sayıda (dm, ai) çiftini tek seferde kontrol et.
+        Aynı metin birden çok çiftte geçerse normalize/shingle işi bir kez yapılır.
+        """
+        if self.backend == "difflib":
+            results = []
+            for dm, ai in pairs:
+                sim = round(self.similarity(dm, ai), 4)
+                results.append({"similarity": sim, "status": self._status(sim)})
+            return results
+
+        memo: Dict[str, FrozenSet[str]] = {}
+
+        def features(text: str) -> FrozenSet[str]:
+            feats = memo.get(text)
+            if feats is None:
+                feats = memo[text] = self._features(self.normalize(text))
+            return feats
 
-    def check_fields(self, dm_text: str, ai_text: str) -> Dict:
-        sim = self.similarity(dm_text, ai_text)
-        status = "OK" if sim <= self.t
+        results = []
+        for dm, ai in pairs:
+            sim = round(_containment(features(ai or ""), features(dm or "")), 4)
+            results.append({"similarity": sim, "status": self._status(sim)})
+        return results
@@ -0,0 +1,74 @@
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# sentetik dm.de sayfaları: seçici ve JSON-LD yolları sabitlenir, gerçek sayfa değişikliğini yakalamaz
+# (gerçek sayfa kaydı: benchmarks/record_fixture.py)
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Önbellek/günlük dosyaları (cache/, jobs/, logs/) geçici klasöre yazılsın"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+    return tmp_path
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, text=""):
+        self.status_code = status
+        self._body = body
+        self.text = text
+        self.headers = {}
+
+    def json(self):
+        return self._body
+
+
+def answer(content):
+    return FakeResponse(200, {"choices": [{"message": {"content": content}}]})
+
+
+class FakeSession:
+    """Sıradaki yanıtı ya da istisnayı döndürür, gönderilen prompt'ları kaydeder"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def post(self, url, headers, json, timeout):
+        with self.lock:
+            self.prompts.append(json["messages"][0]["content"])
+            reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Ağsız OpenRouter istemcisi: tek tekrar, beklemesiz, önbelleksiz"""
+    import config
+    import openrouter_client
+    from openrouter_client import OpenRouterClient
+
+    monkeypatch.setattr(config, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "OPENROUTER_MAX_RETRIES", 1)
+    monkeypatch.setattr(config, "OPENROUTER_BACKOFF_BASE", 0.0)
+    monkeypatch.setattr(openrouter_client, "get_rate_limiter", lambda: openrouter_client.TokenBucket(1000, 1000))
+    return OpenRouterClient()
+
+
+def use_session(monkeypatch, replies):
+    import openrouter_client
+    session = FakeSession(replies)
+    monkeypatch.setattr(openrouter_client, "get_session", lambda: session)
+    return session
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+import pytest
+
+from batch_jobs import JobJournal, JobManager
+
+
+def scrape(url, **options):
+    return {"success": not url.endswith("/bad"), "url": url}
+
+
+@pytest.fixture
+def manager():
+    return JobManager(worker=scrape, max_workers=2, journal_dir="")
+
+
+def events(job):
+    return [(event, data) for _, event, data in job.iter_events(heartbeat=5)]
+
+
+def test_job_emits_results_then_done(manager):
+    job = manager.submit(["https://a/1", "https://a/bad"])
+    seen = events(job)
+    assert [e for e, _ in seen] == ["result", "result", "done"]
+    assert seen[-1][1]["done"] == 2 and seen[-1][1]["failed"] == 1
+    assert [r["url"] for r in job.results] == ["https://a/1", "https://a/bad"]
+
+
+def test_empty_job_finishes_immediately(manager):
+    job = manager.submit([])
+    assert job.finished
+    assert events(job) == [("done", job.progress())]
+
+
+def crashed_journal(directory, job_id, urls, results):
+    """Uygulama iş bitmeden kapanmış gibi: başlık, bazı sonuçlar ve yarım yazılmış bir satır"""
+    journal = JobJournal(os.path.join(directory, f"{job_id}.jsonl"))
+    journal._append({"type": "job", "id": job_id, "urls": urls, "options": {}, "created_at": 1.0})
+    for index, result in results.items():
+        journal.record(index, result)
+    with open(journal.path, "ab") as f:
+        f.write(b'{"type": "result", "ind')
+    return journal
+
+
+@pytest.fixture
+def journaled_manager(tmp_path):
+    calls = []
+    lock = threading.Lock()
+
+    def slow_scrape(url, **options):
+        with lock:
+            calls.append(url)
+        time.sleep(0.05)
+        return scrape(url)
+
+    manager = JobManager(worker=slow_scrape, max_workers=4, journal_dir=str(tmp_path))
+    manager.calls = calls
+    return manager
+
+
+def test_finished_job_is_listed_from_journal_summary(journaled_manager):
+    job = journaled_manager.submit(["https://a/1", "https://a/bad", "https://a/3"])
+    events(job)
+    # bitiş kaydı "done" olayından hemen sonra yazılır
+    for _ in range(100):
+        header, end = journaled_manager._journal(job.id).summary()
+        if end:
+            break
+        time.sleep(0.01)
+    assert header["urls"] == job.urls
+    assert end == {"type": "done", "total": 3, "done": 3, "failed": 1}
+
+    restarted = JobManager(worker=scrape, max_workers=1, journal_dir=journaled_manager.journal_dir)
+    [listed] = restarted.journaled()
+    assert (listed["job_id"], listed["status"], listed["done"], listed["failed"]) == (job.id, "done", 3, 1)
+
+
+def test_interrupted_job_resumes_only_missing_and_failed(journaled_manager, tmp_path):
+    urls = ["https://a/1", "https://a/2", "https://a/3", "https://a/4"]
+    crashed_journal(str(tmp_path), "abc", urls, {
+        0: {"success": True, "url": urls[0], "ean": "1"},
+        1: {"success": False, "url": urls[1], "error": "timeout"},
+    })
+    [listed] = journaled_manager.journaled()
+    assert (listed["status"], listed["done"], listed["failed"]) == ("interrupted", 2, 1)
+
+    [job] = journaled_manager.resume_interrupted()
+    events(job)
+    assert sorted(journaled_manager.calls) == urls[1:]
+    assert job.results[0]["ean"] == "1"
+    assert [r["success"] for r in job.results] == [True, True, True, True]
+    assert journaled_manager.journaled()[0]["status"] == "done"
+
+
+def test_concurrent_resume_builds_one_job(journaled_manager, tmp_path):
+    urls = [f"https://a/{i}" for i in range(20)]
+    crashed_journal(str(tmp_path), "abc", urls, {0: {"success": True, "url": urls[0]}})
+
+    barrier = threading.Barrier(4)
+    jobs = []
+
+    def resume():
+        barrier.wait()
+        jobs.append(journaled_manager.resume("abc"))
+
+    threads = [threading.Thread(target=resume) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(j) for j in jobs}) == 1
+    events(jobs[0])
+    assert sorted(journaled_manager.calls) == sorted(urls[1:])
+    assert jobs[0].done == jobs[0].progress()["total"] == 20
+
+
+def test_resume_job_with_nothing_pending_writes_done(journaled_manager, tmp_path):
+    # son sonuç yazıldı ama bitiş kaydından önce uygulama kapandı
+    urls = ["https://a/1", "https://a/2"]
+    crashed_journal(str(tmp_path), "abc", urls, {i: {"success": True, "url": u} for i, u in enumerate(urls)})
+    assert journaled_manager._journal("abc").summary()[1] is None
+
+    job = journaled_manager.resume("abc")
+    assert job.finished and journaled_manager.calls == []
+    assert journaled_manager._journal("abc").summary()[1] == {"type": "done", "total": 2, "done": 2, "failed": 0}
+
+    restarted = JobManager(worker=scrape, max_workers=1, journal_dir=str(tmp_path))
+    assert restarted.journaled()[0]["status"] == "done"
+    assert restarted.resume_interrupted() == []
+
+
+def test_resume_unknown_job(journaled_manager):
+    assert journaled_manager.resume("yok") is None
+
+
+def test_discovering_job_finishes_after_close(journaled_manager):
+    job = journaled_manager.open_job()
+    assert not job.finished and job.progress()["discovering"]
+
+    journaled_manager.add_urls(job, ["https://a/1", "https://a/bad"])
+    while job.done < 2:
+        time.sleep(0.01)
+    assert not job.finished
+
+    journaled_manager.add_urls(job, ["https://a/3"])
+    journaled_manager.close(job)
+    seen = events(job)
+    assert [e for e, _ in seen][-1] == "done"
+    assert [r["url"] for r in job.results] == ["https://a/1", "https://a/bad", "https://a/3"]
+
+    restarted = JobManager(worker=scrape, max_workers=1, journal_dir=journaled_manager.journal_dir)
+    header, results = restarted._journal(job.id).load()
+    assert header["urls"] == job.urls and len(results) == 3
+    for _ in range(100):
+        [listed] = restarted.journaled()
+        if listed["status"] == "done":
+            break
+        time.sleep(0.01)
+    assert (listed["status"], listed["total"], listed["failed"]) == ("done", 3, 1)
+
+
+def test_discovering_job_without_urls(manager):
+    job = manager.open_job()
+    manager.close(job)
+    assert job.finished and job.progress()["total"] == 0
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+import crawler
+import scraper
+from crawler import ListingCache
+
+LISTING = "https://www.dm.de/pflege/duschgel"
+
+
+def product_url(ean):
+    return f"https://www.dm.de/produkt-p{ean}.html"
+
+
+def page(*eans):
+    return "".join(f'<a href="/produkt-p{e}.html">x</a>' for e in eans)
+
+
+@pytest.fixture
+def cache(workdir, monkeypatch):
+    cache = ListingCache(str(workdir / "crawl.sqlite3"), ttl=3600)
+    monkeypatch.setattr(crawler, "get_listing_cache", lambda: cache)
+    return cache
+
+
+def test_empty_listing_page_is_not_cached(cache, monkeypatch):
+    pages = iter([page(), page(40000001)])
+    monkeypatch.setattr(scraper, "http_html", lambda url: next(pages))
+
+    assert crawler.liste_sayfasi(LISTING, mode="http")[0] == []
+    assert cache.get(LISTING) is None
+    # geçici boş yanıttan sonraki tarama sayfayı yeniden çeker
+    assert crawler.liste_sayfasi(LISTING, mode="http")[0] == [product_url(40000001)]
+    assert cache.get(LISTING)[0] == [product_url(40000001)]
+
+
+def test_discovery_streams_new_urls_per_page(workdir, monkeypatch):
+    pages = {
+        LISTING: ([product_url(40000001), product_url(40000002)], f"{LISTING}?currentPage=1", "http"),
+        f"{LISTING}?currentPage=1": ([product_url(40000002), product_url(40000003)], None, "http"),
+    }
+    monkeypatch.setattr(crawler, "liste_sayfasi", lambda url, mode, refresh: pages.get(url, ([], None, "http")))
+
+    batches = []
+    found = crawler.urunleri_kesfet([LISTING], workers=2, on_urls=batches.append)
+    assert batches == [[product_url(40000001), product_url(40000002)], [product_url(40000003)]]
+    assert found == [product_url(e) for e in (40000001, 40000002, 40000003)]
+
+
+def test_crawl_endpoint_feeds_job_while_discovering(workdir, monkeypatch):
+    import urun_api
+    from batch_jobs import JobManager
+
+    release = threading.Event()
+
+    def kesfet(listings, mode=None, refresh=False, max_pages=None, on_urls=None):
+        on_urls([product_url(40000001), product_url(40000002)])
+        release.wait(5)
+        on_urls([product_url(40000003)])
+        return []
+
+    manager = JobManager(worker=lambda url, **o: {"success": True, "url": url}, max_workers=2, journal_dir="")
+    monkeypatch.setattr(urun_api, "jobs", manager)
+    monkeypatch.setattr(crawler, "urunleri_kesfet", kesfet)
+
+    reply = urun_api.app.test_client().post("/crawl", json={"urls": [LISTING, product_url(40000001)]})
+    data = reply.get_json()
+    assert data["success"] and data["discovering"]
+
+    job = manager.get(data["job_id"])
+    while job.done < 2:
+        time.sleep(0.01)
+    assert not job.finished
+    release.set()
+
+    list(job.iter_events(heartbeat=5))
+    # listedeki ürün URL'si taramada tekrar bulunsa da bir kez çekilir
+    assert job.urls == [product_url(e) for e in (40000001, 40000002, 40000003)]
+    assert job.progress()["discovering"] is False
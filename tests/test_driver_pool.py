@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+import config
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = DriverPool(size=2, acquire_timeout=5)
+    monkeypatch.setattr(pool, "driver_path", lambda: "chromedriver")
+
+    def new_driver():
+        driver = FakeDriver()
+        with pool._lock:
+            pool._pages[id(driver)] = 0
+        return driver
+
+    monkeypatch.setattr(pool, "_new_driver", new_driver)
+    return pool
+
+
+def test_explicit_zero_size_is_kept():
+    assert DriverPool(size=0).size == 0
+    assert DriverPool().size == config.DRIVER_POOL_SIZE
+
+
+def test_warmup_respects_size(pool):
+    pool.warmup(5)
+    assert pool.stats()["alive"] == 2
+    assert pool.stats()["idle"] == 2
+
+
+def test_warmup_does_not_exceed_size_while_drivers_are_borrowed(pool):
+    release = threading.Event()
+    borrowed = threading.Barrier(3)
+
+    def borrow():
+        with pool.acquire():
+            borrowed.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=borrow) for _ in range(2)]
+    for t in threads:
+        t.start()
+    borrowed.wait()
+    pool.warmup(2)
+    assert pool.stats()["alive"] == 2
+    release.set()
+    for t in threads:
+        t.join()
+    assert pool.stats() == {"size": 2, "alive": 2, "idle": 2}
@@ -0,0 +1,167 @@
+import csv
+import io
+
+import pytest
+
+import config
+from batch_jobs import JobManager
+from ebay_excel_exporter import ColumnPlan, _resolve, iter_csv, tekil_ean
+from product import Product
+
+HEADERS = [
+    "*Action(SiteID=Germany|Country=DE|Currency=EUR|Version=1193)",
+    "Custom label (SKU)", "Title", "P:EAN", "Start price", "Quantity", "Item photo URL",
+    "Description", "C:Marke", "C:Anzahl der Tabletten", "C:Wirksame Inhaltsstoffe", "Manufacturer Name",
+    "Manufacturer City", "Category ID",
+]
+
+
+def product(**fields):
+    data = {
+        "success": True, "url": "https://www.dm.de/mivolis-p4058172628359.html",
+        "dm_baslik": "Mivolis Magnesium 400 Tabletten 60 St", "ean": "4058172628359",
+        "fiyat": "2,45 €", "stok": "InStock", "resimler": [f"https://img/{i}.jpg" for i in range(15)],
+        "ebay_title": "Mivolis Magnesium 400 mg Tabletten 60 Stück Nahrungsergänzung " + "x" * 40,
+        "html_description": "<p>Magnesium</p>",
+        "specifications": {"marke": "Mivolis", "anzahl_tabletten": "60", "wirksame_inhaltsstoffe": "Magnesium"},
+        "manufacturer": {"name": "dm-drogerie markt GmbH + Co. KG", "city": "Karlsruhe"},
+    }
+    data.update(fields)
+    return Product(data)
+
+
+def test_row_maps_every_column():
+    row = dict(zip(HEADERS, ColumnPlan(HEADERS).row(product())))
+    assert row[HEADERS[0]] == "Add"
+    assert row["Custom label (SKU)"] == row["P:EAN"] == "4058172628359"
+    assert len(row["Title"]) == 80 and row["Title"].startswith("Mivolis Magnesium 400 mg")
+    assert row["Start price"] == "2.45"
+    assert row["Quantity"] == "1"
+    assert row["Item photo URL"].split("|") == [f"https://img/{i}.jpg" for i in range(12)]
+    assert row["Description"] == "<p>Magnesium</p>"
+    assert (row["C:Marke"], row["C:Anzahl der Tabletten"], row["C:Wirksame Inhaltsstoffe"]) == \
+        ("Mivolis", "60", "Magnesium")
+    assert (row["Manufacturer Name"], row["Manufacturer City"]) == ("dm-drogerie markt GmbH + Co. KG", "Karlsruhe")
+    assert row["Category ID"] == ""
+
+
+def test_row_matches_single_cell_api_and_plain_dicts():
+    p = product()
+    assert ColumnPlan(HEADERS).row(p) == [_resolve(h, p) for h in HEADERS]
+    assert ColumnPlan(HEADERS).row(p.to_dict()) == ColumnPlan(HEADERS).row(p)
+
+
+def test_revise_row_and_out_of_stock():
+    plan = ColumnPlan(config.REVISE_HEADERS, action="Revise")
+    assert plan.row(product(stok="OutOfStock", fiyat="3,10 €")) == ["Revise", "4058172628359", "3.10", "0"]
+
+
+def test_failed_product_writes_error_to_title():
+    row = dict(zip(HEADERS, ColumnPlan(HEADERS).row({"success": False, "error": "Zeitüberschreitung"})))
+    assert row["Title"] == "HATA: Zeitüberschreitung"
+    assert all(v == "" for h, v in row.items() if h != "Title")
+
+
+def test_duplicate_ean_rows_are_merged():
+    first = product(resimler=["https://img/a.jpg", "https://img/b.jpg"])
+    later = product(fiyat="2,65 €", stok="OutOfStock", ebay_title="Neu",
+                    resimler=["https://img/b.jpg", "https://img/c.jpg"])
+    other = product(ean="1", url="https://www.dm.de/x-p1.html")
+    failed = {"success": False, "ean": "4058172628359"}
+
+    merged, *rest = tekil_ean([first, other, later, failed])
+    assert rest == [other, failed]
+    # fiyat/stok sonraki satırdan, resimler ikisinden, diğer alanlar ilk satırdan
+    assert (merged["fiyat"], merged["stok"]) == ("2,65 €", "OutOfStock")
+    assert merged["resimler"] == ["https://img/a.jpg", "https://img/b.jpg", "https://img/c.jpg"]
+    assert merged["ebay_title"] == first["ebay_title"]
+    # girdi kayıtları (ör. önbellekten gelenler) değişmez
+    assert first["fiyat"] == "2,45 €" and len(first["resimler"]) == 2
+
+
+def test_duplicate_ean_newer_price_check_wins():
+    checked = product(fiyat="1,99 €", fiyat_kontrol=200.0)
+    stale = product(fiyat="2,45 €", fiyat_kontrol=100.0)
+    [merged] = tekil_ean([checked, stale])
+    assert merged["fiyat"] == "1,99 €"
+
+
+def test_csv_has_bom_header_and_rows():
+    text = "".join(iter_csv([product()], ["Custom label (SKU)", "Title"], delimiter=";"))
+    assert text.startswith("\ufeff")
+    rows = list(csv.reader(io.StringIO(text[1:]), delimiter=";"))
+    assert rows[0] == ["Custom label (SKU)", "Title"]
+    assert rows[1][0] == "4058172628359"
+
+
+@pytest.fixture
+def api(workdir, monkeypatch):
+    import urun_api
+
+    def scrape(url, **options):
+        return product(url=url) if "mivolis" in url else {"success": False, "url": url, "error": "404"}
+
+    manager = JobManager(worker=scrape, max_workers=1, journal_dir="jobs")
+    monkeypatch.setattr(urun_api, "jobs", manager)
+    monkeypatch.setattr(config, "CSV_CHUNK_ROWS", 0)
+    monkeypatch.setattr(config, "EXPORT_TEMPLATE", "")
+    return urun_api
+
+
+def run_job(manager, urls):
+    job = manager.submit(urls)
+    list(job.iter_events(heartbeat=5))
+    return job
+
+
+def test_export_falls_back_to_journal(api):
+    job = run_job(api.jobs, ["https://www.dm.de/mivolis-p4058172628359.html", "https://www.dm.de/x-p1.html"])
+    # uygulama yeniden başladı: iş bellekte yok, sadece günlüğü var
+    api.jobs = JobManager(worker=None, max_workers=1, journal_dir="jobs")
+
+    reply = api.app.test_client().post("/export-csv", json={"job_id": job.id})
+    assert reply.status_code == 200
+    rows = list(csv.reader(io.StringIO(reply.get_data(as_text=True)[1:])))
+    assert len(rows) == 2 and "4058172628359" in rows[1]
+
+
+def test_export_unknown_job(api):
+    reply = api.app.test_client().post("/export-csv", json={"job_id": "yok"})
+    assert reply.status_code == 400
+    assert reply.get_json()["message"] == "İş bulunamadı"
+
+
+def test_export_journal_without_successes(api):
+    job = run_job(api.jobs, ["https://www.dm.de/x-p1.html"])
+    api.jobs = JobManager(worker=None, max_workers=1, journal_dir="jobs")
+    reply = api.app.test_client().post("/export-csv", json={"job_id": job.id})
+    assert reply.get_json()["message"] == "İşte başarılı ürün yok"
+
+
+def test_export_excel_sends_finished_workbook(api):
+    from openpyxl import load_workbook
+
+    reply = api.app.test_client().post("/export-excel", json={"products": [product().to_dict()]})
+    assert reply.status_code == 200
+    assert "attachment" in reply.headers["Content-Disposition"]
+    rows = list(load_workbook(io.BytesIO(reply.get_data())).active.values)
+    assert rows[0][0] == config.EXPORT_HEADERS[0]
+    assert len(rows) == 2
+    reply.close()
+
+
+def test_revise_export_falls_back_to_refresh_journal(api, monkeypatch):
+    def refresh(url, **options):
+        return {**product(url=url, fiyat="3,10 €").to_dict(), "changed": "same" not in url}
+
+    monkeypatch.setattr(api, "refresh_jobs", JobManager(worker=refresh, max_workers=1, journal_dir="refresh"))
+    job = run_job(api.refresh_jobs, ["https://www.dm.de/a-p4058172628359.html", "https://www.dm.de/same-p1.html"])
+    api.refresh_jobs = JobManager(worker=None, max_workers=1, journal_dir="refresh")
+
+    reply = api.app.test_client().post("/export-revise", json={"job_id": job.id})
+    assert reply.status_code == 200
+    rows = list(csv.reader(io.StringIO(reply.get_data(as_text=True)[1:]), delimiter=config.CSV_DELIMITER))
+    assert rows[1:] == [["Revise", "4058172628359", "3.10", "1"]]
+
+    assert api.app.test_client().post("/export-revise", json={"job_id": "yok"}).status_code == 404
+    assert api.app.test_client().post("/export-revise", json={"job_id": "../jobs/x"}).status_code == 404
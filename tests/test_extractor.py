@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import config
+import extractor
+import scraper
+from conftest import FIXTURE_DIR
+
+CDN = "https://media.dm-static.com/images/f_auto,q_auto,c_fit,h_1200,w_1200/v1727000000/products/pim"
+DM = {
+    "name": "dm-drogerie markt GmbH + Co. KG",
+    "address_line1": "Am dm-Platz 1",
+    "city": "Karlsruhe",
+    "postal_code": "76227",
+    "country": "Deutschland",
+}
+
+FIXTURES = {
+    "dm_balea_duschgel.html": {
+        "dm_baslik": "Balea Duschgel Mango Kokos, 300 ml",
+        "marke": "Balea",
+        "ean": "4066447241658",
+        "fiyat": "0,95 €",
+        "stok": "InStock",
+        "image": "4066447241658-{}/dm-balea-duschgel",
+    },
+    "dm_mivolis_magnesium.html": {
+        "dm_baslik": "Mivolis Magnesium 400 Tabletten 60 St",
+        "marke": "Mivolis",
+        "ean": "4058172628359",
+        "fiyat": "2,45 €",
+        "stok": "InStock",
+        "image": "4058172628359-{}/dm-mivolis-magnesium",
+    },
+    # fiyat DOM'da yok, sadece JSON-LD'de
+    "dm_alverde_shampoo_jsonld.html": {
+        "dm_baslik": "alverde NATURKOSMETIK Shampoo Repair Bio-Avocado, 200 ml",
+        "marke": "alverde",
+        "ean": "4010355432108",
+        "fiyat": "1,75 €",
+        "stok": "OutOfStock",
+        "image": "4010355432108-{}/dm-alverde-shampoo",
+    },
+}
+
+
+def page(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_fixture_fields(name):
+    expected = FIXTURES[name]
+    fields = extractor.extract(page(name), fallback_fields=config.REQUIRED_FIELDS)
+
+    for key in ("dm_baslik", "marke", "ean", "fiyat", "stok"):
+        assert fields[key] == expected[key], key
+    assert fields["resimler"] == [f"{CDN}/{expected['image'].format(i)}" for i in range(1, 9)]
+    assert fields["manufacturer"] == DM
+    assert fields["dm_aciklama"] and "dm-Artikelnummer" not in fields["dm_aciklama"]
+
+
+def test_price_needs_json_ld_fallback():
+    html = page("dm_alverde_shampoo_jsonld.html")
+    assert extractor.extract(html)["fiyat"] == ""
+    assert extractor.extract(html, fallback_fields=["fiyat"])["fiyat"] == "1,75 €"
+
+
+def test_json_ld_only_page():
+    html = """<html><head><script type="application/ld+json">
+    {"@graph": [{"@type": "BreadcrumbList"}, {"@type": "Product", "name": " Balea Seife ",
+     "brand": "Balea", "gtin13": "4010355 123456", "description": "Milde Seife.\\ndm-Artikelnummer: 123",
+     "image": "/images/h_440,w_500/seife.jpg",
+     "offers": [{"price": "1.5", "availability": "https://schema.org/LimitedAvailability"}]}]}
+    </script></head><body><h1></h1></body></html>"""
+    fields = extractor.extract(html, fallback_fields=config.REQUIRED_FIELDS)
+
+    assert fields["dm_baslik"] == "Balea Seife"
+    assert fields["marke"] == "Balea"
+    assert fields["ean"] == "4010355123456"
+    assert fields["fiyat"] == "1,50 €"
+    assert fields["stok"] == "LimitedAvailability"
+    assert fields["dm_aciklama"] == "Milde Seife."
+    assert fields["resimler"] == ["https://www.dm.de/images/h_1200,w_1200/seife.jpg"]
+
+
+@pytest.mark.parametrize("h1, title", [
+    ('<span class="font-bold">Balea</span> Duschgel Mango', "Balea Duschgel Mango"),
+    ('\n  <span class="font-bold">Balea</span>\n  Duschgel\n', "Balea Duschgel"),
+    # sayfada boşluk yoksa eklenmez (düğümleri " " ile birleştirmek "Bio- Avocado" yapardı)
+    ("Shampoo Bio-<b>Avocado</b>, 200&nbsp;ml", "Shampoo Bio-Avocado, 200 ml"),
+    ("<span>Balea</span>Duschgel", "BaleaDuschgel"),
+])
+def test_title_keeps_page_whitespace(h1, title):
+    assert extractor.extract(f"<html><body><h1>{h1}</h1></body></html>")["dm_baslik"] == title
+
+
+def test_dom_fields_win_over_json_ld():
+    fields = extractor.extract(page("dm_balea_duschgel.html"), fallback_fields=config.REQUIRED_FIELDS)
+    without = extractor.extract(page("dm_balea_duschgel.html"))
+    assert fields == without
+
+
+def test_specs_start_with_page_brand(monkeypatch):
+    fields = extractor.extract(page("dm_mivolis_magnesium.html"), fallback_fields=config.REQUIRED_FIELDS)
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(scraper, "_sayfa_getir", lambda url, mode: (fields, "http"))
+
+    product = scraper.urun_getir("https://www.dm.de/mivolis-p4058172628359.html")
+
+    assert product["specifications"] == {**{key: "" for key in config.SPEC_FIELDS}, "marke": "Mivolis"}
+    assert product["dm_baslik"] == "Mivolis Magnesium 400 Tabletten 60 St"
+    assert product["ebay_title"] == product["dm_baslik"]
+    assert product["kaynak"] == "http"
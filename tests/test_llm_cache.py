@@ -0,0 +1,82 @@
+import itertools
+
+import pytest
+
+import config
+import llm_cache
+import openrouter_client
+from llm_cache import LLMCache, cache_key
+from conftest import answer, use_session
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Her çağrıda bir saniye ilerleyen saat: LRU sırası kesin olsun"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_key_depends_on_every_parameter():
+    base = cache_key("m", 0.6, 100, "prompt")
+    assert base == cache_key("m", 0.6, 100, "prompt")
+    assert len({base, cache_key("m2", 0.6, 100, "prompt"), cache_key("m", 0.7, 100, "prompt"),
+                cache_key("m", 0.6, 101, "prompt"), cache_key("m", 0.6, 100, "prompt!")}) == 5
+
+
+def test_put_get_and_stats(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    assert cache.get("a") is None
+    cache.put("a", "Größe")
+    cache.put("a", "Größe 2")
+    assert cache.get("a") == "Größe 2"
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+    assert stats["bytes"] == len("Größe 2".encode("utf-8"))
+
+
+def test_size_survives_reopen(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    LLMCache(path).put("a", "x" * 10)
+    assert LLMCache(path).stats()["bytes"] == 10
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"), max_bytes=30)
+    cache.put("a", "x" * 10)
+    cache.put("b", "x" * 10)
+    cache.put("c", "x" * 10)
+    cache.get("a")
+    cache.put("d", "x" * 10)  # 40 > 30 -> 27'ye inene kadar en eskiler gider
+
+    assert cache.get("a") is not None
+    assert cache.get("d") is not None
+    assert cache.get("b") is None and cache.get("c") is None
+    assert cache.stats()["bytes"] == 20
+
+
+def test_call_api_reads_through_cache(client, monkeypatch, tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(openrouter_client, "get_llm_cache", lambda: cache)
+    session = use_session(monkeypatch, [answer("Hallo")])
+
+    assert client._call_api("p") == "Hallo"
+    assert client._call_api("p") == "Hallo"
+    assert len(session.prompts) == 1
+
+    # use_cache=False yeni yanıt ister, ama yanıt yine önbelleğe yazılır
+    session.replies = [answer("Servus")]
+    assert client._call_api("p", use_cache=False) == "Servus"
+    assert client._call_api("p") == "Servus"
+    assert len(session.prompts) == 2
+
+
+def test_failed_calls_are_not_cached(client, monkeypatch, tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(openrouter_client, "get_llm_cache", lambda: cache)
+    use_session(monkeypatch, [answer("")])
+
+    assert client._call_api("p") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,60 @@
+import json
+import threading
+
+import pytest
+import requests
+
+import config
+from conftest import answer, FakeResponse, use_session
+
+
+def test_retries_then_returns_content(client, monkeypatch):
+    session = use_session(monkeypatch, [FakeResponse(503, text="busy"), answer("Hallo")])
+    assert client._call_api("p") == "Hallo"
+    assert len(session.prompts) == 2
+    assert client.last_error is None
+
+
+def test_last_error_belongs_to_calling_thread(client, monkeypatch):
+    use_session(monkeypatch, [FakeResponse(400, text="bad request")])
+    assert client._call_api("p") is None
+    assert client.last_error == "HTTP 400: bad request"
+
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(client.last_error))
+    thread.start()
+    thread.join()
+    assert seen == [None]
+
+
+LISTING = {
+    "title": "Balea Duschgel Mango Kokos 300 ml Pflegedusche",
+    "bullets": ["Mit Mango-Duft", "Pflegt die Haut", "pH-hautneutral", "300 ml Flasche"],
+    "html": "<ul><li>Mit Mango-Duft</li><li>Pflegt die Haut</li></ul><p>Frische Pflege.</p>",
+    "specifications": {"marke": "Balea", "inhalt": "300 ml"},
+}
+
+
+def test_listing_from_single_request(client, monkeypatch):
+    session = use_session(monkeypatch, [answer(json.dumps(LISTING))])
+    listing = client.generate_listing("Balea Duschgel", "Beschreibung", {"marke": ""}, brand="Balea")
+    assert len(session.prompts) == 1
+    assert listing["ebay_title"] == LISTING["title"]
+    assert listing["bullet_points"] == LISTING["bullets"]
+    assert listing["specifications"]["marke"] == "Balea"
+
+
+def test_listing_transport_failure_does_not_fan_out(client, monkeypatch):
+    session = use_session(monkeypatch, [requests.ConnectionError("down")])
+    with pytest.raises(RuntimeError, match="bağlantı"):
+        client.generate_listing("Balea Duschgel", "Beschreibung", {})
+    # 1 deneme + 1 tekrar; tekil alan istekleri atılmaz
+    assert len(session.prompts) == config.OPENROUTER_MAX_RETRIES + 1
+
+
+def test_listing_invalid_answer_falls_back_per_field(client, monkeypatch):
+    session = use_session(monkeypatch, [answer("kein JSON"), answer("Balea Duschgel Mango 300 ml")])
+    listing = client.generate_listing("Balea Duschgel", "Beschreibung", {}, brand="Balea")
+    # birleşik istek + başlık, bullet ve HTML için birer istek
+    assert len(session.prompts) == 4
+    assert listing["ebay_title"] == "Balea Duschgel Mango 300 ml"
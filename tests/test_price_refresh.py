@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+import price_refresh
+from scrape_cache import ScrapeCache
+
+URL = "https://www.dm.de/balea-duschgel-mango-kokos-p4066447241658.html"
+
+
+@pytest.fixture
+def cache(workdir, monkeypatch):
+    cache = ScrapeCache(str(workdir / "cache.sqlite3"), ttl=100)
+    monkeypatch.setattr(price_refresh, "get_cache", lambda: cache)
+    cache.put(URL, {"success": True, "url": URL, "ean": "4066447241658", "fiyat": "0,95 €", "stok": "InStock",
+                    "ebay_title": "Balea Duschgel Mango Kokos 300 ml"})
+    return cache
+
+
+def age(cache, seconds):
+    conn = cache._conn()
+    conn.execute("UPDATE products SET updated_at = ?", (time.time() - seconds,))
+    conn.commit()
+    return conn.execute("SELECT updated_at FROM products").fetchone()[0]
+
+
+def test_price_check_keeps_record_age(cache):
+    before = age(cache, 90)
+    result = price_refresh.refresh_product(URL, lambda url: {"fiyat": "1,15 €", "stok": "OutOfStock"})
+
+    assert result["changed"] and (result["eski_fiyat"], result["fiyat"]) == ("0,95 €", "1,15 €")
+    assert cache._conn().execute("SELECT updated_at FROM products").fetchone()[0] == before
+
+    stored = cache.get(URL)
+    assert (stored["fiyat"], stored["stok"], stored["ebay_title"]) == \
+        ("1,15 €", "OutOfStock", "Balea Duschgel Mango Kokos 300 ml")
+    assert stored["fiyat_kontrol"] == result["fiyat_kontrol"]
+
+    # tam kayıt TTL'i geçince fiyat kontrol edilmiş olsa da yeniden çekilir
+    age(cache, 120)
+    assert cache.get(URL) is None
+    assert cache.get(URL, any_age=True)["fiyat"] == "1,15 €"
+
+
+def test_unchanged_price(cache):
+    result = price_refresh.refresh_product(URL, lambda url: {"fiyat": "0.95", "stok": "InStock"})
+    assert result["success"] and not result["changed"]
+
+
+def test_missing_price_leaves_record_alone(cache):
+    result = price_refresh.refresh_product(URL, lambda url: {"fiyat": "", "stok": "InStock"})
+    assert not result["success"]
+    assert "fiyat_kontrol" not in cache.get(URL)
+
+
+def test_unknown_product(cache):
+    result = price_refresh.refresh_product("https://www.dm.de/x-p1.html", lambda url: pytest.fail("çekilmemeli"))
+    assert result["error"] == "Ürün önbellekte yok"
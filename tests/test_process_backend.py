@@ -0,0 +1,137 @@
+import pickle
+import time
+from concurrent.futures import CancelledError, Future
+
+import pytest
+
+import config
+import metrics
+import scraper
+from process_backend import AdaptiveLimit, ProcessBackend, _child_getir
+
+
+@pytest.fixture(autouse=True)
+def window(monkeypatch):
+    monkeypatch.setattr(config, "ADAPTIVE_WINDOW", 4)
+    monkeypatch.setattr(config, "MEMORY_RESERVE_MB", 1000)
+    monkeypatch.setattr(config, "BROWSER_MEMORY_MB", 400)
+
+
+def limit(initial=2, free=None):
+    return AdaptiveLimit(1, 4, initial, memory=lambda: free)
+
+
+def test_clean_window_raises_limit():
+    lim = limit()
+    for _ in range(4):
+        lim.record(1.0, True)
+    assert lim.limit == 3 and lim.baseline == 1.0
+
+
+def test_errors_lower_limit():
+    lim = limit(initial=4)
+    for ok in (True, False, False, True):
+        lim.record(1.0, ok)
+    assert lim.limit == 2
+
+
+def test_latency_and_memory_lower_limit():
+    lim = limit(initial=4)
+    for _ in range(4):
+        lim.record(1.0, True)
+    for _ in range(4):
+        lim.record(3.0, True)
+    assert lim.limit == 2
+
+    low = limit(initial=4, free=500)
+    for _ in range(4):
+        low.record(1.0, True)
+    assert low.limit == 2
+
+    # yeni bir tarayıcıya yetecek bellek yoksa sınır artmaz
+    tight = limit(initial=2, free=1200)
+    for _ in range(4):
+        tight.record(1.0, True)
+    assert tight.limit == 2
+
+
+class FakeExecutor:
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def submit(self, fn, *args):
+        future = Future()
+        if isinstance(self.outcome, BaseException):
+            future.set_exception(self.outcome)
+        else:
+            future.set_result(self.outcome)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def backend_with(outcome):
+    backend = ProcessBackend(processes=2, initial=1)
+    backend._slots[0] = FakeExecutor(outcome)
+    recorded = []
+    original = backend.limit.record
+    backend.limit.record = lambda latency, ok: (recorded.append(ok), original(latency, ok))
+    return backend, recorded
+
+
+def test_result_counts_as_success():
+    backend, recorded = backend_with({"result": {"success": True, "kaynak": "http"}, "timings": {}})
+    assert backend.getir("https://x")["success"]
+    assert recorded == [True]
+    assert backend.limit.in_flight == 0 and backend._busy == [False, False]
+
+
+@pytest.mark.parametrize("error", [pickle.PicklingError("Can't pickle"), CancelledError(), ValueError("x")])
+def test_executor_failures_count_as_errors(error):
+    backend, recorded = backend_with(error)
+    with pytest.raises(RuntimeError, match=type(error).__name__):
+        backend.getir("https://x")
+    assert recorded == [False]
+    assert backend.limit.in_flight == 0 and backend._busy == [False, False]
+
+
+def test_child_error_counts_as_error():
+    backend, recorded = backend_with({"error": "TimeoutException: page", "timings": {}})
+    with pytest.raises(RuntimeError, match="TimeoutException"):
+        backend.getir("https://x")
+    assert recorded == [False]
+
+
+def test_idle_processes_above_limit_are_closed_without_new_work(monkeypatch):
+    monkeypatch.setattr(config, "SCRAPE_PROCESS_IDLE_SECONDS", 0.1)
+    backend = ProcessBackend(processes=2, initial=1)
+    backend._slots = [FakeExecutor(None), FakeExecutor(None)]
+    backend._last_used = [time.monotonic()] * 2
+    for _ in range(100):
+        if backend._slots[1] is None:
+            break
+        time.sleep(0.02)
+    # sınırın içindeki süreç açık kalır
+    assert backend._slots[0] is not None and backend._slots[1] is None
+    backend.close()
+
+
+def counter(name, **labels):
+    return metrics.registry.counter_values().get((name, metrics._labels(labels)), 0)
+
+
+def test_child_counters_reach_parent_registry(monkeypatch):
+    def urun_getir(url, mode, refresh):
+        metrics.inc("fallbacks_total")
+        raise TimeoutError("page")
+
+    monkeypatch.setattr(scraper, "urun_getir", urun_getir)
+    reply = _child_getir("https://x", None, False)
+    assert reply["counters"] == [("fallbacks_total", {}, 1)]
+
+    before = counter("fallbacks_total")
+    backend, _ = backend_with(reply)
+    with pytest.raises(RuntimeError, match="TimeoutError"):
+        backend.getir("https://x")
+    assert counter("fallbacks_total") == before + 1
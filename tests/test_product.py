@@ -0,0 +1,75 @@
+import pickle
+
+import pytest
+
+import product
+from product import Product, dumps, loads
+
+
+def sample():
+    return Product({"success": True, "url": "https://www.dm.de/x-p1.html", "ean": "1", "fiyat": "0,95 €",
+                    "resimler": ["a.jpg"], "changed": True})
+
+
+def test_behaves_like_a_dict():
+    p = sample()
+    assert p["ean"] == p.ean == "1"
+    assert p["changed"] is True and p.get("changed") is True
+    assert "ean" in p and "changed" in p and "stok" not in p and "yok" not in p
+    assert p.get("stok", "-") == "-" and p.get("yok") is None
+    with pytest.raises(KeyError):
+        p["stok"]
+    with pytest.raises(AttributeError):
+        p.stok
+    assert list(p) == ["success", "url", "fiyat", "ean", "resimler", "changed"]
+    assert len(p) == 6
+    assert dict(p) == {**p} == p.to_dict()
+    assert p == p.to_dict()
+
+
+def test_update_delete_and_copy():
+    p = sample()
+    p.update({"stok": "InStock", "eski_fiyat": "1,00 €"})
+    del p["fiyat"], p["changed"]
+    assert "fiyat" not in p and "changed" not in p
+    with pytest.raises(KeyError):
+        del p["fiyat"]
+    with pytest.raises(KeyError):
+        del p["yok"]
+
+    copy = p.copy()
+    copy["stok"] = "OutOfStock"
+    assert p["stok"] == "InStock" and copy["eski_fiyat"] == "1,00 €"
+    assert Product.from_dict(p) is p
+
+
+def test_slots_keep_records_small():
+    assert not hasattr(sample(), "__dict__")
+    with pytest.raises(AttributeError):
+        sample().yeni_alan = 1
+
+
+def test_pickle_round_trip():
+    p = sample()
+    again = pickle.loads(pickle.dumps(p))
+    assert isinstance(again, Product) and again == p
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_json_round_trip(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(product, "orjson", None)
+    elif product.orjson is None:
+        pytest.skip("orjson kurulu değil")
+    data = dumps({"items": [sample()], "ad": "Größe"})
+    assert isinstance(data, bytes)
+    assert loads(data) == {"items": [sample().to_dict()], "ad": "Größe"}
+    assert loads(data.decode("utf-8")) == loads(data)
+    assert "Größe".encode("utf-8") in data
+
+
+def test_json_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+    with pytest.raises(ValueError):
+        loads(b'{"yarim')
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+import requests
+
+import config
+import scraper
+from conftest import answer, use_session
+from product import Product
+from scrape_cache import ScrapeCache
+
+URL = "https://www.dm.de/balea-duschgel-mango-kokos-p4066447241658.html"
+
+
+def scraped():
+    return Product(success=True, url=URL, kaynak="http", dm_baslik="Balea Duschgel Mango Kokos, 300 ml",
+                   dm_aciklama="Pflegt die Haut.", fiyat="0,95 €", ean="4066447241658", resimler=[],
+                   specifications={"marke": "Balea"})
+
+
+@pytest.fixture
+def pipeline(workdir, client, monkeypatch):
+    cache = ScrapeCache(str(workdir / "cache.sqlite3"))
+    monkeypatch.setattr(scraper, "get_cache", lambda: cache)
+    monkeypatch.setattr(scraper, "get_ai_client", lambda: client)
+    monkeypatch.setattr(scraper, "getir_fonksiyonu", lambda: lambda url, mode, refresh: scraped())
+    for name, value in (("AI_ENABLED", True), ("AI_MODE", "combined"), ("CACHE_ENABLED", True),
+                        ("IMAGE_CHECK_ENABLED", False), ("SIMILARITY_GATE_ENABLED", True)):
+        monkeypatch.setattr(config, name, value)
+    return cache
+
+
+def test_llm_outage_keeps_scraped_product(pipeline, monkeypatch):
+    session = use_session(monkeypatch, [requests.ConnectionError("down")])
+    result = scraper._veri_cek(URL, None, False)
+
+    assert result["success"] and result["fiyat"] == "0,95 €"
+    assert "bağlantı" in result["ai_error"]
+    assert result["ebay_title"] == "Balea Duschgel Mango Kokos, 300 ml"
+    assert len(result["bullet_points"]) == 4 and result["html_description"].startswith("<ul>")
+    assert "benzerlik" not in result
+    # sadece birleşik istek (ve tekrarı); tekil alan istekleri yok
+    assert len(session.prompts) == config.OPENROUTER_MAX_RETRIES + 1
+    assert pipeline.get(URL)["ai_error"] == result["ai_error"]
+
+
+def test_cached_product_with_ai_error_retries_ai_only(pipeline, monkeypatch):
+    use_session(monkeypatch, [requests.ConnectionError("down")])
+    scraper._veri_cek(URL, None, False)
+
+    cached = pipeline.get(URL)
+    cached["kaynak"] = "cache"
+    assert not scraper.urun_tamam(cached)
+
+    listing = {"title": "Balea Duschgel Mango Kokos 300 ml", "bullets": ["a", "b", "c", "d"],
+               "html": "<ul><li>a</li></ul><p>Frisch.</p>", "specifications": {}}
+    use_session(monkeypatch, [answer(json.dumps(listing))])
+    monkeypatch.setattr(scraper, "getir_fonksiyonu", lambda: lambda url, mode, refresh: cached)
+    result = scraper._veri_cek(URL, None, False)
+
+    assert result["ebay_title"] == listing["title"] and "ai_error" not in result
+    stored = pipeline.get(URL)
+    assert "ai_error" not in stored
+    stored["kaynak"] = "cache"
+    assert scraper.urun_tamam(stored)
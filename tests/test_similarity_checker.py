@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import config
+import extractor
+from conftest import FIXTURE_DIR
+from similarity_checker import SimilarityChecker
+
+# DM metninden bağımsız yazılmış, normal uzunlukta bir açıklama (~100 kelime)
+OWN = (
+    "Die Pflegedusche reinigt die Haut mild und hinterlässt einen fruchtigen Duft. "
+    "Die Formel ist pH-hautneutral und für die tägliche Anwendung geeignet. "
+    "Die praktische Flasche lässt sich leicht dosieren und ist ideal für unterwegs. "
+    "Das Produkt wird in Deutschland hergestellt und ohne Tierversuche entwickelt. "
+    "Der Schaum verteilt sich gleichmäßig und lässt sich rückstandslos abspülen. "
+    "Die Verpackung besteht zu einem großen Teil aus recyceltem Kunststoff. "
+    "Auch für empfindliche Haut ist die milde Rezeptur gut verträglich. "
+    "Nach dem Duschen fühlt sich die Haut angenehm weich und gepflegt an."
+)
+
+
+@pytest.fixture(scope="module", params=sorted(f for f in os.listdir(FIXTURE_DIR) if f.endswith(".html")))
+def page(request):
+    with open(os.path.join(FIXTURE_DIR, request.param), encoding="utf-8") as f:
+        return extractor.extract(f.read())
+
+
+def longest_sentence(text):
+    return max(text.split("\n"), key=lambda s: len(s.split()))
+
+
+def test_original_text_passes(page):
+    check = SimilarityChecker().check_fields(page["dm_aciklama"], {"html_description": f"<p>{OWN}</p>"})
+    assert check["status"] == "OK"
+
+
+def test_one_copied_sentence_is_flagged(page):
+    copied = longest_sentence(page["dm_aciklama"])
+    half = len(OWN) // 2
+    html = f"<p>{OWN[:half]}</p><p>{copied}</p><p>{OWN[half:]}</p>"
+    check = SimilarityChecker().check_fields(page["dm_aciklama"], {"html_description": html})
+    assert check["status"] == "TOO_SIMILAR"
+    assert check["fields"]["html_description"]["status"] == "TOO_SIMILAR"
+
+
+def test_score_is_share_of_ai_text():
+    checker = SimilarityChecker(ngram=3)
+    dm = "eins zwei drei vier fünf sechs sieben acht neun zehn"
+    # AI metninin tamamı DM'de geçiyor: uzun DM metni skoru düşürmez
+    assert checker.similarity(dm, "drei vier fünf sechs") == 1.0
+    # 4 shingle'ın 1'i DM'den
+    assert checker.similarity(dm, "eins zwei drei foo bar baz") == 0.25
+
+
+def test_product_name_is_not_copying():
+    checker = SimilarityChecker()
+    dm = "Das Balea Duschgel Mango Kokos pflegt die Haut."
+    fields = {"ebay_title": "Balea Duschgel Mango Kokos 300 ml"}
+    assert checker.check_fields(dm, fields)["status"] == "TOO_SIMILAR"
+    assert checker.check_fields(dm, fields, ignore="Balea Duschgel Mango Kokos, 300 ml")["status"] == "OK"
+
+
+def test_bullet_lists_and_overall_max():
+    checker = SimilarityChecker()
+    dm = "Mild zur Haut und frei von Mikroplastik, mit Bio-Mango aus fairem Handel."
+    check = checker.check_fields(dm, {
+        "ebay_title": "Duschgel Mango 300 ml",
+        "bullet_points": ["Frei von Mikroplastik, mit Bio-Mango aus fairem Handel", "300 ml"],
+    })
+    assert check["fields"]["ebay_title"]["status"] == "OK"
+    assert check["fields"]["bullet_points"]["status"] == "TOO_SIMILAR"
+    assert check["similarity"] == check["fields"]["bullet_points"]["similarity"]
+    assert check["status"] == "TOO_SIMILAR"
+
+
+def test_check_many_matches_single_pairs():
+    checker = SimilarityChecker()
+    pairs = [("eins zwei drei vier fünf", "zwei drei vier neu"), ("", "x"), ("a b c", "a b c")]
+    assert [r["similarity"] for r in checker.check_many(pairs)] == \
+        [round(checker.similarity(dm, ai), 4) for dm, ai in pairs]
+
+
+DM_TEXT = (
+    "Das Balea Duschgel Mango Kokos verwöhnt die Haut mit einem exotischen Duft nach reifer Mango und "
+    "cremiger Kokosnuss. Die milde Formel reinigt sanft und ist frei von Mikroplastik. "
+    "Der hautfreundliche pH-Wert unterstützt die natürliche Schutzfunktion der Haut. "
+    "Die Verträglichkeit wurde dermatologisch bestätigt. Die Flasche besteht zu 100 Prozent aus recyceltem Kunststoff."
+)
+# aynı bilgiler, baştan yazılmış: ortak kelimeler var ama kopya cümle yok
+REWRITTEN = (
+    "Mit dem fruchtigen Duft von Mango und Kokos wird die tägliche Dusche zum kleinen Urlaub. "
+    "Eine sanfte Rezeptur ohne Mikroplastik pflegt die Haut mild. "
+    "Dank pH-neutraler Zusammensetzung bleibt der natürliche Schutz der Haut erhalten. "
+    "Dermatologen haben die gute Verträglichkeit bestätigt. Die Verpackung ist aus recyceltem Material."
+)
+COPIED = (
+    "Dieses Duschgel verwöhnt die Haut mit einem exotischen Duft nach reifer Mango und cremiger Kokosnuss. "
+    "Die milde Formel reinigt sanft und ist frei von Mikroplastik. "
+    "Der hautfreundliche pH-Wert unterstützt die natürliche Schutzfunktion der Haut. "
+    "Die Verträglichkeit wurde dermatologisch bestätigt."
+)
+
+
+@pytest.mark.parametrize("backend", ["shingle", "token_set", "difflib"])
+def test_threshold_fits_each_backend(backend):
+    checker = SimilarityChecker(backend=backend)
+    assert checker.threshold == config.SIMILARITY_THRESHOLD[backend]
+    assert checker.check_fields(DM_TEXT, {"html_description": REWRITTEN})["status"] == "OK"
+    assert checker.check_fields(DM_TEXT, {"html_description": COPIED})["status"] == "TOO_SIMILAR"
+    assert [r["status"] for r in checker.check_many([(DM_TEXT, REWRITTEN), (DM_TEXT, COPIED)])] == \
+        ["OK", "TOO_SIMILAR"]
+
+
+def test_explicit_threshold_wins():
+    assert SimilarityChecker(threshold=0.5, backend="shingle").threshold == 0.5
@@ -0,0 +1,59 @@
+import pytest
+
+import url_index
+from url_index import UrlIndex, canonical_url, ean_from_url
+
+PRODUCT = "https://www.dm.de/balea-duschgel-mango-kokos-p4066447241658.html"
+
+
+@pytest.mark.parametrize("url", [
+    PRODUCT,
+    "http://WWW.DM.DE:80/balea-duschgel-mango-kokos-p4066447241658.html",
+    "https://www.dm.de//balea-duschgel-mango-kokos-p4066447241658.html/",
+    "https://www.dm.de/balea-duschgel-mango-kokos-p4066447241658.html?utm_source=x&wt_mc=y#reviews",
+    "https://www.dm.de/balea-duschgel-mango-kokos-p4066447241658.html?variant=2",
+    " https://www.dm.de/balea%2Dduschgel-mango-kokos-p4066447241658.html ",
+])
+def test_product_url_variants(url):
+    assert canonical_url(url) == PRODUCT
+
+
+def test_listing_query_is_kept_without_tracking():
+    assert canonical_url("https://www.dm.de/search?query=shampoo&utm_medium=mail&gclid=1&currentPage=2#top") == \
+        "https://www.dm.de/search?query=shampoo&currentPage=2"
+    assert canonical_url("https://www.dm.de/search?query=shampoo") != canonical_url("https://www.dm.de/search?query=seife")
+    assert canonical_url("https://www.dm.de/pflege?utm_source=x") == "https://www.dm.de/pflege"
+
+
+def test_ean_from_url():
+    assert ean_from_url(PRODUCT) == "4066447241658"
+    assert ean_from_url("https://www.dm.de/pflege") == ""
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = UrlIndex(str(tmp_path / "urls.sqlite3"))
+    monkeypatch.setattr(url_index, "get_url_index", lambda: index)
+    return index
+
+
+def test_dedup_keeps_first_of_each_product(index):
+    urls = [
+        PRODUCT,
+        "https://www.dm.de/pflege?currentPage=1",
+        PRODUCT + "?utm_source=newsletter",
+        "https://www.dm.de/pflege?currentPage=2",
+        "https://www.dm.de/pflege?currentPage=1&utm_source=x",
+    ]
+    kept, duplicates = url_index.tekillestir(urls)
+    assert kept == urls[:2] + [urls[3]]
+    assert duplicates == {urls[2]: PRODUCT, urls[4]: urls[1]}
+
+
+def test_learned_ean_joins_renamed_urls(index, tmp_path):
+    # aynı ürün, farklı slug ve eski numara: sayfadan okunan EAN ile eşleşir
+    old = "https://www.dm.de/balea-duschgel-p4010355111111.html"
+    index.learn(old, "4066447241658")
+    assert url_index.tekillestir([PRODUCT, old]) == ([PRODUCT], {old: PRODUCT})
+    # eşleme diske yazılır, yeniden açılışta da geçerli
+    assert UrlIndex(str(tmp_path / "urls.sqlite3")).ean_for(old) == "4066447241658"
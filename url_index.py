@@ -0,0 +1,153 @@
+"""
+URL Dizini
+Ürün URL'lerini kanonik biçime indirir ve kanonik URL -> EAN eşlemesini bellekte ve SQLite'ta tutar.
+Aynı ürünün farklı URL'leri (takip parametreleri, www/büyük harf, sondaki /) tarayıcı açılmadan tek URL'ye iner.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_EAN_IN_PATH = re.compile(r"-p(\d{8,14})\.html")
+_SLASHES = re.compile(r"/{2,}")
+_DEFAULT_PORTS = {":80", ":443"}
+# liste/arama URL'lerinde atılan takip parametreleri (utm_* ayrıca); diğerleri sayfayı belirler
+_TRACKING_PARAMS = frozenset({"gclid", "gbraid", "wbraid", "fbclid", "msclkid", "dclid", "wt_mc", "wt.mc_id",
+                              "mc_cid", "mc_eid", "_ga", "_gl"})
+
+
+def canonical_url(url: str) -> str:
+    """
+    Aynı sayfanın farklı yazımlarını tek anahtara indir:
+    şema https, host küçük harf ve varsayılan portsuz, fragman atılır, yoldaki %xx çözülür,
+    tekrarlanan ve sondaki / kaldırılır. Ürün URL'lerinde (-p<EAN>.html) sorgunun tamamı atılır;
+    liste/arama URL'lerinde sadece takip parametreleri (utm_*, gclid, wt_mc...) atılır,
+    diğerleri (q, currentPage, filtreler) farklı listeleri ayırdığı için sırasıyla korunur.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().rsplit("@", 1)[-1]
+    for port in _DEFAULT_PORTS:
+        if host.endswith(port):
+            host = host[: -len(port)]
+    path = _SLASHES.sub("/", unquote(parts.path)).rstrip("/") or "/"
+    query = ""
+    if parts.query and not _EAN_IN_PATH.search(path):
+        query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                           if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS])
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def ean_from_url(url: str) -> str:
+    """dm.de ürün URL'leri EAN'ı içerir: ...-p4066447241658.html"""
+    m = _EAN_IN_PATH.search(url)
+    return m.group(1) if m else ""
+
+
+class UrlIndex:
+    """
+    Kanonik URL -> EAN. Tamamı açılışta belleğe okunur (satır başına ~100 bayt);
+    yeni eşlemeler hem belleğe hem SQLite'a yazılır. Her thread kendi bağlantısını kullanır.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or config.URL_INDEX_PATH
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " url TEXT PRIMARY KEY,"
+            " ean TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+        self._eans: Dict[str, str] = dict(conn.execute("SELECT url, ean FROM urls"))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def ean_for(self, url: str) -> str:
+        """Önce daha önce sayfadan okunmuş EAN (URL'deki numara farklı olabilir), yoksa URL'deki EAN"""
+        return self._eans.get(canonical_url(url)) or ean_from_url(url)
+
+    def learn(self, url: str, ean: Optional[str]):
+        """Çekilen sayfanın gerçek EAN'ını kaydet"""
+        if not ean:
+            return
+        key = canonical_url(url)
+        with self._lock:
+            if self._eans.get(key) == ean:
+                return
+            self._eans[key] = ean
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO urls (url, ean, updated_at) VALUES (?, ?, ?)", (key, ean, time.time())
+        )
+        conn.commit()
+
+    def key(self, url: str) -> str:
+        """Tekilleştirme anahtarı: EAN biliniyorsa EAN, değilse kanonik URL"""
+        return self.ean_for(url) or canonical_url(url)
+
+    def dedup(self, urls: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Aynı ürüne giden URL'lerden ilkini tut (giriş sırası korunur).
+        Returns: (tekil_urls, {atlanan_url: tutulan_url})
+        """
+        kept: Dict[str, str] = {}
+        duplicates: Dict[str, str] = {}
+        for url in urls:
+            key = self.key(url)
+            if key in kept:
+                duplicates[url] = kept[key]
+            else:
+                kept[key] = url
+        if duplicates:
+            logger.info(f"🔁 {len(duplicates)} tekrar eden URL atlandı")
+        return list(kept.values()), duplicates
+
+    def clear(self):
+        with self._lock:
+            self._eans.clear()
+        conn = self._conn()
+        conn.execute("DELETE FROM urls")
+        conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._eans)}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_url_index() -> UrlIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = UrlIndex()
+        return _index
+
+
+def tekillestir(urls: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """get_url_index().dedup kısayolu"""
+    return get_url_index().dedup(urls)
@@ -1,24 +1,28 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import re
 import os
+import zipfile
 import sys
 import logging
+import threading
 import traceback
+from datetime import datetime
 
 # Proje klasörünü path'e ekle
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
-from ebay_excel_exporter import export_products_xlsx
+import metrics
+from driver_pool import get_pool
+from product import Product, dumps
+from batch_jobs import JobManager
+from scrape_cache import get_cache
+from scraper import fiyat_yenile, toplu_is_yoneticisi, veri_cek
+from url_index import get_url_index, tekillestir
+from ebay_excel_exporter import (
+    ColumnPlan, export_products_csv, export_products_xlsx, iter_csv, load_template_headers, template_sheets,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,147 +34,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})
-
-
-def parse_manufacturer_info(text):
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    result = {
-        "name": lines[0] if len(lines) > 0 else "",
-        "address_line1": lines[1] if len(lines) > 1 else "",
-        "city": "",
-        "postal_code": "",
-        "country": "Deutschland"
-    }
-    for line in lines:
-        m = re.search(r"(\d{4,5})\s+(.+)", line)
-        if m:
-            result["postal_code"] = m.group(1)
-            result["city"] = m.group(2)
-        if "deutschland" in line.lower():
-            result["country"] = "Deutschland"
-    return result
-
-
-def get_all_images(soup):
-    urls = []
-    for i in range(1, 11):
-        sel = f"li:nth-of-type({i}) .p-xxxs img"
-        tag = soup.select_one(sel)
-        if not tag:
-            continue
-        src = tag.get("src") or tag.get("data-src") or ""
-        if not src and tag.get("srcset"):
-            src = tag.get("srcset").split(",")[0].strip().split(" ")[0]
-        if not src:
-            continue
-        if src.startswith("/"):
-            src = "https://www.dm.de" + src
-        src = re.sub(r"h_\d+,w_\d+", "h_1200,w_1200", src)
-        if src not in urls:
-            urls.append(src)
-    return urls
 
+class ProductJSONProvider(DefaultJSONProvider):
+    """jsonify: Product kayıtları sözlük olarak yazılır (tarayıcıya giden JSON aynı kalır)"""
 
-def temizle_aciklama(text):
-    text = re.sub(r"dm-Artikelnummer:.*?(\n|$)", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"Dosierungsempfehlung:.*?(\n|$)", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"Hinweis:.*?(Hergestellt|$)", "", text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r"Hergestellt.*?(\n|$)", "", text, flags=re.IGNORECASE)
-    return text.strip()
+    @staticmethod
+    def default(o):
+        if isinstance(o, Product):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
 
 
-def veri_cek(url):
-    logger.info(f"🔄 Veri çekiliyor: {url}")
-
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+app = Flask(__name__)
+app.json = ProductJSONProvider(app)
+CORS(app, resources={r"/*": {"origins": "*"}})
 
-    driver = None
-    try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
 
-        driver.get(url)
-        WebDriverWait(driver, 12).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+jobs = toplu_is_yoneticisi()
+refresh_jobs = JobManager(
+    worker=fiyat_yenile,
+    max_workers=config.REFRESH_WORKERS,
+    journal_dir=os.path.join(config.BATCH_JOURNAL_DIR, "refresh") if config.BATCH_JOURNAL_DIR else "",
+)
 
-        baslik_el = soup.select_one("h1")
-        baslik = baslik_el.get_text(strip=True) if baslik_el else "Başlık bulunamadı"
 
-        fiyat_el = soup.select_one(".text-xxl span.text-color2")
-        fiyat = fiyat_el.get_text(strip=True) if fiyat_el else ""
+def job_bul(job_id):
+    return jobs.get(job_id) or refresh_jobs.get(job_id)
 
-        aciklama_nodes = soup.select(".gap-m div:nth-of-type(2) .whitespace-pre-line div")
-        dm_aciklama = temizle_aciklama("\n".join(n.get_text(" ", strip=True) for n in aciklama_nodes))
 
-        ean_el = soup.select_one(".pdd_1qsttl15 div:nth-of-type(2)")
-        ean = re.sub(r"[^0-9]", "", ean_el.get_text()) if ean_el else ""
+@app.route("/health", methods=["GET"])
+def health():
+    return jsonify({"status": "ok", "message": "Backend çalışıyor", "driver_pool": get_pool().stats()})
 
-        addr = soup.select_one("[data-dmid='Anschrift des Unternehmens-content'] .whitespace-pre-line div")
-        manufacturer = parse_manufacturer_info(addr.get_text("\n", strip=True) if addr else "")
 
-        resimler = get_all_images(soup)
+def _anlik_olcumler():
+    """/metrics toplanırken okunan anlık değerler: havuz kullanımı, önbellek isabetleri, işler"""
+    pool = get_pool().stats()
+    yield "driver_pool_size", "gauge", "Havuzdaki en fazla sürücü", {}, pool["size"]
+    yield "driver_pool_alive", "gauge", "Açık Chrome sürücüleri", {}, pool["alive"]
+    yield "driver_pool_busy", "gauge", "Şu an sayfa çeken sürücüler", {}, pool["alive"] - pool["idle"]
 
-        # AI şu an opsiyonel: yoksa da doldur.
-        ebay_title = baslik[:80]
-        bullet_points = []
-        html_description = f"<p>{dm_aciklama}</p>" if dm_aciklama else f"<p>{baslik}</p>"
+    caches = {}
+    if config.CACHE_ENABLED:
+        caches["urun"] = get_cache()
+    if config.LLM_CACHE_ENABLED and config.AI_ENABLED:
+        from llm_cache import get_llm_cache
+        caches["llm"] = get_llm_cache()
+    if config.IMAGE_CHECK_ENABLED:
+        from image_store import get_image_store
+        caches["resim"] = get_image_store()
+    for name, cache in caches.items():
+        yield "cache_hits_total", "counter", "Önbellek isabetleri", {"cache": name}, cache.hits
+        yield "cache_misses_total", "counter", "Önbellek ıskaları", {"cache": name}, cache.misses
 
-        specs = {
-            "marke": "",
-            "produktart": "",
-            "formulierung": "",
-            "wirksame_inhaltsstoffe": "",
-            "herstellernummer": "",
-            "anzahl_tabletten": "",
-            "hauptverwendungszweck": "",
-            "inhaltsstoffe": "",
-            "versorgung": "",
-        }
+    for manager, kind in ((jobs, "scrape"), (refresh_jobs, "refresh")):
+        yield "batch_jobs_running", "gauge", "Çalışan toplu işler", {"kind": kind}, manager.running()
 
-        result = {
-            "success": True,
-            "url": url,
-            "dm_baslik": baslik,
-            "dm_aciklama": dm_aciklama,
-            "fiyat": fiyat,
-            "ean": ean,
-            "resimler": resimler,
-            "manufacturer": manufacturer,
-
-            "ebay_title": ebay_title,
-            "bullet_points": bullet_points,
-            "html_description": html_description,
-            "specifications": specs
-        }
-
-        logger.info(f"✅ Ürün başarıyla işlendi: {baslik}")
-        return result
 
-    except Exception as e:
-        logger.error(f"❌ Hata: {e}")
-        logger.error(traceback.format_exc())
-        return {
-            "success": False,
-            "url": url,
-            "error": str(e),
-            "message": f"Veri çekme hatası: {str(e)}"
-        }
-    finally:
-        if driver:
-            driver.quit()
+metrics.register_collector(_anlik_olcumler)
 
 
-@app.route("/health", methods=["GET"])
-def health():
-    return jsonify({"status": "ok", "message": "Backend çalışıyor"})
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus metin formatı"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.route("/urun", methods=["GET"])
@@ -179,8 +106,14 @@ def urun_endpoint():
     if not url:
         return jsonify({"success": False, "error": "URL gerekli"}), 400
 
+    mode = request.args.get("mode")
+    if mode and mode not in ("auto", "http", "selenium"):
+        return jsonify({"success": False, "error": "Geçersiz mode"}), 400
+
+    refresh = request.args.get("refresh", "").lower() in ("1", "true", "yes")
+
     try:
-        result = veri_cek(url)
+        result = veri_cek(url, mode=mode, refresh=refresh)
         return jsonify(result)
     except Exception as e:
         logger.error(f"Endpoint hatası: {e}")
@@ -192,36 +125,402 @@ def urun_endpoint():
         }), 500
 
 
+@app.route("/urun/batch", methods=["POST"])
+def urun_batch():
+    data = request.get_json() or {}
+    urls = [u.strip() for u in data.get("urls", []) if isinstance(u, str) and u.strip()]
+    if not urls:
+        return jsonify({"success": False, "error": "URL listesi boş"}), 400
+
+    # aynı ürünün farklı URL'leri tek sefer çekilir
+    urls, duplicates = tekillestir(urls)
+    job = jobs.submit(urls, {"refresh": bool(data.get("refresh"))})
+    return jsonify({"success": True, "duplicates": len(duplicates), **job.progress()})
+
+
+@app.route("/crawl", methods=["POST"])
+def crawl():
+    """
+    Kategori/arama listelerinden ürün URL'lerini bul; scrape=true (varsayılan) ise tarama arka planda
+    sürer ve bulunan ürünler (ve listedeki ürün URL'leri) sayfa sayfa toplu işe eklenir.
+    Yanıt hemen döner; ilerleme /urun/batch/<id>/events (progress.discovering tarama bitene kadar true).
+    scrape=false ise tarama bitince URL listesi döner.
+    {"urls": [...], "max_pages": 20, "mode": "auto", "refresh": false, "scrape": true}
+    """
+    from crawler import ayir, urunleri_kesfet
+
+    data = request.get_json(silent=True) or {}
+    urls = [u.strip() for u in data.get("urls", []) if isinstance(u, str) and u.strip()]
+    products, listings = ayir(urls)
+    if not listings:
+        return jsonify({"success": False, "error": "Kategori/arama URL'si yok"}), 400
+
+    mode = data.get("mode")
+    if mode and mode not in ("auto", "http", "selenium"):
+        return jsonify({"success": False, "error": "Geçersiz mode"}), 400
+    max_pages = int(data.get("max_pages") or 0) or None
+    refresh = bool(data.get("refresh"))
+
+    if not data.get("scrape", True):
+        found = urunleri_kesfet(listings, mode=mode, refresh=refresh, max_pages=max_pages)
+        urls, duplicates = tekillestir(products + found)
+        if not urls:
+            return jsonify({"success": False, "error": "Listelerde ürün bulunamadı"}), 404
+        return jsonify({"success": True, "discovered": len(found), "duplicates": len(duplicates), "urls": urls})
+
+    job = jobs.open_job({"refresh": refresh})
+    threading.Thread(
+        target=kesfet_ve_ekle, args=(job, products, listings, mode, refresh, max_pages),
+        name=f"crawl-{job.id}", daemon=True,
+    ).start()
+    return jsonify({"success": True, **job.progress()})
+
+
+def kesfet_ve_ekle(job, products, listings, mode, refresh, max_pages):
+    """Tarama thread'i: her sayfanın yeni ürünleri (daha önce eklenenlerle tekilleştirilip) işe eklenir"""
+    from crawler import urunleri_kesfet
+
+    index = get_url_index()
+    seen = set()
+
+    def ekle(urls):
+        new = []
+        for url in urls:
+            key = index.key(url)
+            if key not in seen:
+                seen.add(key)
+                new.append(url)
+        jobs.add_urls(job, new)
+
+    try:
+        ekle(products)
+        urunleri_kesfet(listings, mode=mode, refresh=refresh, max_pages=max_pages, on_urls=ekle)
+    except Exception as e:
+        logger.error(f"Tarama hatası [{job.id}]: {e}")
+        logger.error(traceback.format_exc())
+    finally:
+        jobs.close(job)
+
+
+@app.route("/urun/batch", methods=["GET"])
+def urun_batch_list():
+    """Bellekteki ve günlüğü diskte olan işler (en yeni önce)"""
+    return jsonify({"success": True, "jobs": jobs.journaled()})
+
+
+@app.route("/urun/batch/<job_id>/resume", methods=["POST"])
+def urun_batch_resume(job_id):
+    """Günlükten devam: başarılı URL'ler atlanır, sadece hatalı/eksik olanlar tekrar çekilir"""
+    job = jobs.resume(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "İş günlüğü bulunamadı"}), 404
+    return jsonify({"success": True, **job.progress()})
+
+
+@app.route("/urun/batch/<job_id>", methods=["GET"])
+def urun_batch_status(job_id):
+    job = job_bul(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "İş bulunamadı"}), 404
+    return jsonify({"success": True, **job.progress(), "results": job.results})
+
+
+@app.route("/refresh", methods=["POST"])
+def refresh_batch():
+    """
+    Bilinen ürünlerin fiyat/stok güncellemesi (toplu iş olarak; ilerleme /urun/batch/<id>/events).
+    {"urls": [...]} ya da {"eans": [...]}; ikisi de yoksa önbellekteki tüm ürünler.
+    """
+    data = request.get_json(silent=True) or {}
+    urls = tekillestir([u.strip() for u in data.get("urls", []) if isinstance(u, str) and u.strip()])[0]
+    if not urls:
+        eans = data.get("eans")
+        urls = get_cache().urls(eans=[str(e) for e in eans] if eans else None)
+    if not urls:
+        return jsonify({"success": False, "error": "Güncellenecek ürün yok"}), 400
+
+    job = refresh_jobs.submit(urls)
+    return jsonify({"success": True, **job.progress()})
+
+
+@app.route("/urun/batch/<job_id>/events", methods=["GET"])
+def urun_batch_events(job_id):
+    job = job_bul(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "İş bulunamadı"}), 404
+
+    # EventSource yeniden bağlanınca kaldığı yerden devam eder
+    start = request.headers.get("Last-Event-ID", request.args.get("from", "0"))
+    start = int(start) if str(start).isdigit() else 0
+
+    def stream():
+        for seq, event, payload in job.iter_events(start):
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            yield f"id: {seq}\nevent: {event}\ndata: {dumps(payload).decode('utf-8')}\n\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify({"success": True, **get_cache().stats()})
+
+
+@app.route("/cache/llm-stats", methods=["GET"])
+def llm_cache_stats():
+    from llm_cache import get_llm_cache
+    return jsonify({"success": True, **get_llm_cache().stats()})
+
+
+@app.route("/cache/image-stats", methods=["GET"])
+def image_cache_stats():
+    from image_store import get_image_store
+    return jsonify({"success": True, **get_image_store().stats()})
+
+
+@app.route("/cache/crawl-stats", methods=["GET"])
+def crawl_cache_stats():
+    from crawler import get_listing_cache
+    return jsonify({"success": True, **get_listing_cache().stats()})
+
+
+@app.route("/images/check", methods=["POST"])
+def images_check():
+    """{"urls": [...], "mirror": false} -> her URL için kontrol sonucu"""
+    from image_store import get_image_store
+
+    data = request.get_json(silent=True) or {}
+    urls = data.get("urls") or []
+    if not urls:
+        return jsonify({"success": False, "message": "URL listesi boş"}), 400
+    results = get_image_store().check(urls, mirror=bool(data.get("mirror")))
+    return jsonify({"success": True, "results": results})
+
+
+@app.route("/images/<digest>", methods=["GET"])
+def image_file(digest):
+    """Yerel kopyayı içerik hash'i ile sun"""
+    from image_store import get_image_store
+
+    if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+        return jsonify({"success": False, "message": "Geçersiz hash"}), 400
+    path = get_image_store().path_for(digest)
+    if not path:
+        return jsonify({"success": False, "message": "Görsel bulunamadı"}), 404
+    return send_file(os.path.abspath(path), max_age=365 * 24 * 3600)
+
+
+@app.route("/cache/clear", methods=["POST"])
+def cache_clear():
+    get_cache().clear()
+    return jsonify({"success": True})
+
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def sablon_yolu(name):
+    """Sadece uygulama klasöründeki .xlsx şablonlarına izin ver"""
+    name = os.path.basename(name or "")
+    if not name.lower().endswith(".xlsx"):
+        raise ValueError(f"Geçersiz şablon: {name}")
+    path = os.path.join(TEMPLATE_DIR, name)
+    if not os.path.isfile(path):
+        raise ValueError(f"Şablon bulunamadı: {name}")
+    return path
+
+
+def export_basliklari(data):
+    """İstekteki (yoksa config'teki) şablonun başlık satırı; şablon yoksa EXPORT_HEADERS"""
+    template = data.get("template") or config.EXPORT_TEMPLATE
+    if not template:
+        return config.EXPORT_HEADERS
+    sheet = data.get("sheet") or config.EXPORT_TEMPLATE_SHEET or None
+    return load_template_headers(sablon_yolu(template), sheet)
+
+
 @app.route("/export-headers", methods=["GET"])
 def export_headers():
-    return jsonify({"success": True, "headers": config.EXPORT_HEADERS})
+    try:
+        return jsonify({"success": True, "headers": export_basliklari(request.args)})
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+
+@app.route("/export-templates", methods=["GET"])
+def export_templates():
+    """Uygulama klasöründeki şablonlar ve kategori sayfaları"""
+    templates = []
+    for name in sorted(os.listdir(TEMPLATE_DIR)):
+        if not name.lower().endswith(".xlsx") or name.startswith("~$"):
+            continue
+        try:
+            sheets = template_sheets(os.path.join(TEMPLATE_DIR, name))
+        except Exception as e:
+            logger.warning(f"Şablon okunamadı {name}: {e}")
+            continue
+        if sheets:
+            templates.append({"name": name, "sheets": {k: len(v) for k, v in sheets.items()}})
+    return jsonify({"success": True, "templates": templates})
+
+
+def export_kaynagi(data):
+    """
+    Export edilecek başarılı ürünler (tembel iterable):
+      {"job_id": ...}  sunucudaki toplu iş sonuçları (iş bellekte yoksa günlüğünden)
+      {"urls": [...]}  önbellekteki ürünler
+      {"products": [...]} istemcinin gönderdiği liste (eski yol)
+    Returns: (iterable, hata_mesajı)
+    """
+    if data.get("job_id"):
+        job = job_bul(data["job_id"])
+        if not job:
+            # bellekten atılmış (BATCH_KEEP_JOBS) ya da uygulama yeniden başlamış: sonuçlar iş günlüğünde
+            saved = jobs.saved_results(data["job_id"])
+            if saved is None:
+                return None, "İş bulunamadı"
+            products = [r for r in saved if r.get("success")]
+            return (products, None) if products else (None, "İşte başarılı ürün yok")
+        if job.finished and job.done - job.failed == 0:
+            return None, "İşte başarılı ürün yok"
+        # iş sürüyorsa iş bitene kadar beklenir (aynı EAN'lı satırlar export'ta birleştirilir)
+        return (r for r in job.iter_results() if r.get("success")), None
+
+    if data.get("urls"):
+        cache = get_cache()
+        return (p for p in (cache.get(u) for u in data["urls"]) if p), None
+
+    products = data.get("products", [])
+    if not products:
+        return None, "Ürün listesi boş"
+    return products, None
+
+
+def send_xlsx(filepath, filename):
+    return send_file(
+        os.path.abspath(filepath),
+        as_attachment=True,
+        download_name=filename,
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
 
 
 @app.route("/export-excel", methods=["POST"])
 def export_excel():
     try:
-        data = request.get_json() or {}
-        products = data.get("products", [])
-        if not products:
-            return jsonify({"success": False, "message": "Ürün listesi boş"}), 400
+        data = request.get_json(silent=True) or {}
+        products, error = export_kaynagi(data)
+        if error:
+            return jsonify({"success": False, "message": error}), 400
+        headers = export_basliklari(data)
 
         os.makedirs("exports", exist_ok=True)
-        filepath, filename = export_products_xlsx(products, config.EXPORT_HEADERS, out_dir="exports")
-
-        # dosyayı indir
-        return send_file(
-            filepath,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        filepath, filename = export_products_xlsx(products, headers, out_dir="exports")
 
+        # xlsx bir zip arşivi: dosya tamamlanınca indirilir (exports/ altında da kalır)
+        return send_xlsx(filepath, filename)
+
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         logger.error(f"Export hatası: {e}")
         logger.error(traceback.format_exc())
         return jsonify({"success": False, "message": str(e)}), 500
 
 
+@app.route("/export-revise", methods=["POST"])
+def export_revise():
+    """
+    Fiyat güncelleme işinde değişen ürünler için Revise dosyası.
+    {"job_id": ..., "format": "csv" | "xlsx"}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        job_id = data.get("job_id") or ""
+        job = refresh_jobs.get(job_id)
+        if job:
+            if job.finished and not any(r and r.get("changed") for r in job.results):
+                return jsonify({"success": False, "message": "Değişen ürün yok"}), 400
+            products = (r for r in job.iter_results() if r.get("success") and r.get("changed"))
+        else:
+            # budanmış ya da uygulama yeniden başlamış: sonuçlar güncelleme işinin günlüğünde
+            saved = refresh_jobs.saved_results(job_id) if job_id else None
+            if saved is None:
+                return jsonify({"success": False, "message": "Güncelleme işi bulunamadı"}), 404
+            products = [r for r in saved if r.get("success") and r.get("changed")]
+            if not products:
+                return jsonify({"success": False, "message": "Değişen ürün yok"}), 400
+
+        plan = ColumnPlan(config.REVISE_HEADERS, action="Revise")
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if data.get("format") == "xlsx":
+            os.makedirs("exports", exist_ok=True)
+            filepath, filename = export_products_xlsx(products, plan, out_dir="exports")
+            return send_xlsx(filepath, filename)
+
+        return Response(
+            stream_with_context(iter_csv(products, plan)),
+            mimetype="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="ebay_revise_{ts}.csv"'}
+        )
+
+    except Exception as e:
+        logger.error(f"Revise export hatası: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
+@app.route("/export-csv", methods=["POST"])
+def export_csv():
+    """
+    chunk_rows yoksa CSV akış olarak döner (job_id ile iş sürerken satırlar bittikçe gelir).
+    chunk_rows > 0 ise exports/ altına parça dosyaları yazılır ve zip olarak döner.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        products, error = export_kaynagi(data)
+        if error:
+            return jsonify({"success": False, "message": error}), 400
+        headers = export_basliklari(data)
+
+        os.makedirs("exports", exist_ok=True)
+        chunk_rows = int(data.get("chunk_rows") or config.CSV_CHUNK_ROWS or 0)
+
+        if chunk_rows <= 0:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            return Response(
+                stream_with_context(iter_csv(products, headers)),
+                mimetype="text/csv; charset=utf-8",
+                headers={"Content-Disposition": f'attachment; filename="ebay_export_{ts}.csv"'}
+            )
+
+        files = export_products_csv(products, headers, out_dir="exports", chunk_rows=chunk_rows)
+        if not files:
+            return jsonify({"success": False, "message": "Ürün listesi boş"}), 400
+
+        zip_name = files[0][1].rsplit("_part", 1)[0] + ".zip"
+        zip_path = os.path.join("exports", zip_name)
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for filepath, filename in files:
+                zf.write(filepath, filename)
+
+        return send_file(zip_path, as_attachment=True, download_name=zip_name, mimetype="application/zip")
+
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        logger.error(f"CSV export hatası: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
 if __name__ == "__main__":
     os.makedirs('logs', exist_ok=True)
     app.run(host='127.0.0.1', port=5001, debug=True)